@@ -33,6 +33,7 @@ from lisa.util import (
     plugin_manager,
 )
 from lisa.util.logger import create_file_handler, get_logger, remove_handler
+from lisa.util.perf_timer import create_timer
 
 if TYPE_CHECKING:
     from lisa.platform_ import Platform
@@ -112,6 +113,7 @@ class EnvironmentSpace(search_space.RequirementMixin):
             self.nodes, o.nodes
         )
 
+    @search_space.cached_check
     def check(self, capability: Any) -> search_space.ResultReason:
         assert isinstance(capability, EnvironmentSpace), f"actual: {type(capability)}"
         result = search_space.ResultReason()
@@ -182,6 +184,12 @@ class Environment(ContextMixin, InitializableMixin):
         self._default_node: Optional[Node] = None
         self._is_dirty: bool = False
 
+        # the information is cached for each stage of environment, and it's
+        # refreshed after nodes are rebooted, or the environment is dirty.
+        self._information: Optional[Dict[str, str]] = None
+        self._information_key: Any = None
+        self._information_lock = Lock()
+
         # track retried times to provide an unique name.
         self._raw_id = id_
         self._retries: int = 0
@@ -333,22 +341,44 @@ class Environment(ContextMixin, InitializableMixin):
 
         return node
 
-    def get_information(self) -> Dict[str, str]:
-        final_information: Dict[str, str] = {}
-        informations: List[
-            Dict[str, str]
-        ] = plugin_manager.hook.get_environment_information(environment=self)
-        # reverse it, since it's FILO order,
-        # try basic earlier, and they are allowed to be overwritten
-        informations.reverse()
-        for current_information in informations:
-            final_information.update(current_information)
-
-        return final_information
+    def get_information(self, force_run: bool = False) -> Dict[str, str]:
+        """
+        Messages are created with the information, so it's collected once and
+        shared, until the environment or nodes are changed.
+        """
+        key = (
+            self.status,
+            tuple(
+                (x.is_connected, x.is_dirty, x.boot_count) for x in self.nodes.list()
+            ),
+        )
+        with self._information_lock:
+            if force_run or self._information is None or self._information_key != key:
+                timer = create_timer()
+                final_information: Dict[str, str] = {}
+                informations: List[
+                    Dict[str, str]
+                ] = plugin_manager.hook.get_environment_information(environment=self)
+                # reverse it, since it's FILO order,
+                # try basic earlier, and they are allowed to be overwritten
+                informations.reverse()
+                for current_information in informations:
+                    final_information.update(current_information)
+                self.log.debug(f"collected environment information in {timer}")
+
+                self._information = final_information
+                self._information_key = key
+
+            return dict(self._information)
+
+    def invalidate_information(self) -> None:
+        with self._information_lock:
+            self._information = None
 
     def mark_dirty(self) -> None:
         self.log.debug("mark environment to dirty")
         self._is_dirty = True
+        self.invalidate_information()
 
     def _initialize(self, *args: Any, **kwargs: Any) -> None:
         if self.status != EnvironmentStatus.Deployed:
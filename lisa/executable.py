@@ -3,11 +3,15 @@
 
 from __future__ import annotations
 
+import os
 import pathlib
+import time
 from hashlib import sha256
+from threading import Lock
 from typing import (
     TYPE_CHECKING,
     Any,
+    Callable,
     Dict,
     List,
     Optional,
@@ -29,6 +33,23 @@ if TYPE_CHECKING:
 
 T = TypeVar("T")
 
+# the built tools in the cache are rebuilt after the time in seconds, so tools,
+# which are built from a branch, pick up the new code.
+_TOOL_CACHE_EXPIRY = 7 * 24 * 3600
+# the lock of each cached file, so the other nodes wait the first node to
+# build and publish a tool, instead of building it again.
+_tool_cache_locks: Dict[str, Lock] = {}
+_tool_cache_locks_lock = Lock()
+
+
+def _get_tool_cache_lock(key: str) -> Lock:
+    with _tool_cache_locks_lock:
+        lock = _tool_cache_locks.get(key, None)
+        if lock is None:
+            lock = Lock()
+            _tool_cache_locks[key] = lock
+        return lock
+
 
 class Tool(InitializableMixin):
     """
@@ -196,7 +217,8 @@ class Tool(InitializableMixin):
         if result.exit_code == 0:
             exists = True
             use_sudo = False
-        else:
+        elif self.node.is_posix:
+            # sudo is ignored on Windows, so it doesn't need to check again.
             result = self.node.execute(
                 where_command,
                 shell=True,
@@ -325,6 +347,97 @@ class Tool(InitializableMixin):
         """
         raise NotImplementedError("'install' is not implemented")
 
+    def _install_cached(
+        self, build: Callable[[], Any], paths: List[str], version: str = ""
+    ) -> None:
+        """
+        Install a tool, which is built from source, through the tool cache. If
+        a node with the same tool version, distro, arch and kernel built it
+        before, the installed paths are extracted from the cache. Otherwise, it
+        calls build, and publishes the installed paths to the cache.
+
+        paths: absolute paths on the node, which are installed by build. Shell
+            wildcards are supported, like /usr/local/lib/libiperf*.
+        version: it's in the key of cache, like the commit id or tag of source.
+            If it's empty, the cache is skipped, since the version is unknown.
+        """
+        if not self.node.is_posix or not version:
+            build()
+            return
+
+        cache_file = self._get_cache_file(version)
+        with _get_tool_cache_lock(str(cache_file)):
+            if self._restore_from_cache(cache_file):
+                return
+            build()
+            try:
+                self._save_to_cache(cache_file, paths)
+            except Exception as identifier:
+                # the cache is an optimization, it doesn't fail the installation.
+                self._log.debug(f"failed to save {self.name} to cache: {identifier}")
+
+    def _get_cache_file(self, version: str) -> pathlib.Path:
+        from lisa.operating_system import Posix
+
+        posix_os = cast(Posix, self.node.os)
+        information = posix_os.information
+        kernel_information = posix_os.get_kernel_information()
+        key = "|".join(
+            [
+                self.name,
+                version,
+                information.vendor,
+                information.release,
+                kernel_information.hardware_platform,
+                kernel_information.raw_version,
+            ]
+        )
+        key_hash = sha256(key.encode("utf-8")).hexdigest()[:16]
+        return (
+            constants.CACHE_PATH / constants.PATH_TOOL / f"{self.name}-{key_hash}.tgz"
+        )
+
+    def _restore_from_cache(self, cache_file: pathlib.Path) -> bool:
+        if not cache_file.exists():
+            return False
+        if time.time() - cache_file.stat().st_mtime > _TOOL_CACHE_EXPIRY:
+            self._log.debug(f"cached {self.name} is expired, build it again")
+            return False
+
+        node_file = self.get_tool_path().joinpath(cache_file.name)
+        self.node.shell.copy(cache_file, node_file)
+        # the shared libraries may be restored, so refresh the linker cache.
+        result = self.node.execute(
+            f"tar -xzf {node_file} -C / && (ldconfig || true)",
+            shell=True,
+            sudo=True,
+        )
+        if result.exit_code != 0 or not self._check_exists():
+            self._log.debug(f"failed to restore {self.name} from cache, build it")
+            return False
+        self._log.debug(f"restored {self.name} from cache {cache_file}")
+        return True
+
+    def _save_to_cache(self, cache_file: pathlib.Path, paths: List[str]) -> None:
+        node_file = self.get_tool_path().joinpath(cache_file.name)
+        # the paths are relative to the root, so they are extracted to the same
+        # places. Symbol links are kept.
+        relative_paths = " ".join(x.lstrip("/") for x in paths)
+        self.node.execute(
+            f"tar -czf {node_file} {relative_paths}",
+            cwd=self.node.get_pure_path("/"),
+            shell=True,
+            sudo=True,
+            expected_exit_code=0,
+            expected_exit_code_failure_message=f"failed to pack {self.name}",
+        )
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        # other runs may read the cache, so it's renamed after downloaded.
+        temp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        self.node.shell.copy_back(node_file, temp_file)
+        os.replace(temp_file, cache_file)
+        self._log.debug(f"saved {self.name} to cache {cache_file}")
+
     def _initialize(self, *args: Any, **kwargs: Any) -> None:
         """
         Declare and initialize variables here, or some time costing initialization.
@@ -451,11 +564,9 @@ class CustomScript(Tool):
         if self.node.is_remote:
             # copy to remote
             node_script_path = self.get_tool_path()
-            for file in self._files:
-                remote_path = node_script_path.joinpath(file)
-                source_path = self._local_path.joinpath(file)
-                self.node.shell.copy(source_path, remote_path)
-                self.node.shell.chmod(remote_path, 0o755)
+            self.node.shell.copy_bulk(
+                self._local_path, node_script_path, self._files, mode=0o755
+            )
             self._cwd = node_script_path
         else:
             self._cwd = self._local_path
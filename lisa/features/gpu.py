@@ -267,6 +267,7 @@ class Gpu(Feature):
                         f"failed to add repo {repo_entry}"
                     ),
                 )
+                self._node.os.invalidate_package_cache()
                 # the latest version cuda-drivers-510 has issues
                 # nvidia-smi
                 # No devices were found
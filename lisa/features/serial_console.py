@@ -1,9 +1,10 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import codecs
 import re
 from pathlib import Path
-from typing import Any, List, Optional, Pattern
+from typing import Any, Dict, List, Optional, Pattern, Tuple
 
 from lisa.feature import Feature
 from lisa.util import (
@@ -65,8 +66,23 @@ class SerialConsole(Feature):
         """
         raise NotImplementedError()
 
+    def _get_console_log_after(
+        self, offset: int, saved_path: Optional[Path]
+    ) -> Tuple[int, bytes]:
+        """
+        returns the start offset and the content after the offset. If the log is
+        restarted, the start offset is 0 with the whole log. The default
+        implementation downloads the whole log, override it if the platform can
+        read a part of the log.
+        """
+        content = self._get_console_log(saved_path=saved_path)
+        if len(content) < offset:
+            return 0, content
+        return offset, content[offset:]
+
     def _initialize(self, *args: Any, **kwargs: Any) -> None:
-        self._cached_console_log: Optional[bytes] = None
+        self._is_console_log_fetched = False
+        self._reset_console_log()
 
     def enabled(self) -> bool:
         # most platform support shutdown
@@ -74,12 +90,11 @@ class SerialConsole(Feature):
 
     def invalidate_cache(self) -> None:
         # sometime, if the serial log accessed too early, it may be empty.
-        # invalidate it for next run.
+        # invalidate it, so the appended content is fetched in next run.
         self._node.log.debug(
-            f"invalidate serial log cache, current size: "
-            f"{len(self._cached_console_log) if self._cached_console_log else None}"
+            f"invalidate serial log cache, current size: {len(self._console_log)}"
         )
-        self._cached_console_log = None
+        self._is_console_log_fetched = False
 
     def get_matched_str(self, pattern: Pattern[str]) -> str:
         # first_match is False, since serial log may log multiple reboots. take
@@ -107,19 +122,8 @@ class SerialConsole(Feature):
             saved_path = saved_path.joinpath(get_datetime_path())
             saved_path.mkdir()
 
-        if self._cached_console_log is None or force_run:
-            self._node.log.debug("downloading serial log...")
-            log_path = self._node.local_log_path / get_datetime_path()
-            log_path.mkdir(parents=True, exist_ok=True)
-
-            self._cached_console_log = self._get_console_log(saved_path=log_path)
-            self._node.log.debug(
-                f"downloaded serial log size: {len(self._cached_console_log)}"
-            )
-            # anyway save to node log_path for each time it's real queried
-            log_file_name = log_path / NAME_SERIAL_CONSOLE_LOG
-            with open(log_file_name, mode="wb") as f:
-                f.write(self._cached_console_log)
+        if not self._is_console_log_fetched or force_run:
+            self._fetch_console_log(saved_path)
         else:
             self._node.log.debug("load cached serial log")
 
@@ -127,28 +131,22 @@ class SerialConsole(Feature):
             # save it again, if it's asked to save.
             log_file_name = saved_path / NAME_SERIAL_CONSOLE_LOG
             with open(log_file_name, mode="wb") as f:
-                f.write(self._cached_console_log)
+                f.write(self._console_log)
 
-        return self._cached_console_log.decode("utf-8", errors="ignore")
+        return self._console_log_text
 
     def check_panic(
         self, saved_path: Optional[Path], stage: str = "", force_run: bool = False
     ) -> None:
         self._node.log.debug("checking panic in serial log...")
-        content: str = self.get_console_log(saved_path=saved_path, force_run=force_run)
-        ignored_candidates = [
-            x
-            for sublist in find_patterns_in_lines(
-                content, self.panic_ignorable_patterns
-            )
-            for x in sublist
-            if x
-        ]
+        self.get_console_log(saved_path=saved_path, force_run=force_run)
+        ignored_candidates = self._find_patterns(
+            "panic_ignorable", self.panic_ignorable_patterns
+        )
         panics = [
             x
-            for sublist in find_patterns_in_lines(content, self.panic_patterns)
-            for x in sublist
-            if x and x not in ignored_candidates
+            for x in self._find_patterns("panic", self.panic_patterns)
+            if x not in ignored_candidates
         ]
 
         if panics:
@@ -158,23 +156,12 @@ class SerialConsole(Feature):
         self, saved_path: Optional[Path], stage: str = "", force_run: bool = False
     ) -> None:
         self._node.log.debug("checking initramfs in serial log...")
-        content: str = self.get_console_log(saved_path=saved_path, force_run=force_run)
+        self.get_console_log(saved_path=saved_path, force_run=force_run)
 
-        filesystem_exception_logs = [
-            x
-            for sublist in find_patterns_in_lines(
-                content, self.filesystem_exception_patterns
-            )
-            for x in sublist
-            if x
-        ]
-
-        initramfs_logs = [
-            x
-            for sublist in find_patterns_in_lines(content, self.initramfs_patterns)
-            for x in sublist
-            if x
-        ]
+        filesystem_exception_logs = self._find_patterns(
+            "filesystem_exception", self.filesystem_exception_patterns
+        )
+        initramfs_logs = self._find_patterns("initramfs", self.initramfs_patterns)
 
         if initramfs_logs:
             raise LisaException(
@@ -187,3 +174,63 @@ class SerialConsole(Feature):
 
     def write(self, data: str) -> None:
         raise NotImplementedError
+
+    def _fetch_console_log(self, saved_path: Optional[Path]) -> None:
+        self._node.log.debug("downloading serial log...")
+        offset = len(self._console_log)
+        start, content = self._get_console_log_after(offset, saved_path=saved_path)
+        if start != offset:
+            self._node.log.debug("serial log is restarted, reset the cache.")
+            self._reset_console_log()
+
+        self._console_log.extend(content)
+        self._console_log_text += self._console_log_decoder.decode(content)
+        # save to node log_path, it's appended for each time it's real queried.
+        log_file_name = self._node.local_log_path / NAME_SERIAL_CONSOLE_LOG
+        with open(log_file_name, mode="ab" if start else "wb") as f:
+            f.write(content)
+        self._is_console_log_fetched = True
+        self._node.log.debug(
+            f"downloaded serial log size: {len(content)}, "
+            f"total: {len(self._console_log)}"
+        )
+
+    def _reset_console_log(self) -> None:
+        # the size of fetched content is the offset of next fetch.
+        self._console_log = bytearray()
+        self._console_log_text = ""
+        # a character may be cut between fetches.
+        self._console_log_decoder = codecs.getincrementaldecoder("utf-8")(
+            errors="ignore"
+        )
+        # name: (the position of scanned lines, matched strings)
+        self._scanned_matches: Dict[str, Tuple[int, List[str]]] = {}
+
+    def _find_patterns(self, name: str, patterns: List[Pattern[str]]) -> List[str]:
+        """
+        The patterns match lines, so only the new lines are scanned, and the
+        matches are kept by the name.
+        """
+        content = self._console_log_text
+        position, matches = self._scanned_matches.get(name, (0, []))
+        end = content.rfind("\n") + 1
+        if end > position:
+            matches = matches + self._find_patterns_in(content[position:end], patterns)
+            position = end
+            self._scanned_matches[name] = (position, matches)
+
+        # the last line may be a prompt without line end, like "grub>". So it's
+        # scanned each time, but not saved.
+        return matches + self._find_patterns_in(content[position:], patterns)
+
+    def _find_patterns_in(
+        self, content: str, patterns: List[Pattern[str]]
+    ) -> List[str]:
+        if not content:
+            return []
+        return [
+            x
+            for sublist in find_patterns_in_lines(content, patterns)
+            for x in sublist
+            if x
+        ]
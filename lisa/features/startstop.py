@@ -39,12 +39,15 @@ class StartStop(Feature):
         self._log.info("stopping")
         self._stop(wait=wait, state=state)
         self._node.close()
+        self._node.mark_rebooted()
 
     def start(self, wait: bool = True) -> None:
         self._log.info("starting")
         self._start(wait=wait)
+        self._node.mark_rebooted()
 
     def restart(self, wait: bool = True) -> None:
         self._log.info("restarting")
         self._restart(wait=wait)
         self._node.close()
+        self._node.mark_rebooted()
@@ -12,7 +12,7 @@ from typing import Optional
 
 from retry import retry
 
-# force to import all modules for reflection use
+# register modules of types for reflection use, they are imported on use.
 import lisa.mixin_modules  # noqa: F401
 from lisa.parameter_parser.argparser import parse_args
 from lisa.util import constants, get_datetime_path
@@ -46,11 +46,21 @@ def _normalize_path(path_type: str, path: Optional[Path] = None) -> Path:
 
 def _dump_code_information(log: Logger) -> None:
     command = r'git log -1 "--pretty=format:%H%d %ci, %s"'
-    output = subprocess.getoutput(command)
-    log.info(f"git head: {output}")
-    output = subprocess.getoutput(f"git submodule foreach --recursive {command}")
-    if output:
-        log.info(f"submodules: {output}")
+    # run git commands concurrently, they take a while on large repos.
+    processes = [
+        subprocess.Popen(
+            x,
+            shell=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+        for x in [command, f"git submodule foreach --recursive {command}"]
+    ]
+    head, submodules = (x.communicate()[0].rstrip("\n") for x in processes)
+    log.info(f"git head: {head}")
+    if submodules:
+        log.info(f"submodules: {submodules}")
 
 
 @retry(FileExistsError, tries=10, delay=0.2)
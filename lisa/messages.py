@@ -1,11 +1,24 @@
+import math
+import statistics
+from array import array
 from dataclasses import dataclass, field
 from datetime import datetime
 from decimal import Decimal
 from enum import Enum
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Type, TypeVar
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from lisa.schema import NetworkDataPath
-from lisa.util import dict_to_fields
+from lisa.util import LisaException, dict_to_fields
 
 if TYPE_CHECKING:
     from lisa import Node
@@ -104,6 +117,64 @@ class TransportProtocol(str, Enum):
     Udp = "UDP"
 
 
+@dataclass(repr=False)
+class PerfSamples:
+    """
+    The samples of a metric in a perf test, like the pps of each second. They
+    are kept in float64 arrays, so the distribution can be analyzed, besides the
+    aggregated values in perf messages.
+    """
+
+    name: str = ""
+    unit: str = ""
+    # seconds since the test started. If it's not given, it's the sample index.
+    timestamps: "array[float]" = field(default_factory=lambda: array("d"))
+    values: "array[float]" = field(default_factory=lambda: array("d"))
+
+    @classmethod
+    def create(
+        cls, name: str, values: Iterable[Union[int, float, Decimal]], unit: str = ""
+    ) -> "PerfSamples":
+        samples = cls(name=name, unit=unit)
+        for value in values:
+            samples.append(value)
+        return samples
+
+    def append(
+        self, value: Union[int, float, Decimal], timestamp: Optional[float] = None
+    ) -> None:
+        if timestamp is None:
+            timestamp = len(self.values)
+        self.timestamps.append(timestamp)
+        self.values.append(float(value))
+
+    def percentile(self, percent: float) -> float:
+        """
+        The percentile is interpolated linearly between the closest samples.
+        """
+        self._check_samples()
+        values = sorted(self.values)
+        position = (len(values) - 1) * percent / 100
+        lower = math.floor(position)
+        upper = math.ceil(position)
+        return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+    def stddev(self) -> float:
+        self._check_samples()
+        return statistics.pstdev(self.values)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __repr__(self) -> str:
+        # the values may be too many to display.
+        return f"PerfSamples(name={self.name}, unit={self.unit}, count={len(self)})"
+
+    def _check_samples(self) -> None:
+        if not self.values:
+            raise LisaException(f"no sample in '{self.name}'")
+
+
 @dataclass
 class PerfMessage(MessageBase):
     type: str = "Performance"
@@ -123,6 +194,8 @@ class PerfMessage(MessageBase):
     test_date: datetime = datetime.utcnow()
     role: str = ""
     test_result_id: str = ""
+    # optional samples of metrics, which are aggregated in the message.
+    samples: List[PerfSamples] = field(default_factory=list)
 
 
 T = TypeVar("T", bound=PerfMessage)
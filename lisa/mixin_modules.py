@@ -1,55 +1,60 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
-# The file imports all the mix-in types that can be initialized
-# using reflection.
-
-import platform
-
-import lisa.combinators.batch_combinator  # noqa: F401
-import lisa.combinators.csv_combinator  # noqa: F401
-import lisa.combinators.grid_combinator  # noqa: F401
-import lisa.notifiers.console  # noqa: F401
-import lisa.notifiers.env_stats  # noqa: F401
-import lisa.notifiers.file  # noqa: F401
-import lisa.notifiers.html  # noqa: F401
-import lisa.notifiers.junit  # noqa: F401
-import lisa.notifiers.text_result  # noqa: F401
-import lisa.runners.lisa_runner  # noqa: F401
-import lisa.sut_orchestrator.ready  # noqa: F401
-
-try:
-    import lisa.runners.legacy_runner  # noqa: F401
-except ModuleNotFoundError:
-    print("win32 package is not installed, legacy runner is not supported.")
-
-# Azure modules
-try:
-    import lisa.sut_orchestrator.azure.hooks  # noqa: F401
-    import lisa.sut_orchestrator.azure.transformers  # noqa: F401
-except ModuleNotFoundError:
-    print("azure package is not installed.")
-
-# Aws modules
-try:
-    import lisa.sut_orchestrator.aws.platform_  # noqa: F401
-except ModuleNotFoundError:
-    print("aws package is not installed.")
-
-
-if platform.system() == "Linux":
-    # libvirt modules
-    try:
-        import lisa.sut_orchestrator.libvirt.ch_platform  # noqa: F401
-        import lisa.sut_orchestrator.libvirt.context  # noqa: F401
-        import lisa.sut_orchestrator.libvirt.platform  # noqa: F401
-        import lisa.sut_orchestrator.libvirt.qemu_platform  # noqa: F401
-        import lisa.sut_orchestrator.libvirt.schema  # noqa: F401
-        import lisa.sut_orchestrator.libvirt.transformers  # noqa: F401
-    except ModuleNotFoundError:
-        print("libvirt package is not installed")
-
-import lisa.transformers.dump_variables  # noqa: F401
-import lisa.transformers.kernel_source_installer  # noqa: F401
-import lisa.transformers.script_transformer  # noqa: F401
-import lisa.transformers.to_list  # noqa: F401
+# The file lists all the mix-in types that can be initialized using reflection.
+# The modules are imported on the first use of a type name, so the startup
+# doesn't pay for notifiers, platforms and their SDKs, which are not used in
+# the runbook.
+
+from typing import Dict
+
+from lisa.util import subclasses
+
+# full name of base type: {type name: module}
+modules: Dict[str, Dict[str, str]] = {
+    "lisa.combinator.Combinator": {
+        "batch": "lisa.combinators.batch_combinator",
+        "csv": "lisa.combinators.csv_combinator",
+        "grid": "lisa.combinators.grid_combinator",
+    },
+    "lisa.notifier.Notifier": {
+        "console": "lisa.notifiers.console",
+        "env_stats": "lisa.notifiers.env_stats",
+        "file": "lisa.notifiers.file",
+        "html": "lisa.notifiers.html",
+        "html_stream": "lisa.notifiers.html_stream",
+        "junit": "lisa.notifiers.junit",
+        "perf_samples": "lisa.notifiers.perf_samples",
+        "text_result": "lisa.notifiers.text_result",
+    },
+    "lisa.runner.BaseRunner": {
+        "lisa": "lisa.runners.lisa_runner",
+        # it needs win32 package.
+        "legacy": "lisa.runners.legacy_runner",
+    },
+    "lisa.platform_.Platform": {
+        "ready": "lisa.sut_orchestrator.ready",
+        "azure": "lisa.sut_orchestrator.azure.platform_",
+        "aws": "lisa.sut_orchestrator.aws.platform_",
+        # libvirt platforms work on Linux only.
+        "cloud-hypervisor": "lisa.sut_orchestrator.libvirt.ch_platform",
+        "qemu": "lisa.sut_orchestrator.libvirt.qemu_platform",
+    },
+    "lisa.transformer.Transformer": {
+        "azure_delete": "lisa.sut_orchestrator.azure.transformers",
+        "azure_deploy": "lisa.sut_orchestrator.azure.transformers",
+        "azure_vhd": "lisa.sut_orchestrator.azure.transformers",
+        "cloudhypervisor_installer": "lisa.sut_orchestrator.libvirt.transformers",
+        "qemu_installer": "lisa.sut_orchestrator.libvirt.transformers",
+        "dump_variables": "lisa.transformers.dump_variables",
+        "kernel_installer": "lisa.transformers.kernel_installer",
+        "script": "lisa.transformers.script_transformer",
+        "to_list": "lisa.transformers.to_list",
+    },
+    "lisa.transformers.kernel_installer.BaseInstaller": {
+        "source": "lisa.transformers.kernel_source_installer",
+    },
+}
+
+for base_type_name, type_modules in modules.items():
+    subclasses.add_lazy_modules(base_type_name, type_modules)
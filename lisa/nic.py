@@ -372,21 +372,18 @@ class Nics(InitializableMixin):
         # This should be really simple with /usr/bin/ip but experience shows
         # the tool isn't super consistent across distros in this regard
 
-        # use sysfs to gather upper/lower nic pairings and pci slot info
-        nic_info_fetch_cmd = "ls -la /sys/class/net/*/lower*/device"
+        # use sysfs to gather upper/lower nic pairings and pci slot info. The
+        # fallback command is sent in the same batch to save a round trip.
         self._node.log.debug(f"Gathering NIC information on {self._node.name}.")
-        result = self._node.execute(
-            nic_info_fetch_cmd,
-            shell=True,
+        result, fallback_result = self._node.execute_batch(
+            [
+                "ls -la /sys/class/net/*/lower*/device",
+                "ls -la /sys/class/net/*/device",
+            ]
         )
         if result.exit_code != 0:
-            nic_info_fetch_cmd = "ls -la /sys/class/net/*/device"
-            result = self._node.execute(
-                nic_info_fetch_cmd,
-                shell=True,
-                expected_exit_code=0,
-                expected_exit_code_failure_message="Could not grab NIC device info.",
-            )
+            result = fallback_result
+            result.assert_exit_code(message="Could not grab NIC device info.")
 
         for line in result.stdout.splitlines():
             sriov_match = self.__nic_lower_regex.search(line)
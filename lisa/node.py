@@ -72,6 +72,7 @@ class Node(subclasses.BaseClassWithRunbookMixin, ContextMixin, InitializableMixi
         self._local_working_path: Optional[Path] = None
         self._support_sudo: Optional[bool] = None
         self._is_dirty: bool = False
+        self._boot_count: int = 0
 
     @property
     def shell(self) -> Shell:
@@ -156,6 +157,11 @@ class Node(subclasses.BaseClassWithRunbookMixin, ContextMixin, InitializableMixi
     def is_dirty(self) -> bool:
         return self._is_dirty
 
+    @property
+    def boot_count(self) -> int:
+        # it's increased after reboots, so the cached information is refreshed.
+        return self._boot_count
+
     @classmethod
     def create(
         cls,
@@ -198,6 +204,7 @@ class Node(subclasses.BaseClassWithRunbookMixin, ContextMixin, InitializableMixi
         update_envs: Optional[Dict[str, str]] = None,
         expected_exit_code: Optional[int] = None,
         expected_exit_code_failure_message: str = "",
+        output_path: Optional[Path] = None,
     ) -> ExecutableResult:
         process = self.execute_async(
             cmd,
@@ -209,6 +216,7 @@ class Node(subclasses.BaseClassWithRunbookMixin, ContextMixin, InitializableMixi
             no_debug_log=no_debug_log,
             cwd=cwd,
             update_envs=update_envs,
+            output_path=output_path,
         )
         return process.wait_result(
             timeout=timeout,
@@ -227,7 +235,11 @@ class Node(subclasses.BaseClassWithRunbookMixin, ContextMixin, InitializableMixi
         no_debug_log: bool = False,
         cwd: Optional[PurePath] = None,
         update_envs: Optional[Dict[str, str]] = None,
+        output_path: Optional[Path] = None,
     ) -> Process:
+        """
+        If output_path is set, the full stdout is saved to the local file.
+        """
         self.initialize()
 
         if sudo and not self.support_sudo:
@@ -245,7 +257,57 @@ class Node(subclasses.BaseClassWithRunbookMixin, ContextMixin, InitializableMixi
             no_debug_log=no_debug_log,
             cwd=cwd,
             update_envs=update_envs,
+            output_path=output_path,
+        )
+
+    def execute_batch(
+        self,
+        cmds: List[str],
+        sudo: bool = False,
+        no_error_log: bool = False,
+        no_info_log: bool = True,
+        no_debug_log: bool = False,
+        cwd: Optional[PurePath] = None,
+        timeout: int = 600,
+        update_envs: Optional[Dict[str, str]] = None,
+    ) -> List[ExecutableResult]:
+        """
+        Run independent shell commands in one remote shell, and return results
+        of each command. Each command runs in a sub shell, so it doesn't impact
+        others. It saves round trips of starting commands one by one.
+        """
+        self.initialize()
+
+        if not self.shell.is_posix:
+            # Windows doesn't support the batch script, run one by one.
+            return [
+                self.execute(
+                    cmd,
+                    shell=True,
+                    sudo=sudo,
+                    no_error_log=no_error_log,
+                    no_info_log=no_info_log,
+                    no_debug_log=no_debug_log,
+                    cwd=cwd,
+                    timeout=timeout,
+                    update_envs=update_envs,
+                )
+                for cmd in cmds
+            ]
+
+        marker = f"lisa_batch_{randint(0, 1000000)}"
+        result = self.execute(
+            _create_batch_script(cmds, marker),
+            shell=True,
+            sudo=sudo,
+            no_error_log=no_error_log,
+            no_info_log=no_info_log,
+            no_debug_log=no_debug_log,
+            cwd=cwd,
+            timeout=timeout,
+            update_envs=update_envs,
         )
+        return _parse_batch_result(result, cmds, marker)
 
     def cleanup(self) -> None:
         self.log.debug("cleaning up...")
@@ -354,6 +416,9 @@ class Node(subclasses.BaseClassWithRunbookMixin, ContextMixin, InitializableMixi
         self.log.debug("mark node to dirty")
         self._is_dirty = True
 
+    def mark_rebooted(self) -> None:
+        self._boot_count += 1
+
     def test_connection(self) -> bool:
         try:
             self.execute("date")
@@ -393,6 +458,7 @@ class Node(subclasses.BaseClassWithRunbookMixin, ContextMixin, InitializableMixi
         no_debug_log: bool = False,
         cwd: Optional[PurePath] = None,
         update_envs: Optional[Dict[str, str]] = None,
+        output_path: Optional[Path] = None,
     ) -> Process:
         cmd_id = str(randint(0, 10000))
         process = Process(cmd_id, self.shell, parent_logger=self.log)
@@ -406,6 +472,7 @@ class Node(subclasses.BaseClassWithRunbookMixin, ContextMixin, InitializableMixi
             no_debug_log=no_debug_log,
             cwd=cwd,
             update_envs=update_envs,
+            output_path=output_path,
         )
         return process
 
@@ -656,6 +723,71 @@ class Nodes:
         run_in_parallel([x.check_kernel_panic for x in self._list])
 
 
+def _create_batch_script(cmds: List[str], marker: str) -> str:
+    # stdout and stderr are mixed in pty, so stderr of each command is saved to
+    # a file, and printed after stdout. Markers start with a new line, in case
+    # the output doesn't end with it.
+    lines = [f'lisa_stderr="${{TMPDIR:-/tmp}}/{marker}.err"']
+    for index, cmd in enumerate(cmds):
+        lines += [
+            f"printf '\\n{marker}:stdout:{index}\\n'",
+            "lisa_start=$(date +%s%N)",
+            f'( {cmd}\n) 2>"$lisa_stderr"',
+            "lisa_exit_code=$?",
+            "lisa_end=$(date +%s%N)",
+            f"printf '\\n{marker}:stderr:{index}\\n'",
+            '[ -s "$lisa_stderr" ] && cat "$lisa_stderr"',
+            f"printf '\\n{marker}:end:{index}:%s:%s:%s\\n' "
+            '"$lisa_exit_code" "$lisa_start" "$lisa_end"',
+        ]
+    lines.append('rm -f "$lisa_stderr"')
+    return "\n".join(lines)
+
+
+def _parse_batch_result(
+    result: ExecutableResult, cmds: List[str], marker: str
+) -> List[ExecutableResult]:
+    outputs: Dict[str, List[str]] = {}
+    current: Optional[List[str]] = None
+    results: List[ExecutableResult] = []
+    for line in result.stdout.splitlines():
+        if not line.startswith(f"{marker}:"):
+            if current is not None:
+                current.append(line)
+            continue
+
+        parts = line.split(":")
+        section = parts[1]
+        if section == "end":
+            exit_code, start, end = parts[3:6]
+            if start.isdigit() and end.isdigit():
+                elapsed = (int(end) - int(start)) / 1000000000
+            else:
+                # date doesn't support nanoseconds, use the total time.
+                elapsed = result.elapsed
+            results.append(
+                ExecutableResult(
+                    stdout="\n".join(outputs["stdout"]).strip(),
+                    stderr="\n".join(outputs["stderr"]).strip(),
+                    exit_code=int(exit_code),
+                    cmd=cmds[len(results)],
+                    elapsed=elapsed,
+                )
+            )
+            current = None
+        else:
+            current = outputs.setdefault(section, [])
+            current.clear()
+
+    if len(results) != len(cmds):
+        raise LisaException(
+            f"expected {len(cmds)} results of batch commands, "
+            f"but got {len(results)}. exit code: {result.exit_code}, "
+            f"stderr: {result.stderr}"
+        )
+    return results
+
+
 def local_node_connect(
     index: int = -1,
     name: str = "local",
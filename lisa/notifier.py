@@ -5,18 +5,30 @@ import copy
 import threading
 from datetime import datetime
 from functools import partial
+from queue import Full, Queue
 from typing import Any, Dict, List, Optional, Type
 
 from lisa import schema
 from lisa.messages import MessageBase
 from lisa.util import InitializableMixin, constants, subclasses
 from lisa.util.logger import get_logger
-from lisa.util.parallel import run_in_parallel
 
 _get_init_logger = partial(get_logger, "init", "notifier")
 
 
 class Notifier(subclasses.BaseClassWithRunbookMixin, InitializableMixin):
+    """
+    Messages are delivered in a worker thread of each notifier, in the order of
+    notifying. The same message object is shared by all notifiers, so it
+    shouldn't be modified.
+    """
+
+    # the max count of messages, which wait for the notifier. When the queue is
+    # full, the producer waits, or the message is dropped if drop_on_full is
+    # True.
+    queue_size: int = 1000
+    drop_on_full: bool = False
+
     def __init__(self, runbook: schema.TypedSchema) -> None:
         super().__init__(runbook=runbook)
         self._log = get_logger("notifier", self.__class__.__name__)
@@ -50,12 +62,65 @@ class Notifier(subclasses.BaseClassWithRunbookMixin, InitializableMixin):
         pass
 
 
+class _NotifierWorker:
+    """
+    It delivers messages to a notifier in a dedicated thread, so producers, like
+    test cases, are not blocked by slow notifiers.
+    """
+
+    def __init__(self, notifier: Notifier) -> None:
+        self.notifier = notifier
+        self.dropped_count = 0
+        self._queue: "Queue[Optional[MessageBase]]" = Queue(maxsize=notifier.queue_size)
+        self._thread = threading.Thread(
+            target=self._run, name=f"notifier-{notifier.type_name()}", daemon=True
+        )
+        self._thread.start()
+
+    def put(self, message: MessageBase) -> None:
+        # if a notifier sends messages to itself, it cannot wait for itself.
+        block = (
+            not self.notifier.drop_on_full
+            and threading.current_thread() != self._thread
+        )
+        try:
+            self._queue.put(message, block=block)
+        except Full:
+            self.dropped_count += 1
+            self.notifier._log.debug(
+                f"queue is full, dropped message [{message.type}]. "
+                f"dropped count: {self.dropped_count}"
+            )
+
+    def flush(self) -> None:
+        if threading.current_thread() != self._thread:
+            self._queue.join()
+
+    def stop(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            message = self._queue.get()
+            try:
+                if message is None:
+                    break
+                self.notifier._received_message(message=message)
+            except Exception as identifier:
+                self.notifier._log.exception(
+                    f"failed on message [{message.type if message else ''}]",
+                    exc_info=identifier,
+                )
+            finally:
+                self._queue.task_done()
+
+
 _notifiers: List[Notifier] = []
-_messages: Dict[type, List[Notifier]] = {}
-# prevent concurrent message conflict.
-_message_queue: List[MessageBase] = []
-_message_queue_lock = threading.Lock()
-_notifying_lock = threading.Lock()
+_workers: List[_NotifierWorker] = []
+_messages: Dict[type, List[_NotifierWorker]] = {}
+# protect subscriptions, which may be registered during notifying.
+_message_lock = threading.Lock()
 _system_notifiers = [constants.NOTIFIER_CONSOLE, constants.NOTIFIER_FILE]
 
 
@@ -85,15 +150,18 @@ def register_notifier(notifier: Notifier) -> None:
     """
     notifier.initialize()
 
+    worker = _NotifierWorker(notifier)
     _notifiers.append(notifier)
+    _workers.append(worker)
     subscribed_message_types: List[
         Type[MessageBase]
     ] = notifier._subscribed_message_type()
 
-    for message_type in subscribed_message_types:
-        registered_notifiers = _messages.get(message_type, [])
-        registered_notifiers.append(notifier)
-        _messages[message_type] = registered_notifiers
+    with _message_lock:
+        for message_type in subscribed_message_types:
+            registered_workers = _messages.get(message_type, [])
+            registered_workers.append(worker)
+            _messages[message_type] = registered_workers
 
     log = _get_init_logger()
     log.debug(
@@ -105,36 +173,38 @@ def register_notifier(notifier: Notifier) -> None:
 def notify(message: MessageBase) -> None:
     message.time = datetime.utcnow()
 
-    # to make sure message get order as possible, use a queue to hold messages.
-    with _message_queue_lock:
-        _message_queue.append(message)
-    while len(_message_queue) > 0:
-        # send message one by one
-        with _notifying_lock:
-            with _message_queue_lock:
-                current_message: Optional[MessageBase] = None
-                if len(_message_queue) > 0:
-                    current_message = _message_queue.pop()
-            if current_message:
-                message_types = type(current_message).__mro__
-                for message_type in message_types:
-                    notifiers = _messages.get(message_type, [])
-                    if notifiers:
-                        run_in_parallel(
-                            [
-                                partial(
-                                    x._received_message,
-                                    message=copy.deepcopy(current_message),
-                                )
-                                for x in notifiers
-                            ]
-                        )
-                    if message_type == MessageBase:
-                        # skip the object type
-                        break
+    workers: List[_NotifierWorker] = []
+    with _message_lock:
+        for message_type in type(message).__mro__:
+            workers.extend(_messages.get(message_type, []))
+            if message_type == MessageBase:
+                # skip the object type
+                break
+    if not workers:
+        return
+
+    # The message may be changed by the producer after notified. Copy it once,
+    # and share the snapshot with all notifiers.
+    snapshot = copy.deepcopy(message)
+    for worker in workers:
+        worker.put(snapshot)
+
+
+def flush() -> None:
+    """
+    Wait until all notified messages are handled by notifiers.
+    """
+    for worker in _workers:
+        worker.flush()
 
 
 def finalize() -> None:
+    flush()
+    for worker in _workers:
+        worker.stop()
+    _workers.clear()
+    _messages.clear()
+
     for notifier in _notifiers:
         try:
             notifier.finalize()
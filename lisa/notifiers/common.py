@@ -1,14 +1,20 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
+from dataclasses import replace
+
 from lisa.messages import MessageBase, TestResultMessage
 
 
-def simplify_message(message: MessageBase) -> None:
+def simplify_message(message: MessageBase) -> MessageBase:
     """
-    This method is to reduce message length for display purpose.
+    This method is to reduce message length for display purpose. The message is
+    shared with other notifiers, so a simplified copy is returned.
     """
     if isinstance(message, TestResultMessage):
         # The description of test result is too long to display. Hide it for
         # log readability.
         description = message.information.get("description", "")
-        message.information["description"] = f"<{len(description)} bytes>"
+        information = message.information.copy()
+        information["description"] = f"<{len(description)} bytes>"
+        message = replace(message, information=information)
+    return message
@@ -1,15 +1,15 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import threading
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Optional, TextIO, Type
+from typing import IO, Any, Dict, List, Optional, TextIO, Type
 
 from lisa import messages, notifier, schema
 from lisa.environment import EnvironmentMessage, EnvironmentStatus
 from lisa.messages import TestResultMessage
 from lisa.util import LisaException, constants
-from lisa.util.perf_timer import create_timer
 
 
 @dataclass
@@ -43,6 +43,10 @@ class EnvironmentStats(notifier.Notifier):
     """
     This notifier uses to troubleshoot the environment lifecycle, and which test
     cases are run on which environment.
+
+    Each change is appended to the event log, when the message is received. The
+    summary is rewritten by a background thread periodically, if there is any
+    change. So the time of handling a message doesn't grow with the run.
     """
 
     @classmethod
@@ -54,7 +58,10 @@ class EnvironmentStats(notifier.Notifier):
         return schema.Notifier
 
     def finalize(self) -> None:
-        self._update_information(True)
+        self._stop_event.set()
+        self._summary_thread.join()
+        self._write_summary()
+        self._event_file.close()
 
     def _received_message(self, message: messages.MessageBase) -> None:
         if isinstance(message, TestResultMessage):
@@ -71,65 +78,116 @@ class EnvironmentStats(notifier.Notifier):
         env_path = constants.RUN_LOCAL_LOG_PATH / "environments"
         env_path.mkdir(exist_ok=True, parents=True)
         self._file_path = env_path / "environment_stats.log"
+        self._event_file: IO[str] = open(env_path / "environment_events.log", "w")
 
-        self._last_updated_time = create_timer()
-        # result update at most 1 time per second
-        self._update_frequency = 1
+        # summary is updated at most 1 time per second
+        self._update_frequency: float = 1
         self._test_results: Dict[str, TestResultInformation] = {}
         self._environments: Dict[str, EnvironmentInformation] = {}
 
+        # protect information between message handling and the summary thread.
+        self._lock = threading.Lock()
+        self._is_changed = False
+        self._stop_event = threading.Event()
+        self._summary_thread = threading.Thread(
+            target=self._update_summary, name="env_stats-summary", daemon=True
+        )
+        self._summary_thread.start()
+
     def _process_test_result_message(self, test_result: TestResultMessage) -> None:
-        result_info = self._test_results.get(test_result.id_, None)
-        if not result_info:
-            result_info = TestResultInformation(
-                id=test_result.id_, name=test_result.full_name
-            )
-            self._test_results[test_result.id_] = result_info
-        result_info.status = str(test_result.status)
-        env_name = test_result.information.get("environment", "")
-        if env_name:
-            environment_info = self._environments.get(env_name, None)
-            assert (
-                environment_info
-            ), f"cannot find environment for test result: {test_result}"
-            result_info.environment = env_name
-            if result_info not in environment_info.results:
+        with self._lock:
+            result_info = self._test_results.get(test_result.id_, None)
+            if not result_info:
+                result_info = TestResultInformation(
+                    id=test_result.id_, name=test_result.full_name
+                )
+                self._test_results[test_result.id_] = result_info
+            status = str(test_result.status)
+            env_name = test_result.information.get("environment", "")
+            if status == result_info.status and env_name in (
+                "",
+                result_info.environment,
+            ):
+                return
+
+            result_info.status = status
+            if env_name and env_name != result_info.environment:
+                environment_info = self._environments.get(env_name, None)
+                assert (
+                    environment_info
+                ), f"cannot find environment for test result: {test_result}"
+                result_info.environment = env_name
                 environment_info.results.append(result_info)
+            self._is_changed = True
 
-        self._update_information()
+        self._write_event(
+            "result",
+            result_info.id,
+            result_info.status,
+            f"{result_info.name} {result_info.environment}",
+        )
 
     def _process_environment_message(self, environment: EnvironmentMessage) -> None:
-        env_info = self._environments.get(environment.name, None)
-        if not env_info:
-            env_info = EnvironmentInformation(
-                name=environment.name,
-                status=environment.status.name,
-                information=str(environment.runbook),
-            )
-            self._environments[environment.name] = env_info
-
-        env_info.status = environment.status.name
-        if environment.status == EnvironmentStatus.Prepared:
-            env_info.prepared_time = datetime.now()
-        elif environment.status == EnvironmentStatus.Deployed:
-            env_info.deployed_time = datetime.now()
-        elif environment.status == EnvironmentStatus.Deleted:
-            env_info.deleted_time = datetime.now()
-
-        self._update_information(force=True)
-
-    def _update_information(self, force: bool = False) -> None:
-        if self._last_updated_time.elapsed(False) > self._update_frequency or force:
-            with open(self._file_path, "w") as f:
-                self._dump_environments(f)
-            self._last_updated_time = create_timer()
-
-    def _dump_environments(self, f: TextIO) -> None:
+        information = ""
+        with self._lock:
+            env_info = self._environments.get(environment.name, None)
+            if not env_info:
+                env_info = EnvironmentInformation(
+                    name=environment.name,
+                    status=environment.status.name,
+                    information=str(environment.runbook),
+                )
+                self._environments[environment.name] = env_info
+                information = env_info.information
+
+            env_info.status = environment.status.name
+            if environment.status == EnvironmentStatus.Prepared:
+                env_info.prepared_time = datetime.now()
+            elif environment.status == EnvironmentStatus.Deployed:
+                env_info.deployed_time = datetime.now()
+            elif environment.status == EnvironmentStatus.Deleted:
+                env_info.deleted_time = datetime.now()
+            self._is_changed = True
+
+        self._write_event("environment", env_info.name, env_info.status, information)
+
+    def _write_event(self, kind: str, name: str, status: str, detail: str) -> None:
+        self._event_file.write(
+            f"{datetime.now():%Y-%m-%d %H:%M:%S.%f} {kind:<12} {name:<20} "
+            f"{status:<20} {detail}\n"
+        )
+        self._event_file.flush()
+
+    def _update_summary(self) -> None:
+        while not self._stop_event.wait(self._update_frequency):
+            try:
+                self._write_summary()
+            except Exception as identifier:
+                self._log.exception("failed to write summary", exc_info=identifier)
+
+    def _write_summary(self) -> None:
+        with self._lock:
+            if not self._is_changed:
+                return
+            self._is_changed = False
+            # copy to release the lock soon, the fields are read without lock.
+            environments = list(self._environments.values())
+            test_results = list(self._test_results.values())
+
+        with open(self._file_path, "w") as f:
+            self._dump_environments(f, environments, test_results)
+
+    def _dump_environments(
+        self,
+        f: TextIO,
+        environments: List[EnvironmentInformation],
+        test_results: List[TestResultInformation],
+    ) -> None:
         f.write(
             f"{'name':<15} {'status':<15} {'prepared_time':<30} {'deployed_time':<30} "
             f"{'deleted_time':<30} results\n"
         )
-        for env_result in self._environments.values():
+        for env_result in environments:
             f.write(
                 f"{env_result.name:<15} {env_result.status:<15} "
                 f"{str(env_result.prepared_time):<30} "
@@ -139,10 +197,10 @@ class EnvironmentStats(notifier.Notifier):
             )
         f.write("\n")
 
-        for env_result in self._environments.values():
+        for env_result in environments:
             f.write(f"{env_result.name}\t{env_result.information}\n")
         f.write("\n")
 
-        for test_result in self._test_results.values():
+        for test_result in test_results:
             f.write(f"{test_result.id:<20} {test_result.name:<30} {test_result}\n")
         f.write("\n")
@@ -37,7 +37,7 @@ class Console(notifier.Notifier):
         return super().finalize()
 
     def _received_message(self, message: messages.MessageBase) -> None:
-        simplify_message(message)
+        message = simplify_message(message)
         # write every time to refresh the content immediately.
         with open(self._file_path, "a") as f:
             f.write(f"{datetime.now():%Y-%m-%d %H:%M:%S.%ff}: {message}\n")
@@ -0,0 +1,259 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import json
+import os
+from dataclasses import dataclass
+from typing import IO, Any, Dict, List, Type, cast
+
+from dataclasses_json import dataclass_json
+
+from lisa import schema
+from lisa.messages import (
+    MessageBase,
+    SubTestMessage,
+    TestResultMessage,
+    TestResultMessageBase,
+    TestRunMessage,
+    TestRunStatus,
+)
+from lisa.notifier import Notifier
+from lisa.util import LisaException, constants
+from lisa.util.perf_timer import create_timer
+
+_DATA_PLACEHOLDER = "__LISA_REPORT_DATA__"
+
+# The rows are embedded as NDJSON, and rendered by the page itself. So only the
+# current page of filtered rows are in the DOM.
+_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>LISA report</title>
+<style>
+body { font-family: sans-serif; font-size: 14px; margin: 16px; }
+table { border-collapse: collapse; width: 100%; }
+th, td { border: 1px solid #ccc; padding: 4px; text-align: left;
+  vertical-align: top; }
+td pre { margin: 0; white-space: pre-wrap; max-height: 200px; overflow: auto; }
+.PASSED { color: green; } .FAILED { color: red; } .SKIPPED { color: orange; }
+#summary span { margin-right: 16px; }
+#controls { margin: 8px 0; }
+</style>
+</head>
+<body>
+<h2 id="title">LISA report</h2>
+<div id="information"></div>
+<div id="summary"></div>
+<div id="controls">
+<select id="status"><option value="">all status</option></select>
+<input id="filter" placeholder="filter by text" size="40">
+<button id="previous">&lt;</button> <span id="page"></span>
+<button id="next">&gt;</button>
+</div>
+<table>
+<thead><tr><th>id</th><th>suite</th><th>name</th><th>status</th><th>elapsed</th>
+<th>message</th><th>information</th></tr></thead>
+<tbody id="results"></tbody>
+</table>
+<script id="data" type="application/x-ndjson">
+__LISA_REPORT_DATA__</script>
+<script>
+const pageSize = __LISA_PAGE_SIZE__;
+const rows = document.getElementById("data").textContent.split("\\n")
+  .filter((x) => x.trim()).map((x) => JSON.parse(x));
+const run = Object.assign({}, ...rows.filter((x) => x.type === "run"));
+const results = rows.filter((x) => x.type !== "run");
+let filtered = results;
+let page = 0;
+
+function addText(parent, tag, text, className) {
+  const element = document.createElement(tag);
+  element.textContent = text;
+  if (className) element.className = className;
+  parent.appendChild(element);
+  return element;
+}
+
+function render() {
+  const pageCount = Math.max(1, Math.ceil(filtered.length / pageSize));
+  page = Math.min(Math.max(page, 0), pageCount - 1);
+  document.getElementById("page").textContent =
+    `${page + 1} / ${pageCount} (${filtered.length} results)`;
+  const body = document.getElementById("results");
+  body.replaceChildren();
+  for (const row of filtered.slice(page * pageSize, (page + 1) * pageSize)) {
+    const tr = document.createElement("tr");
+    addText(tr, "td", row.id);
+    addText(tr, "td", row.suite);
+    addText(tr, "td", row.name);
+    addText(tr, "td", row.status, row.status);
+    addText(tr, "td", row.elapsed.toFixed(3));
+    addText(addText(tr, "td", ""), "pre", row.message);
+    const information = Object.entries(row.information || {});
+    addText(addText(tr, "td", ""), "pre",
+      information.map(([key, value]) => `${key}: ${value}`).join("\\n"));
+    body.appendChild(tr);
+  }
+}
+
+function applyFilter() {
+  const status = document.getElementById("status").value;
+  const text = document.getElementById("filter").value.toLowerCase();
+  filtered = results.filter((x) => (!status || x.status === status) &&
+    (!text || JSON.stringify(x).toLowerCase().includes(text)));
+  page = 0;
+  render();
+}
+
+document.getElementById("title").textContent = run.name || "LISA report";
+const information = document.getElementById("information");
+for (const key of ["test_project", "test_pass", "tags", "status", "elapsed"]) {
+  if (run[key]) addText(information, "div", `${key}: ${run[key]}`);
+}
+const counts = {};
+for (const row of results) counts[row.status] = (counts[row.status] || 0) + 1;
+const summary = document.getElementById("summary");
+const statusSelect = document.getElementById("status");
+for (const [status, count] of Object.entries(counts)) {
+  addText(summary, "span", `${status}: ${count}`, status);
+  addText(statusSelect, "option", status).value = status;
+}
+statusSelect.onchange = applyFilter;
+document.getElementById("filter").oninput = applyFilter;
+document.getElementById("previous").onclick = () => { page--; render(); };
+document.getElementById("next").onclick = () => { page++; render(); };
+render();
+</script>
+</body>
+</html>
+"""
+
+
+@dataclass_json()
+@dataclass
+class HtmlStreamSchema(schema.Notifier):
+    path: str = "lisa_report.html"
+    # the results are appended to this file, when they are completed.
+    data_path: str = "lisa_report.ndjson"
+    page_size: int = 100
+    # the html report is rendered at most once in the interval (in seconds)
+    # during the run, so it can be viewed before the run is completed.
+    render_interval: float = 60
+    """
+    open html report in browser for convenient at local
+    """
+    auto_open: bool = False
+
+
+class HtmlStream(Notifier):
+    """
+    It writes results to a NDJSON file during the run, and renders a static html
+    page from it. Unlike the html notifier, results are not kept in memory, and
+    rendering only copies the written rows into the page.
+    """
+
+    @classmethod
+    def type_name(cls) -> str:
+        return "html_stream"
+
+    @classmethod
+    def type_schema(cls) -> Type[schema.TypedSchema]:
+        return HtmlStreamSchema
+
+    def finalize(self) -> None:
+        runbook = cast(HtmlStreamSchema, self.runbook)
+        try:
+            self._render()
+        finally:
+            self._data_file.close()
+        self._log.info(f"report: {self._report_path}")
+        if runbook.auto_open:
+            import webbrowser
+
+            webbrowser.open(f"file://{self._report_path}")
+
+    def _received_message(self, message: MessageBase) -> None:
+        if isinstance(message, TestRunMessage):
+            self._received_test_run(message)
+        elif isinstance(message, (TestResultMessage, SubTestMessage)):
+            self._received_test_result(message)
+        else:
+            raise LisaException(f"received unknown message type: {message}")
+
+        runbook = cast(HtmlStreamSchema, self.runbook)
+        if self._render_timer.elapsed(False) > runbook.render_interval:
+            self._render()
+
+    def _received_test_run(self, message: TestRunMessage) -> None:
+        row: Dict[str, Any] = {"type": "run", "status": message.status.name}
+        if message.status == TestRunStatus.INITIALIZING:
+            row.update(
+                {
+                    "name": message.run_name,
+                    "test_project": message.test_project,
+                    "test_pass": message.test_pass,
+                    "tags": message.tags,
+                }
+            )
+        elif message.status in [TestRunStatus.SUCCESS, TestRunStatus.FAILED]:
+            row["elapsed"] = f"{message.elapsed:.3f}"
+            row["message"] = message.message
+        self._write_row(row)
+
+    def _received_test_result(self, message: TestResultMessageBase) -> None:
+        if isinstance(message, TestResultMessage):
+            suite = message.suite_full_name
+            self._suites[message.id_] = suite
+        else:
+            suite = self._suites.get(message.id_, "")
+        if not message.is_completed:
+            return
+
+        self._write_row(
+            {
+                "type": message.type,
+                "id": message.id_,
+                "suite": suite,
+                "name": message.name,
+                "status": message.status.name,
+                "elapsed": message.elapsed,
+                "message": message.message,
+                "information": message.information,
+            }
+        )
+
+    def _subscribed_message_type(self) -> List[Type[MessageBase]]:
+        return [TestResultMessage, SubTestMessage, TestRunMessage]
+
+    def _initialize(self, *args: Any, **kwargs: Any) -> None:
+        runbook = cast(HtmlStreamSchema, self.runbook)
+        self._report_path = constants.RUN_LOCAL_LOG_PATH / runbook.path
+        self._data_path = constants.RUN_LOCAL_LOG_PATH / runbook.data_path
+        self._data_file: IO[str] = open(self._data_path, "w", encoding="utf-8")
+        # the suite names of test results, which are used by sub tests.
+        self._suites: Dict[str, str] = {}
+        self._render()
+
+    def _write_row(self, row: Dict[str, Any]) -> None:
+        # "<" is escaped, so the row can be embedded in the page directly.
+        line = json.dumps(row, default=str).replace("<", "\\u003c")
+        self._data_file.write(f"{line}\n")
+        self._data_file.flush()
+
+    def _render(self) -> None:
+        runbook = cast(HtmlStreamSchema, self.runbook)
+        with open(self._data_path, "r", encoding="utf-8") as data_file:
+            data = data_file.read()
+        prefix, suffix = _PAGE_TEMPLATE.replace(
+            "__LISA_PAGE_SIZE__", str(runbook.page_size)
+        ).split(_DATA_PLACEHOLDER)
+
+        # write to a temp file, so the report is complete when it's opened.
+        temp_path = self._report_path.with_name(f"{self._report_path.name}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as report_file:
+            report_file.write(prefix)
+            report_file.write(data)
+            report_file.write(suffix)
+        os.replace(temp_path, self._report_path)
+        self._render_timer = create_timer()
@@ -26,6 +26,18 @@ from lisa.util import LisaException, constants
 @dataclass
 class JUnitSchema(schema.Notifier):
     path: str = "lisa.junit.xml"
+    # If it's true, a test suite is appended to the report, once its running
+    # test cases are completed. So only running test suites are kept in memory.
+    # If more test cases of the suite run later, they are in another test suite
+    # element with the same name.
+    streaming: bool = False
+
+
+_XML_DECLARATION = b"<?xml version='1.0' encoding='utf-8'?>\n"
+_TESTSUITES_END_TAG = "</testsuites>"
+# the start tag of testsuites is updated in place, so the space is reserved for
+# the attributes.
+_HEADER_RESERVED_SIZE = 512
 
 
 class _TestSuiteInfo:
@@ -33,6 +45,7 @@ class _TestSuiteInfo:
         self.xml: ET.Element
         self.test_count: int = 0
         self.failed_count: int = 0
+        self.running_count: int = 0
 
 
 class _TestCaseInfo:
@@ -65,14 +78,22 @@ class JUnit(Notifier):
         self._testcases_info: Dict[str, _TestCaseInfo]
         self._xml_tree: ET.ElementTree
 
+        # the counts of test suites, which are written in streaming mode.
+        self._closed_test_count: int = 0
+        self._closed_failed_count: int = 0
+        # the positions of test suites, and the end tag in the report file.
+        self._testsuites_offset: int = 0
+        self._end_tag_offset: int = 0
+
     # Test runner is initializing.
     def _initialize(self, *args: Any, **kwargs: Any) -> None:
         runbook: JUnitSchema = cast(JUnitSchema, self.runbook)
 
         self._report_path = constants.RUN_LOCAL_LOG_PATH / runbook.path
+        self._streaming = runbook.streaming
 
         # Open file now, to avoid errors occuring after all the tests have completed.
-        self._report_file = open(self._report_path, "wb")
+        self._report_file = open(self._report_path, "w+b")
 
         self._testsuites = ET.Element("testsuites")
         self._xml_tree = ET.ElementTree(self._testsuites)
@@ -80,6 +101,9 @@ class JUnit(Notifier):
         self._testsuites_info = {}
         self._testcases_info = {}
 
+        if self._streaming:
+            self._write_header()
+
     # Test runner is closing.
     def finalize(self) -> None:
         try:
@@ -91,6 +115,12 @@ class JUnit(Notifier):
         self._log.info(f"JUnit: {self._report_path}")
 
     def _write_results(self) -> None:
+        if self._streaming:
+            # the written test suites are not changed, only the header is
+            # updated.
+            self._write_header()
+            return
+
         self._report_file.truncate(0)
         self._report_file.seek(0)
         self._xml_tree.write(self._report_file, xml_declaration=True, encoding="utf-8")
@@ -141,16 +171,21 @@ class JUnit(Notifier):
     # Test run started message.
     def _test_run_started(self, message: TestRunMessage) -> None:
         self._testsuites.attrib["name"] = message.runbook_name
+        if self._streaming:
+            self._write_header()
 
     # Test run completed message.
     def _test_run_completed(self, message: TestRunMessage) -> None:
-        total_tests = 0
-        total_failures = 0
+        if self._streaming:
+            # write test suites, which are not completed.
+            for suite_full_name in list(self._testsuites_info.keys()):
+                self._close_testsuite(suite_full_name)
+
+        total_tests = self._closed_test_count
+        total_failures = self._closed_failed_count
 
         for testsuite_info in self._testsuites_info.values():
-            testsuite_info.xml.attrib["tests"] = str(testsuite_info.test_count)
-            testsuite_info.xml.attrib["failures"] = str(testsuite_info.failed_count)
-            testsuite_info.xml.attrib["errors"] = "0"
+            self._set_testsuite_counts(testsuite_info)
 
             total_tests += testsuite_info.test_count
             total_failures += testsuite_info.failed_count
@@ -167,7 +202,11 @@ class JUnit(Notifier):
             # Add test suite.
             testsuite_info = _TestSuiteInfo()
 
-            testsuite_info.xml = ET.SubElement(self._testsuites, "testsuite")
+            if self._streaming:
+                # it's written separately, when it's closed.
+                testsuite_info.xml = ET.Element("testsuite")
+            else:
+                testsuite_info.xml = ET.SubElement(self._testsuites, "testsuite")
             testsuite_info.xml.attrib["name"] = message.suite_full_name
 
             # Timestamp must not contain timezone information.
@@ -179,6 +218,8 @@ class JUnit(Notifier):
             # Write out current results to file.
             self._write_results()
 
+        self._testsuites_info[message.suite_full_name].running_count += 1
+
         # Initialize test-case info.
         testcase_info = _TestCaseInfo()
         testcase_info.suite_full_name = message.suite_full_name
@@ -214,6 +255,13 @@ class JUnit(Notifier):
             message, message.suite_full_name, message.suite_full_name, elapsed
         )
 
+        testsuite_info = self._testsuites_info[message.suite_full_name]
+        testsuite_info.running_count -= 1
+        if self._streaming:
+            del self._testcases_info[message.id_]
+            if testsuite_info.running_count <= 0:
+                self._close_testsuite(message.suite_full_name)
+
     # Sub test case started message.
     def _sub_test_case_running(self, message: SubTestMessage) -> None:
         testcase_info = self._testcases_info[message.id_]
@@ -295,8 +343,62 @@ class JUnit(Notifier):
 
         testsuite_info.test_count += 1
 
-        # Write out current results to file.
-        self._write_results()
+        # Write out current results to file. In streaming mode, results are
+        # written when the test suite is closed.
+        if not self._streaming:
+            self._write_results()
+
+    def _set_testsuite_counts(self, testsuite_info: _TestSuiteInfo) -> None:
+        testsuite_info.xml.attrib["tests"] = str(testsuite_info.test_count)
+        testsuite_info.xml.attrib["failures"] = str(testsuite_info.failed_count)
+        testsuite_info.xml.attrib["errors"] = "0"
+
+    def _close_testsuite(self, suite_full_name: str) -> None:
+        testsuite_info = self._testsuites_info.pop(suite_full_name)
+        self._set_testsuite_counts(testsuite_info)
+        self._closed_test_count += testsuite_info.test_count
+        self._closed_failed_count += testsuite_info.failed_count
+
+        # overwrite the end tag, and append it again. So the report is a valid
+        # document after each test suite is written.
+        content = ET.tostring(testsuite_info.xml, encoding="unicode")
+        self._report_file.seek(self._end_tag_offset)
+        self._report_file.write(f"{content}\n".encode("utf-8"))
+        self._end_tag_offset = self._report_file.tell()
+        self._write_end_tag()
+
+    def _write_header(self) -> None:
+        start_tag = ET.tostring(
+            self._testsuites, encoding="unicode", short_empty_elements=False
+        )
+        assert start_tag.endswith(_TESTSUITES_END_TAG)
+        header = _XML_DECLARATION + start_tag[: -len(_TESTSUITES_END_TAG)].encode(
+            "utf-8"
+        )
+
+        if len(header) >= self._testsuites_offset:
+            # there is no enough space for the header, so move written test
+            # suites backward.
+            self._report_file.seek(self._testsuites_offset)
+            testsuites = self._report_file.read(
+                self._end_tag_offset - self._testsuites_offset
+            )
+            self._testsuites_offset = len(header) + _HEADER_RESERVED_SIZE
+            self._end_tag_offset = self._testsuites_offset + len(testsuites)
+            self._report_file.seek(self._testsuites_offset)
+            self._report_file.write(testsuites)
+            self._write_end_tag()
+
+        # the reserved space is filled by whitespaces.
+        self._report_file.seek(0)
+        self._report_file.write(header.ljust(self._testsuites_offset - 1) + b"\n")
+        self._report_file.flush()
+
+    def _write_end_tag(self) -> None:
+        self._report_file.seek(self._end_tag_offset)
+        self._report_file.write(f"{_TESTSUITES_END_TAG}\n".encode("utf-8"))
+        self._report_file.truncate()
+        self._report_file.flush()
 
     def _get_elapsed_str(self, elapsed: float) -> str:
         return f"{elapsed:.3f}"
@@ -0,0 +1,93 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import json
+import sys
+from array import array
+from dataclasses import dataclass, field
+from typing import IO, Any, List, Type, cast
+
+from dataclasses_json import dataclass_json
+
+from lisa import messages, notifier, schema
+from lisa.util import constants
+
+
+@dataclass_json()
+@dataclass
+class PerfSamplesSchema(schema.Notifier):
+    # the float64 columns of timestamps and values, in little endian.
+    data_file_name: str = "perf_samples.bin"
+    # one line for each samples, with its position in the data file.
+    index_file_name: str = "perf_samples.ndjson"
+    # the percentiles are calculated in the index.
+    percentiles: List[float] = field(default_factory=lambda: [50, 90, 99])
+
+
+class PerfSamplesDump(notifier.Notifier):
+    """
+    It dumps samples of perf messages in a columnar format. The columns of a
+    samples can be loaded by the offset and count in the index, for example,
+    numpy.fromfile(path, dtype="<f8", count=count, offset=values_offset).
+    """
+
+    @classmethod
+    def type_name(cls) -> str:
+        return "perf_samples"
+
+    @classmethod
+    def type_schema(cls) -> Type[schema.TypedSchema]:
+        return PerfSamplesSchema
+
+    def finalize(self) -> None:
+        self._data_file.close()
+        self._index_file.close()
+
+    def _received_message(self, message: messages.MessageBase) -> None:
+        assert isinstance(message, messages.PerfMessage), f"{type(message)}"
+        for samples in message.samples:
+            if not samples.values:
+                continue
+            timestamps_offset = self._write_column(samples.timestamps)
+            values_offset = self._write_column(samples.values)
+            index = {
+                "tool": message.tool,
+                "test_case_name": message.test_case_name,
+                "test_result_id": message.test_result_id,
+                "role": message.role,
+                "type": type(message).__name__,
+                "name": samples.name,
+                "unit": samples.unit,
+                "count": len(samples),
+                "timestamps_offset": timestamps_offset,
+                "values_offset": values_offset,
+                "stddev": samples.stddev(),
+                "percentiles": {
+                    f"p{x:g}": samples.percentile(x) for x in self._percentiles
+                },
+            }
+            self._index_file.write(f"{json.dumps(index)}\n")
+
+        self._data_file.flush()
+        self._index_file.flush()
+
+    def _subscribed_message_type(self) -> List[Type[messages.MessageBase]]:
+        return [messages.PerfMessage]
+
+    def _initialize(self, *args: Any, **kwargs: Any) -> None:
+        runbook = cast(PerfSamplesSchema, self.runbook)
+        self._percentiles = runbook.percentiles
+        self._data_file: IO[bytes] = open(
+            constants.RUN_LOCAL_LOG_PATH / runbook.data_file_name, "wb"
+        )
+        self._index_file: IO[str] = open(
+            constants.RUN_LOCAL_LOG_PATH / runbook.index_file_name, "w"
+        )
+
+    def _write_column(self, column: "array[float]") -> int:
+        offset = self._data_file.tell()
+        if sys.byteorder == "big":
+            column = array("d", column)
+            column.byteswap()
+        self._data_file.write(column.tobytes())
+        return offset
@@ -200,41 +200,59 @@ class OperatingSystem:
     @classmethod
     def _get_detect_string(cls, node: Any) -> Iterable[str]:
         typed_node: Node = node
-        cmd_result = typed_node.execute(cmd="lsb_release -d", no_error_log=True)
-        yield get_matched_str(cmd_result.stdout, cls.__lsb_release_pattern)
+        # note, cat /etc/*release doesn't work in some images, so try them one
+        # by one. They are sent in one batch to save round trips.
+        (
+            lsb_release_result,
+            cmd_result_os_release,
+            redhat_release_result,
+            uname_result,
+            issue_result,
+            release_result,
+            lsb_release_file_result,
+            suse_release_result,
+        ) = typed_node.execute_batch(
+            [
+                "lsb_release -d",
+                "cat /etc/os-release",
+                # for RedHat, CentOS 6.x
+                "cat /etc/redhat-release",
+                # for FreeBSD
+                "uname",
+                # for Debian
+                "cat /etc/issue",
+                # try best for other distros, like Sapphire
+                "cat /etc/release",
+                # try best for other distros, like VeloCloud
+                "cat /etc/lsb-release",
+                # try best for some suse derives, like netiq
+                "cat /etc/SuSE-release",
+            ],
+            no_error_log=True,
+        )
+        yield get_matched_str(lsb_release_result.stdout, cls.__lsb_release_pattern)
 
-        cmd_result = typed_node.execute(cmd="cat /etc/os-release", no_error_log=True)
-        yield get_matched_str(cmd_result.stdout, cls.__os_release_pattern_name)
-        yield get_matched_str(cmd_result.stdout, cls.__os_release_pattern_id)
-        cmd_result_os_release = cmd_result
+        yield get_matched_str(
+            cmd_result_os_release.stdout, cls.__os_release_pattern_name
+        )
+        yield get_matched_str(cmd_result_os_release.stdout, cls.__os_release_pattern_id)
 
-        # for RedHat, CentOS 6.x
-        cmd_result = typed_node.execute(
-            cmd="cat /etc/redhat-release", no_error_log=True
+        yield get_matched_str(
+            redhat_release_result.stdout, cls.__redhat_release_pattern_header
+        )
+        yield get_matched_str(
+            redhat_release_result.stdout, cls.__redhat_release_pattern_bracket
         )
-        yield get_matched_str(cmd_result.stdout, cls.__redhat_release_pattern_header)
-        yield get_matched_str(cmd_result.stdout, cls.__redhat_release_pattern_bracket)
 
-        # for FreeBSD
-        cmd_result = typed_node.execute(cmd="uname", no_error_log=True)
-        yield cmd_result.stdout
+        yield uname_result.stdout
 
-        # for Debian
-        cmd_result = typed_node.execute(cmd="cat /etc/issue", no_error_log=True)
-        yield get_matched_str(cmd_result.stdout, cls.__debian_issue_pattern)
+        yield get_matched_str(issue_result.stdout, cls.__debian_issue_pattern)
 
-        # note, cat /etc/*release doesn't work in some images, so try them one by one
-        # try best for other distros, like Sapphire
-        cmd_result = typed_node.execute(cmd="cat /etc/release", no_error_log=True)
-        yield get_matched_str(cmd_result.stdout, cls.__release_pattern)
+        yield get_matched_str(release_result.stdout, cls.__release_pattern)
 
-        # try best for other distros, like VeloCloud
-        cmd_result = typed_node.execute(cmd="cat /etc/lsb-release", no_error_log=True)
-        yield get_matched_str(cmd_result.stdout, cls.__release_pattern)
+        yield get_matched_str(lsb_release_file_result.stdout, cls.__release_pattern)
 
-        # try best for some suse derives, like netiq
-        cmd_result = typed_node.execute(cmd="cat /etc/SuSE-release", no_error_log=True)
-        yield get_matched_str(cmd_result.stdout, cls.__suse_release_pattern)
+        yield get_matched_str(suse_release_result.stdout, cls.__suse_release_pattern)
 
         # try best from distros'family through ID_LIKE
         yield get_matched_str(
@@ -303,6 +321,13 @@ class Posix(OperatingSystem, BaseClassMixin):
     def __init__(self, node: Any) -> None:
         super().__init__(node, is_posix=True)
         self._first_time_installation: bool = True
+        # name: version of installed packages. It's loaded by one query on the
+        # first use, and dropped after packages are installed or updated.
+        self._installed_packages: Optional[Dict[str, str]] = None
+        # name: if the package is in repo. It's dropped when repos may change.
+        self._repo_packages: Dict[str, bool] = {}
+        # they are installed with the next installation in one transaction.
+        self._queued_packages: List[str] = []
 
     @classmethod
     def type_name(cls) -> str:
@@ -341,9 +366,51 @@ class Posix(OperatingSystem, BaseClassMixin):
         signed: bool = False,
         timeout: int = 1200,
         extra_args: Optional[List[str]] = None,
+        skip_installed: bool = False,
     ) -> None:
-        package_names = self._get_package_list(packages)
-        self._install_packages(package_names, signed, timeout, extra_args)
+        """
+        Install packages and queued packages in one transaction. By default,
+        installed packages are passed to the package manager too, so they are
+        upgraded if a newer version is available. If skip_installed is True,
+        installed packages are skipped by the installed package index, and the
+        package manager isn't called if all of them are installed.
+        """
+        package_names = self._queued_packages + self._get_package_list(packages)
+        self._queued_packages = []
+        package_names = list(dict.fromkeys(package_names))
+        if skip_installed:
+            installed_packages = self._get_installed_packages()
+            if installed_packages is not None:
+                package_names = [
+                    x for x in package_names if x not in installed_packages
+                ]
+        if not package_names:
+            self._log.debug("all packages are installed already.")
+            return
+        try:
+            self._install_packages(package_names, signed, timeout, extra_args)
+        finally:
+            self.invalidate_package_cache()
+
+    def queue_packages(
+        self,
+        packages: Union[
+            str,
+            Tool,
+            Type[Tool],
+            Sequence[Union[str, Tool, Type[Tool]]],
+        ],
+    ) -> None:
+        """
+        Queue packages to be installed with the next install_packages call in
+        one package manager transaction. A test phase can queue all packages it
+        needs, so they don't cost a transaction for each.
+        """
+        if isinstance(packages, (str, Tool, type)):
+            packages = [packages]
+        self._queued_packages.extend(
+            self.__resolve_package_name(item) for item in packages
+        )
 
     def package_exists(self, package: Union[str, Tool, Type[Tool]]) -> bool:
         """
@@ -351,6 +418,12 @@ class Posix(OperatingSystem, BaseClassMixin):
         Return Value - bool
         """
         package_name = self.__resolve_package_name(package)
+        installed_packages = self._get_installed_packages()
+        if installed_packages is not None and package_name in installed_packages:
+            return True
+        # The index has exact names only. The package manager is queried on a
+        # miss, so it matches patterns, like globs in dnf, and finds packages
+        # installed by commands after the index is loaded.
         return self._package_exists(package_name)
 
     def is_package_in_repo(self, package: Union[str, Tool, Type[Tool]]) -> bool:
@@ -362,14 +435,30 @@ class Posix(OperatingSystem, BaseClassMixin):
         if self._first_time_installation:
             self._initialize_package_installation()
             self._first_time_installation = False
-        return self._is_package_in_repo(package_name)
+        in_repo = self._repo_packages.get(package_name, None)
+        if in_repo is None:
+            in_repo = self._is_package_in_repo(package_name)
+            self._repo_packages[package_name] = in_repo
+        return in_repo
 
     def update_packages(
         self,
         packages: Union[str, Tool, Type[Tool], Sequence[Union[str, Tool, Type[Tool]]]],
     ) -> None:
         package_names = self._get_package_list(packages)
-        self._update_packages(package_names)
+        try:
+            self._update_packages(package_names)
+        finally:
+            self.invalidate_package_cache()
+
+    def invalidate_package_cache(self) -> None:
+        """
+        Drop the cached package states. Call it, after packages or repos are
+        changed without methods of this class.
+        """
+        self._installed_packages = None
+        self._repo_packages.clear()
+        self._packages.clear()
 
     def capture_system_information(self, saved_path: Path) -> None:
         # avoid to involve node, it's ok if some command doesn't exist.
@@ -395,6 +484,14 @@ class Posix(OperatingSystem, BaseClassMixin):
         found = self._packages.get(package_name, None)
         if found and use_cached:
             return found
+        if not use_cached:
+            self._installed_packages = None
+        installed_packages = self._get_installed_packages()
+        if installed_packages and package_name in installed_packages:
+            version_info = self._parse_package_version(
+                package_name, installed_packages[package_name]
+            )
+            return self._cache_and_return_version_info(package_name, version_info)
         return self._get_package_information(package_name)
 
     def get_repositories(self) -> List[RepositoryInfo]:
@@ -432,6 +529,22 @@ class Posix(OperatingSystem, BaseClassMixin):
     def _get_package_information(self, package_name: str) -> VersionInfo:
         raise NotImplementedError()
 
+    def _parse_package_version(self, package_name: str, version: str) -> VersionInfo:
+        raise NotImplementedError()
+
+    def _query_installed_packages(self) -> Optional[Dict[str, str]]:
+        """
+        Return name: version of all installed packages. The version is in the
+        format of _parse_package_version. If the OS doesn't support to list
+        packages, return None, and packages are queried one by one.
+        """
+        return None
+
+    def _get_installed_packages(self) -> Optional[Dict[str, str]]:
+        if self._installed_packages is None:
+            self._installed_packages = self._query_installed_packages()
+        return self._installed_packages
+
     def _get_version_info_from_named_regex_match(
         self, package_name: str, named_matches: Match[str]
     ) -> VersionInfo:
@@ -590,7 +703,24 @@ class MacOS(Posix):
 
 
 class Linux(Posix):
-    ...
+    def _query_rpm_packages(self, version_format: str) -> Dict[str, str]:
+        # the arch is added in name, so both "bash" and "bash.x86_64" are found.
+        result = self._node.execute(
+            f"rpm -qa --queryformat '%{{NAME}}\\t%{{ARCH}}\\t{version_format}\\n'",
+            shell=True,
+            no_info_log=True,
+            expected_exit_code=0,
+            expected_exit_code_failure_message="failed to list installed packages",
+        )
+        packages: Dict[str, str] = {}
+        for line in result.stdout.splitlines():
+            parts = line.split("\t")
+            if len(parts) != 3:
+                continue
+            name, arch, version = parts
+            packages[name] = version
+            packages[f"{name}.{arch}"] = version
+        return packages
 
 
 class CoreOs(Linux):
@@ -693,18 +823,17 @@ class Debian(Linux):
                 f" for {package_name} using regex "
                 f"{self._debian_package_information_regex.pattern}"
             )
-        version_str = match.group(2)
-        match = self._debian_version_splitter_regex.search(version_str)
+        version_info = self._parse_package_version(package_name, match.group(2))
+        return self._cache_and_return_version_info(package_name, version_info)
+
+    def _parse_package_version(self, package_name: str, version: str) -> VersionInfo:
+        match = self._debian_version_splitter_regex.search(version)
         if not match:
             raise LisaException(
-                f"Could not parse version info: {version_str} "
-                "for package {package_name}"
+                f"Could not parse version info: {version} for package {package_name}"
             )
-        self._node.log.debug(f"Attempting to parse version string: {version_str}")
-        version_info = self._get_version_info_from_named_regex_match(
-            package_name, match
-        )
-        return self._cache_and_return_version_info(package_name, version_info)
+        self._node.log.debug(f"Attempting to parse version string: {version}")
+        return self._get_version_info_from_named_regex_match(package_name, match)
 
     def wait_running_package_process(self) -> None:
         is_first_time: bool = True
@@ -781,6 +910,7 @@ class Debian(Linux):
         # apt update will not be triggered on Debian during add repo
         if type(self._node.os) == Debian:
             self._node.execute("apt-get update", sudo=True)
+        self.invalidate_package_cache()
 
     @retry(tries=10, delay=5)
     def _initialize_package_installation(self) -> None:
@@ -834,6 +964,27 @@ class Debian(Linux):
             + "\n",
         )
 
+    def _query_installed_packages(self) -> Optional[Dict[str, str]]:
+        # the status of installed packages is like "install ok installed", and
+        # removed packages with config files are "deinstall ok config-files".
+        result = self._node.execute(
+            "dpkg-query -W -f='${Package}\\t${Architecture}\\t${Version}"
+            "\\t${Status}\\n'",
+            shell=True,
+            no_info_log=True,
+            expected_exit_code=0,
+            expected_exit_code_failure_message="failed to list installed packages",
+        )
+        packages: Dict[str, str] = {}
+        for line in result.stdout.splitlines():
+            parts = line.split("\t")
+            if len(parts) != 4 or not parts[3].endswith(" installed"):
+                continue
+            name, arch, version, _ = parts
+            packages[name] = version
+            packages[f"{name}:{arch}"] = version
+        return packages
+
     def _package_exists(self, package: str) -> bool:
         command = "dpkg --get-selections"
         result = self._node.execute(command, sudo=True, shell=True)
@@ -1163,6 +1314,7 @@ class RPMDistro(Linux):
         keys_location: Optional[List[str]] = None,
     ) -> None:
         self._node.tools[YumConfigManager].add_repository(repo, no_gpgcheck)
+        self.invalidate_package_cache()
 
     def _get_package_information(self, package_name: str) -> VersionInfo:
         rpm_info = self._node.execute(
@@ -1173,16 +1325,21 @@ class RPMDistro(Linux):
             ),
         )
         # rpm package should be of format (package_name)-(version)
-        matches = self._rpm_version_splitter_regex.search(rpm_info.stdout)
+        version_info = self._parse_package_version(package_name, rpm_info.stdout)
+        return self._cache_and_return_version_info(package_name, version_info)
+
+    def _parse_package_version(self, package_name: str, version: str) -> VersionInfo:
+        matches = self._rpm_version_splitter_regex.search(version)
         if not matches:
             raise LisaException(
-                f"Could not parse package version {rpm_info} for {package_name}"
+                f"Could not parse package version {version} for {package_name}"
             )
-        self._node.log.debug(f"Attempting to parse version string: {rpm_info.stdout}")
-        version_info = self._get_version_info_from_named_regex_match(
-            package_name, matches
-        )
-        return self._cache_and_return_version_info(package_name, version_info)
+        self._node.log.debug(f"Attempting to parse version string: {version}")
+        return self._get_version_info_from_named_regex_match(package_name, matches)
+
+    def _query_installed_packages(self) -> Optional[Dict[str, str]]:
+        # it's the same format of "rpm -q <name>".
+        return self._query_rpm_packages("%{NAME}-%{VERSION}-%{RELEASE}.%{ARCH}")
 
     def _install_packages(
         self,
@@ -1309,6 +1466,7 @@ class Fedora(RPMDistro):
         # trigger to run _initialize_package_installation
         self._get_package_list(group_name)
         result = self._node.execute(f'yum -y groupinstall "{group_name}"', sudo=True)
+        self.invalidate_package_cache()
         self._verify_package_result(result, group_name)
 
     def _get_information(self) -> OsInformation:
@@ -1517,7 +1675,7 @@ class CBLMariner(RPMDistro):
 
     def __init__(self, node: Any) -> None:
         super().__init__(node)
-        self._dnf_tool_name: str
+        self._dnf_tool_name: str = ""
 
     def _initialize_package_installation(self) -> None:
         result = self._node.execute("command -v dnf", no_info_log=True, shell=True)
@@ -1528,6 +1686,9 @@ class CBLMariner(RPMDistro):
         self._dnf_tool_name = "tdnf -q"
 
     def _dnf_tool(self) -> str:
+        # package queries may run before the installation is initialized.
+        if not self._dnf_tool_name:
+            self._initialize_package_installation()
         return self._dnf_tool_name
 
 
@@ -1628,6 +1789,7 @@ class Suse(Linux):
             cmd += " -G "
         cmd += f" {repo} {repo_name}"
         cmd_result = self._node.execute(cmd=cmd, sudo=True)
+        self.invalidate_package_cache()
         if "already exists. Please use another alias." not in cmd_result.stdout:
             cmd_result.assert_exit_code(0, f"fail to add repo {repo}")
         else:
@@ -1714,18 +1876,23 @@ class Suse(Linux):
                 f" for {package_name} using regex "
                 f"{self._suse_package_information_regex.pattern}"
             )
-        version_str = match.group("package_version")
-        match = self._suse_version_splitter_regex.search(version_str)
+        version_info = self._parse_package_version(
+            package_name, match.group("package_version")
+        )
+        return self._cache_and_return_version_info(package_name, version_info)
+
+    def _parse_package_version(self, package_name: str, version: str) -> VersionInfo:
+        match = self._suse_version_splitter_regex.search(version)
         if not match:
             raise LisaException(
-                f"Could not parse version info: {version_str} "
-                "for package {package_name}"
+                f"Could not parse version info: {version} for package {package_name}"
             )
-        self._node.log.debug(f"Attempting to parse version string: {version_str}")
-        version_info = self._get_version_info_from_named_regex_match(
-            package_name, match
-        )
-        return self._cache_and_return_version_info(package_name, version_info)
+        self._node.log.debug(f"Attempting to parse version string: {version}")
+        return self._get_version_info_from_named_regex_match(package_name, match)
+
+    def _query_installed_packages(self) -> Optional[Dict[str, str]]:
+        # it's the same format of "Version" in "zypper info <name>".
+        return self._query_rpm_packages("%{VERSION}-%{RELEASE}")
 
 
 class SLES(Suse):
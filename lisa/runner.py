@@ -229,6 +229,8 @@ class RootRunner(Action):
             self._cleanup()
 
         if self._results_collector:
+            # make sure all results are received by the collector.
+            notifier.flush()
             results = [x for x in self._results_collector.results.values()]
             print_results(results, self._log.info)
 
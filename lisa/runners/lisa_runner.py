@@ -3,7 +3,7 @@
 
 import copy
 from functools import partial
-from typing import Any, Callable, Dict, List, Optional, cast
+from typing import Any, Callable, Dict, Iterator, List, Optional, cast
 
 from lisa import (
     ResourceAwaitableException,
@@ -23,6 +23,7 @@ from lisa.environment import (
 from lisa.messages import TestStatus
 from lisa.platform_ import PlatformMessage, load_platform
 from lisa.runner import BaseRunner
+from lisa.runners.scheduler import ResultScheduler
 from lisa.testselector import select_testcases
 from lisa.testsuite import TestCaseRequirement, TestResult, TestSuite
 from lisa.util import (
@@ -75,6 +76,10 @@ class LisaRunner(BaseRunner):
         ]
         self._log.debug(f"candidate environment count: {len(self.environments)}")
 
+        # index test results by priority and requirement, so it doesn't need to
+        # sort and check all test results on each dispatch.
+        self._scheduler = ResultScheduler(self.test_results, self._log)
+
     @property
     def is_done(self) -> bool:
         is_all_results_completed = all(
@@ -96,21 +101,16 @@ class LisaRunner(BaseRunner):
 
         # sort environments by status
         available_environments = self._sort_environments(self.environments)
-        available_results = self._sort_test_results(
-            [x for x in self.test_results if x.can_run]
-        )
+        has_available_results = self._scheduler.has_results()
 
         # check deletable environments
         delete_task = self._delete_unused_environments()
         if delete_task:
             return delete_task
 
-        if available_results and available_environments:
+        if has_available_results and available_environments:
             for priority in range(6):
-                can_run_results = self._get_results_by_priority(
-                    available_results, priority
-                )
-                if not can_run_results:
+                if not self._scheduler.has_results(priority):
                     continue
 
                 # it means there are test cases and environment, so it needs to
@@ -120,23 +120,8 @@ class LisaRunner(BaseRunner):
                         # skip in used environments
                         continue
 
-                    # try to pick the designated test result.
-                    environment_results = [
-                        x
-                        for x in can_run_results
-                        if environment.source_test_result
-                        and x.id_ == environment.source_test_result.id_
-                    ]
-                    if not environment_results:
-                        environment_results = self._get_runnable_test_results(
-                            test_results=can_run_results, environment=environment
-                        )
-
-                    if not environment_results:
-                        continue
-
                     task = self._dispatch_test_result(
-                        environment=environment, test_results=environment_results
+                        environment=environment, priority=priority
                     )
                     # there is more checking conditions. If some conditions doesn't
                     # meet, the task is None. If so, not return, and try next
@@ -149,10 +134,10 @@ class LisaRunner(BaseRunner):
                 ):
                     # if there is no environment in used, new, and results are
                     # not fit envs. those results cannot be run.
-                    self._skip_test_results(can_run_results)
-        elif available_results:
+                    self._skip_test_results(self._scheduler.get_results(priority))
+        elif has_available_results:
             # no available environments, so mark all test results skipped.
-            self._skip_test_results(available_results)
+            self._skip_test_results(self._scheduler.get_results())
             self.status = ActionStatus.SUCCESS
         return None
 
@@ -160,43 +145,60 @@ class LisaRunner(BaseRunner):
         if hasattr(self, "environments") and self.environments:
             for environment in self.environments:
                 self._delete_environment_task(environment, [])
+        if hasattr(self, "_scheduler"):
+            self._log.debug(f"scheduler statistics: {self._scheduler}")
         super().close()
 
     def _dispatch_test_result(
-        self, environment: Environment, test_results: List[TestResult]
+        self, environment: Environment, priority: int
     ) -> Optional[Task[None]]:
         check_cancelled()
 
-        assert test_results
-        can_run_results = test_results
         # deploy
-        if environment.status == EnvironmentStatus.Prepared and can_run_results:
-            return self._generate_task(
-                task_method=self._deploy_environment_task,
-                environment=environment,
-                test_results=can_run_results[:1],
+        if environment.status == EnvironmentStatus.Prepared:
+            deploy_result = next(
+                self._get_runnable_results(environment=environment, priority=priority),
+                None,
             )
+            if deploy_result:
+                return self._generate_task(
+                    task_method=self._deploy_environment_task,
+                    environment=environment,
+                    test_results=[deploy_result],
+                )
 
-        # run on deployed environment
-        can_run_results = [x for x in can_run_results if x.can_run]
-        if environment.status == EnvironmentStatus.Deployed and can_run_results:
-            selected_test_results = self._get_test_results_to_run(
-                test_results=test_results, environment=environment
+        # run on deployed or connected environment
+        if environment.status in [
+            EnvironmentStatus.Deployed,
+            EnvironmentStatus.Connected,
+        ]:
+            # The results are sorted, so the first one is the one needs a new
+            # environment, if there is.
+            selected_test_result = next(
+                self._get_runnable_results(
+                    environment=environment,
+                    priority=priority,
+                    environment_status=environment.status,
+                ),
+                None,
             )
-            if selected_test_results:
+            if selected_test_result:
                 return self._generate_task(
                     task_method=self._run_test_task,
                     environment=environment,
-                    test_results=selected_test_results,
+                    test_results=[selected_test_result],
                     case_variables=self._case_variables,
                 )
 
+        if environment.status == EnvironmentStatus.Deployed:
             # Check if there is case to run in a connected environment. If so,
             # initialize the environment
-            initialization_results = self._get_runnable_test_results(
-                test_results=test_results,
-                environment_status=EnvironmentStatus.Connected,
-                environment=environment,
+            initialization_results = list(
+                self._get_runnable_results(
+                    environment=environment,
+                    priority=priority,
+                    environment_status=EnvironmentStatus.Connected,
+                )
             )
             if initialization_results:
                 return self._generate_task(
@@ -205,21 +207,38 @@ class LisaRunner(BaseRunner):
                     test_results=initialization_results,
                 )
 
-        # run on connected environment
-        can_run_results = [x for x in can_run_results if x.can_run]
-        if environment.status == EnvironmentStatus.Connected and can_run_results:
-            selected_test_results = self._get_test_results_to_run(
-                test_results=test_results, environment=environment
-            )
-            if selected_test_results:
-                return self._generate_task(
-                    task_method=self._run_test_task,
+        return None
+
+    def _get_runnable_results(
+        self,
+        environment: Environment,
+        priority: int,
+        environment_status: Optional[EnvironmentStatus] = None,
+    ) -> Iterator[TestResult]:
+        # try to pick the designated test result.
+        designated_result = environment.source_test_result
+        if (
+            designated_result
+            and designated_result.can_run
+            and designated_result.runtime_data.metadata.priority == priority
+        ):
+            if environment_status is None:
+                # the environment is created for this test result, so it can be
+                # deployed without checking.
+                return iter([designated_result])
+            return iter(
+                self._get_runnable_test_results(
+                    test_results=[designated_result],
+                    environment_status=environment_status,
                     environment=environment,
-                    test_results=selected_test_results,
-                    case_variables=self._case_variables,
                 )
+            )
 
-        return None
+        return self._scheduler.get_runnable_results(
+            environment=environment,
+            priority=priority,
+            environment_status=environment_status,
+        )
 
     def _delete_unused_environments(self) -> Optional[Task[None]]:
         available_environments = self._sort_environments(self.environments)
@@ -233,10 +252,7 @@ class LisaRunner(BaseRunner):
             ]:
                 continue
 
-            can_run_results = self._get_runnable_test_results(
-                self.test_results, environment=environment
-            )
-            if not can_run_results:
+            if not self._scheduler.has_runnable_results(environment):
                 # no more test need this environment, delete it.
                 self._log.debug(
                     f"generating delete environment task on '{environment.name}'"
@@ -422,7 +438,6 @@ class LisaRunner(BaseRunner):
 
             matched_result = self._match_failed_environment_with_result(
                 environment=environment,
-                candidate_results=self.test_results,
                 exception=identifier,
             )
             self._attach_failed_environment_to_result(
@@ -439,6 +454,8 @@ class LisaRunner(BaseRunner):
         for environment in self.environments[:]:
             if environment.status != EnvironmentStatus.Deleted:
                 new_environments.append(environment)
+            else:
+                self._scheduler.remove_environment(environment)
         self.environments = new_environments
 
     def _cleanup_done_results(self) -> None:
@@ -449,18 +466,6 @@ class LisaRunner(BaseRunner):
                 remaining_results.append(test_result)
         self.test_results = remaining_results
 
-    def _get_results_by_priority(
-        self, test_results: List[TestResult], priority: int
-    ) -> List[TestResult]:
-        if not test_results:
-            return []
-
-        test_results = [
-            x for x in test_results if x.runtime_data.metadata.priority == priority
-        ]
-
-        return test_results
-
     def _generate_task(
         self,
         task_method: Callable[..., None],
@@ -503,17 +508,16 @@ class LisaRunner(BaseRunner):
     def _match_failed_environment_with_result(
         self,
         environment: Environment,
-        candidate_results: List[TestResult],
         exception: Exception,
     ) -> TestResult:
+        matched_result: Optional[TestResult] = None
         if environment.source_test_result and environment.source_test_result.is_queued:
-            matched_results = [environment.source_test_result]
+            matched_result = environment.source_test_result
         else:
-            matched_results = self._get_runnable_test_results(
-                test_results=candidate_results,
-                environment=environment,
+            matched_result = next(
+                self._scheduler.get_runnable_results(environment=environment), None
             )
-        if not matched_results:
+        if not matched_result:
             self._log.info(
                 "No requirement of test case is suitable for the preparation "
                 f"error of the environment '{environment.name}'. "
@@ -521,10 +525,10 @@ class LisaRunner(BaseRunner):
                 "This may be because the platform failed before populating the "
                 "features into this environment.",
             )
-            matched_results = [
-                result for result in self.test_results if result.is_queued
-            ]
-        if not matched_results:
+            matched_result = next(
+                (result for result in self.test_results if result.is_queued), None
+            )
+        if not matched_result:
             raise LisaException(
                 "There are no remaining test results to run, so preparation "
                 "errors cannot be appended to the test results. Please correct "
@@ -532,7 +536,7 @@ class LisaRunner(BaseRunner):
                 f"original exception: {exception}"
             )
 
-        return matched_results[0]
+        return matched_result
 
     def _attach_failed_environment_to_result(
         self,
@@ -578,8 +582,8 @@ class LisaRunner(BaseRunner):
             runnable_results: List[TestResult] = []
             for result in results:
                 try:
-                    if result.check_environment(
-                        environment=environment, save_reason=True
+                    if self._scheduler.check_environment(
+                        test_result=result, environment=environment
                     ) and (
                         not result.runtime_data.use_new_environment
                         or environment.is_new
@@ -608,28 +612,9 @@ class LisaRunner(BaseRunner):
                     new_results.append(x)
             results = new_results
 
-        results = self._sort_test_results(results)
+        results.sort(key=self._scheduler.get_rank)
         return results
 
-    def _get_test_results_to_run(
-        self, test_results: List[TestResult], environment: Environment
-    ) -> List[TestResult]:
-        to_run_results = self._get_runnable_test_results(
-            test_results=test_results,
-            environment_status=environment.status,
-            environment=environment,
-        )
-        if to_run_results:
-            to_run_test_result = next(
-                (x for x in to_run_results if x.runtime_data.use_new_environment),
-                None,
-            )
-            if not to_run_test_result:
-                to_run_test_result = to_run_results[0]
-            to_run_results = [to_run_test_result]
-
-        return to_run_results
-
     def _sort_environments(self, environments: List[Environment]) -> List[Environment]:
         results: List[Environment] = []
         # sort environments by the status list
@@ -646,24 +631,6 @@ class LisaRunner(BaseRunner):
                 )
         return results
 
-    def _sort_test_results(self, test_results: List[TestResult]) -> List[TestResult]:
-        results = test_results.copy()
-        # sort by priority, use new environment, environment status and suite name.
-        results.sort(
-            key=lambda r: str(r.runtime_data.metadata.suite.name),
-        )
-        # this step make sure Deployed is before Connected
-        results.sort(
-            reverse=True,
-            key=lambda r: str(r.runtime_data.metadata.requirement.environment_status),
-        )
-        results.sort(
-            reverse=True,
-            key=lambda r: str(r.runtime_data.use_new_environment),
-        )
-        results.sort(key=lambda r: r.runtime_data.metadata.priority)
-        return results
-
     def _skip_test_results(
         self,
         test_results: List[TestResult],
@@ -674,6 +641,8 @@ class LisaRunner(BaseRunner):
                 # already completed, don't skip it.
                 continue
 
+            self._scheduler.save_check_results(test_result)
+
             if test_result.check_results and test_result.check_results.reasons:
                 reasons = f"{additional_reason}: {test_result.check_results.reasons}"
             else:
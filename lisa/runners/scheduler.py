@@ -0,0 +1,294 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import copy
+import heapq
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+from lisa import SkippedException, search_space
+from lisa.environment import Environment, EnvironmentStatus
+from lisa.testsuite import TestCaseRequirement, TestResult
+from lisa.util.logger import Logger
+
+# the check result of a requirement on an environment. If the OS doesn't match,
+# it's the exception to skip test results.
+_CheckResult = Union[search_space.ResultReason, SkippedException]
+
+
+def sort_test_results(test_results: List[TestResult]) -> List[TestResult]:
+    results = test_results.copy()
+    # sort by priority, use new environment, environment status and suite name.
+    results.sort(
+        key=lambda r: str(r.runtime_data.metadata.suite.name),
+    )
+    # this step make sure Deployed is before Connected
+    results.sort(
+        reverse=True,
+        key=lambda r: str(r.runtime_data.metadata.requirement.environment_status),
+    )
+    results.sort(
+        reverse=True,
+        key=lambda r: str(r.runtime_data.use_new_environment),
+    )
+    results.sort(key=lambda r: r.runtime_data.metadata.priority)
+    return results
+
+
+class _RequirementGroup:
+    """
+    Test results, which share the same requirement, priority and the setting of
+    new environment. They are checked with an environment once for all.
+    """
+
+    def __init__(
+        self,
+        index: int,
+        requirement: TestCaseRequirement,
+        priority: int,
+        use_new_environment: bool,
+    ) -> None:
+        self.index = index
+        self.requirement = requirement
+        self.priority = priority
+        self.use_new_environment = use_new_environment
+        # the rank is the position in sorted results. Results are merged by rank
+        # across groups, so the order is the same as sorting all results.
+        self.results: Deque[Tuple[int, TestResult]] = deque()
+        # merged reasons of failed checks, it explains why results are skipped.
+        self.check_results: Optional[search_space.ResultReason] = None
+
+    @property
+    def environment_status(self) -> EnvironmentStatus:
+        return self.requirement.environment_status
+
+    def get_results(self, queued_only: bool = True) -> Iterator[Tuple[int, TestResult]]:
+        # results are dispatched by rank, so most completed results are at the
+        # head. Remove them to not visit again.
+        while self.results and self.results[0][1].is_completed:
+            self.results.popleft()
+        for rank, result in self.results:
+            if result.is_queued or (not queued_only and result.can_run):
+                yield rank, result
+
+
+class ResultScheduler:
+    """
+    Index of test results by priority and requirement. It caches the check
+    results of requirements on environments, so each requirement is checked
+    once per environment state, instead of once per test result and dispatch.
+    The cached result is dropped when status or capability of the environment
+    changes.
+    """
+
+    def __init__(self, test_results: List[TestResult], log: Logger) -> None:
+        self._log = log
+        self._groups: Dict[Tuple[int, int, bool], _RequirementGroup] = {}
+        self._priority_groups: Dict[int, List[_RequirementGroup]] = {}
+        self._group_of_results: Dict[int, _RequirementGroup] = {}
+        self._ranks: Dict[int, int] = {}
+        # environment name -> (environment state, group index -> check result)
+        self._check_cache: Dict[
+            str, Tuple[Tuple[Any, ...], Dict[int, _CheckResult]]
+        ] = {}
+
+        # for profiling
+        self.hit_count = 0
+        self.miss_count = 0
+
+        for rank, test_result in enumerate(sort_test_results(test_results)):
+            self._add_result(rank, test_result)
+
+    def __repr__(self) -> str:
+        return (
+            f"groups: {len(self._groups)}, "
+            f"check cache hits: {self.hit_count}, misses: {self.miss_count}"
+        )
+
+    def get_rank(self, test_result: TestResult) -> int:
+        return self._ranks[id(test_result)]
+
+    def has_results(self, priority: Optional[int] = None) -> bool:
+        return any(
+            next(x.get_results(queued_only=False), None)
+            for x in self._get_groups(priority)
+        )
+
+    def get_results(self, priority: Optional[int] = None) -> List[TestResult]:
+        """
+        return all results, which can run, in sorted order.
+        """
+        merged = heapq.merge(
+            *[x.get_results(queued_only=False) for x in self._get_groups(priority)]
+        )
+        return [result for _, result in merged]
+
+    def has_runnable_results(self, environment: Environment) -> bool:
+        return next(self.get_runnable_results(environment), None) is not None
+
+    def get_runnable_results(
+        self,
+        environment: Environment,
+        priority: Optional[int] = None,
+        environment_status: Optional[EnvironmentStatus] = None,
+    ) -> Iterator[TestResult]:
+        """
+        Yield queued results, which can run on the environment, in sorted order.
+        The environment is checked when this method is called, and results are
+        generated lazily, so picking the first one doesn't visit all results.
+        """
+        check_results = self._get_check_results(environment)
+        groups = [
+            x
+            for x in self._get_groups(priority)
+            if next(x.get_results(), None)
+            and self._is_runnable(x, environment, check_results)
+        ]
+
+        # only select one test result, which needs the new environment. Others
+        # will be dropped to next environment.
+        new_result: Optional[Tuple[int, TestResult]] = None
+        if environment.is_new:
+            heads: List[Tuple[int, TestResult]] = []
+            for group in groups:
+                if group.use_new_environment:
+                    head = next(group.get_results(), None)
+                    if head:
+                        heads.append(head)
+            if heads:
+                new_result = min(heads, key=lambda x: x[0])
+
+        sources: List[Iterator[Tuple[int, TestResult]]] = [
+            x.get_results()
+            for x in groups
+            if not x.use_new_environment
+            and (
+                environment_status is None or x.environment_status == environment_status
+            )
+        ]
+        if new_result and (
+            environment_status is None
+            or new_result[1].runtime_data.metadata.requirement.environment_status
+            == environment_status
+        ):
+            sources.append(iter([new_result]))
+
+        for _, result in heapq.merge(*sources):
+            yield result
+
+    def check_environment(
+        self, test_result: TestResult, environment: Environment
+    ) -> bool:
+        """
+        The cached version of TestResult.check_environment. It raises
+        SkippedException, if the OS type doesn't match.
+        """
+        group = self._group_of_results[id(test_result)]
+        check_result = self._get_check_result(
+            group, environment, self._get_check_results(environment)
+        )
+        if isinstance(check_result, SkippedException):
+            raise check_result
+        return check_result.result
+
+    def save_check_results(self, test_result: TestResult) -> None:
+        """
+        save the check reasons of the group to the test result, so the reasons
+        can be used in skipped message.
+        """
+        group = self._group_of_results.get(id(test_result))
+        if group and group.check_results:
+            test_result.save_check_result(copy.deepcopy(group.check_results))
+
+    def remove_environment(self, environment: Environment) -> None:
+        self._check_cache.pop(environment.name, None)
+
+    def _add_result(self, rank: int, test_result: TestResult) -> None:
+        runtime_data = test_result.runtime_data
+        requirement = runtime_data.metadata.requirement
+        priority = runtime_data.metadata.priority
+        key = (id(requirement), priority, runtime_data.use_new_environment)
+        group = self._groups.get(key)
+        if not group:
+            group = _RequirementGroup(
+                index=len(self._groups),
+                requirement=requirement,
+                priority=priority,
+                use_new_environment=runtime_data.use_new_environment,
+            )
+            self._groups[key] = group
+            self._priority_groups.setdefault(priority, []).append(group)
+        group.results.append((rank, test_result))
+        self._group_of_results[id(test_result)] = group
+        self._ranks[id(test_result)] = rank
+
+    def _get_groups(self, priority: Optional[int]) -> List[_RequirementGroup]:
+        if priority is None:
+            return list(self._groups.values())
+        return self._priority_groups.get(priority, [])
+
+    def _is_runnable(
+        self,
+        group: _RequirementGroup,
+        environment: Environment,
+        check_results: Dict[int, _CheckResult],
+    ) -> bool:
+        if group.use_new_environment and not environment.is_new:
+            return False
+
+        check_result = self._get_check_result(group, environment, check_results)
+        if isinstance(check_result, SkippedException):
+            # when check the environment, the test results may be marked as
+            # skipped, due to the test results are assumed not to match any
+            # environment.
+            for _, result in list(group.get_results()):
+                try:
+                    raise check_result
+                except SkippedException as identifier:
+                    result.handle_exception(identifier, log=self._log, phase="check")
+            return False
+        return check_result.result
+
+    def _get_check_results(self, environment: Environment) -> Dict[int, _CheckResult]:
+        state = self._get_environment_state(environment)
+        cached = self._check_cache.get(environment.name)
+        if cached and cached[0] == state:
+            return cached[1]
+
+        check_results: Dict[int, _CheckResult] = {}
+        self._check_cache[environment.name] = (state, check_results)
+        return check_results
+
+    def _get_check_result(
+        self,
+        group: _RequirementGroup,
+        environment: Environment,
+        check_results: Dict[int, _CheckResult],
+    ) -> _CheckResult:
+        check_result = check_results.get(group.index)
+        if check_result is not None:
+            self.hit_count += 1
+            return check_result
+
+        self.miss_count += 1
+        try:
+            check_result = group.requirement.check_environment(environment)
+            if not check_result.result:
+                if group.check_results:
+                    group.check_results.merge(check_result)
+                else:
+                    group.check_results = copy.deepcopy(check_result)
+        except SkippedException as identifier:
+            check_result = identifier
+        check_results[group.index] = check_result
+        return check_result
+
+    def _get_environment_state(self, environment: Environment) -> Tuple[Any, ...]:
+        # The capability of an environment changes with status, or when the
+        # platform replaces the capability of nodes, like resizing.
+        return (
+            environment.id,
+            environment.status,
+            id(environment.runbook.nodes_requirement),
+            *(id(x.capability) for x in environment.nodes.list()),
+        )
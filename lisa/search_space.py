@@ -2,10 +2,26 @@
 # Licensed under the MIT license.
 
 import copy
+import functools
 import sys
-from dataclasses import dataclass, field
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, is_dataclass
 from enum import Enum
-from typing import Any, Iterable, List, Optional, Set, Type, TypeVar, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
 
 from dataclasses_json import dataclass_json
 
@@ -54,15 +70,183 @@ class ResultReason:
             self.add_reason(reason, name)
 
 
+@dataclass
+class CacheStatistics:
+    calls: int = 0
+    hits: int = 0
+    misses: int = 0
+    size: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.calls if self.calls else 0.0
+
+
+class _FingerprintError(Exception):
+    pass
+
+
+class _MemoCache:
+    """
+    LRU cache of results by fingerprints of requirement and capability. Results
+    are copied in and out, so callers can modify them.
+    """
+
+    def __init__(self, name: str, copy_result: Callable[[Any], Any]) -> None:
+        self.name = name
+        self.statistics = CacheStatistics()
+        self._copy_result = copy_result
+        self._results: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def call(
+        self, func: Callable[..., Any], requirement: Any, capability: Any, *args: Any
+    ) -> Any:
+        # only the outermost call is cached, the nested calls are parts of it.
+        if getattr(_memo_state, "is_calling", False):
+            return func(requirement, capability, *args)
+
+        _memo_state.is_calling = True
+        try:
+            try:
+                key: Optional[Hashable] = (
+                    func,
+                    fingerprint(requirement),
+                    fingerprint(capability),
+                    args,
+                )
+            except _FingerprintError:
+                key = None
+
+            with _memo_lock:
+                self.statistics.calls += 1
+                if key is not None and key in self._results:
+                    self._results.move_to_end(key)
+                    self.statistics.hits += 1
+                    return self._copy_result(self._results[key])
+                self.statistics.misses += 1
+
+            result = func(requirement, capability, *args)
+            if key is not None:
+                with _memo_lock:
+                    self._results[key] = self._copy_result(result)
+                    if len(self._results) > memo_cache_size:
+                        self._results.popitem(last=False)
+                    self.statistics.size = len(self._results)
+            return result
+        finally:
+            _memo_state.is_calling = False
+
+    def clear(self) -> None:
+        with _memo_lock:
+            self._results.clear()
+            self.statistics = CacheStatistics()
+
+
+def _copy_result_reason(result: ResultReason) -> ResultReason:
+    return ResultReason(
+        result=result.result, reasons=result.reasons.copy(), _prefix=result._prefix
+    )
+
+
+# the max count of cached results of each method.
+memo_cache_size = 4096
+_memo_lock = threading.Lock()
+_memo_state = threading.local()
+_check_cache = _MemoCache("check", _copy_result_reason)
+_generate_min_capability_cache = _MemoCache(
+    RequirementMethod.generate_min_capability, copy.deepcopy
+)
+_intersect_cache = _MemoCache(RequirementMethod.intersect, copy.deepcopy)
+_memo_caches = [_check_cache, _generate_min_capability_cache, _intersect_cache]
+
+
+def get_cache_statistics() -> Dict[str, CacheStatistics]:
+    """
+    return copied statistics of cached methods for profiling.
+    """
+    return {x.name: copy.copy(x.statistics) for x in _memo_caches}
+
+
+def clear_cache() -> None:
+    """
+    Fingerprints cover all values of requirements and capabilities, so changed
+    objects don't hit stale results. Call it to release memory, or when a
+    requirement type changes its behavior.
+    """
+    for memo_cache in _memo_caches:
+        memo_cache.clear()
+
+
+def cached_check(
+    func: Callable[[Any, Any], ResultReason]
+) -> Callable[[Any, Any], ResultReason]:
+    """
+    Cache the check method of a requirement type. Fingerprints cost about the
+    same as checking simple types, so use it on composite types only, which
+    are checked with the same pairs repeatedly.
+    """
+
+    @functools.wraps(func)
+    def wrapper(requirement: Any, capability: Any) -> ResultReason:
+        return cast(ResultReason, _check_cache.call(func, requirement, capability))
+
+    return wrapper
+
+
+def fingerprint(value: Any) -> Hashable:
+    """
+    A canonical and hashable key of a search space value. Equal values have the
+    same key, even they are different objects. It raises _FingerprintError, if
+    the value cannot be converted.
+    """
+    if value is None or isinstance(value, (str, int, float, Enum, type)):
+        # includes the type, so 1 and True, or enum and its str are different.
+        return (value.__class__, value)
+    if isinstance(value, IntRange):
+        return (IntRange, value.min, value.max, value.max_inclusive)
+    if isinstance(value, SetSpace):
+        # the order of items doesn't matter in a set.
+        return (
+            value.__class__,
+            value.is_allow_set,
+            frozenset(fingerprint(x) for x in value.items),
+        )
+    if isinstance(value, (list, tuple)):
+        return (value.__class__, tuple(fingerprint(x) for x in value))
+    if isinstance(value, (set, frozenset)):
+        return (value.__class__, frozenset(fingerprint(x) for x in value))
+    if isinstance(value, dict):
+        return (
+            value.__class__,
+            frozenset((fingerprint(k), fingerprint(v)) for k, v in value.items()),
+        )
+    if is_dataclass(value):
+        # all attributes, not only fields. Some cached attributes, like the
+        # extended runbook, impact results.
+        return (
+            value.__class__,
+            frozenset((k, fingerprint(v)) for k, v in vars(value).items()),
+        )
+    raise _FingerprintError(f"unsupported type: {type(value)}")
+
+
 class RequirementMixin:
     def check(self, capability: Any) -> ResultReason:
         raise NotImplementedError()
 
     def generate_min_capability(self, capability: Any) -> Any:
+        return _generate_min_capability_cache.call(
+            RequirementMixin._call_generate_min_capability, self, capability
+        )
+
+    def intersect(self, capability: Any) -> Any:
+        return _intersect_cache.call(RequirementMixin._call_intersect, self, capability)
+
+    def _call_generate_min_capability(self, capability: Any) -> Any:
         self._validate_result(capability)
         return self._generate_min_capability(capability)
 
-    def intersect(self, capability: Any) -> Any:
+    def _call_intersect(self, capability: Any) -> Any:
         self._validate_result(capability)
         return self._intersect(capability)
 
@@ -285,6 +469,15 @@ class SetSpace(RequirementMixin, Set[T]):
     def __post_init__(self, *args: Any, **kwargs: Any) -> None:
         self.update(self.items)
 
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "SetSpace[T]":
+        # the default copy of set subclasses calls __init__ with items as the
+        # first argument, so items are lost from the set.
+        result = self.__class__(is_allow_set=self.is_allow_set)
+        memo[id(self)] = result
+        result.items = copy.deepcopy(self.items, memo)
+        set.update(result, (copy.deepcopy(x, memo) for x in self))
+        return result
+
     def check(self, capability: Any) -> ResultReason:
         result = ResultReason()
         if self.is_allow_set and len(self) > 0 and not capability:
@@ -619,9 +812,9 @@ def check(
 
 
 def _call_requirement_method(
-    method: str,
     requirement: Union[T_SEARCH_SPACE, List[T_SEARCH_SPACE], None],
     capability: Union[T_SEARCH_SPACE, List[T_SEARCH_SPACE], None],
+    method: str,
 ) -> Any:
     check_result = check(requirement, capability)
     if not check_result.result:
@@ -658,10 +851,11 @@ def generate_min_capability(
     requirement: Union[T_SEARCH_SPACE, List[T_SEARCH_SPACE], None],
     capability: Union[T_SEARCH_SPACE, List[T_SEARCH_SPACE], None],
 ) -> Any:
-    return _call_requirement_method(
+    return _generate_min_capability_cache.call(
+        _call_requirement_method,
+        requirement,
+        capability,
         RequirementMethod.generate_min_capability,
-        requirement=requirement,
-        capability=capability,
     )
 
 
@@ -669,8 +863,8 @@ def intersect(
     requirement: Union[T_SEARCH_SPACE, List[T_SEARCH_SPACE], None],
     capability: Union[T_SEARCH_SPACE, List[T_SEARCH_SPACE], None],
 ) -> Any:
-    return _call_requirement_method(
-        RequirementMethod.intersect, requirement=requirement, capability=capability
+    return _intersect_cache.call(
+        _call_requirement_method, requirement, capability, RequirementMethod.intersect
     )
 
 
@@ -2,7 +2,8 @@
 # Licensed under the MIT license.
 
 import re
-from typing import Any, List, Optional, Pattern, Set, Tuple, Union
+from threading import Lock
+from typing import Any, Dict, List, Optional, Pattern, Set, Tuple, Union
 
 PATTERN_GUID = (
     re.compile(r"^([0-9a-f]{8})-(?:[0-9a-f]{4}-){3}[0-9a-f]{8}([0-9a-f]{4})$"),
@@ -48,11 +49,21 @@ def replace(
 
 _secret_list: List[Tuple[str, str]] = []
 _secret_set: Set[str] = set()
+# the compiled matcher of all secrets: pattern, replacements, min length.
+_matcher: Optional[Tuple[Pattern[str], Dict[str, str], int]] = None
+# secrets are compiled on the next mask call after they are added, so adding
+# many secrets doesn't compile each time.
+_is_dirty = False
+_compile_lock = Lock()
 
 
 def reset() -> None:
-    _secret_set.clear()
-    _secret_list.clear()
+    global _matcher, _is_dirty
+    with _compile_lock:
+        _secret_set.clear()
+        _secret_list.clear()
+        _matcher = None
+        _is_dirty = False
 
 
 def add_secret(
@@ -60,24 +71,79 @@ def add_secret(
     mask: Optional[Union[Pattern[str], Tuple[Pattern[str], str]]] = None,
     sub: str = "******",
 ) -> None:
-    global _secret_list
+    global _is_dirty
     if origin:
         if not isinstance(origin, str):
             origin = str(origin)
-        if origin in _secret_set:
-            for index, secret in enumerate(_secret_list):
-                if origin == secret[0]:
-                    _secret_list[index] = (origin, replace(origin, sub=sub, mask=mask))
-                    break
-        else:
-            _secret_set.add(origin)
-            _secret_list.append((origin, replace(origin, sub=sub, mask=mask)))
-            # deal with longer first, in case it's broken by shorter
-            _secret_list = sorted(_secret_list, reverse=True, key=lambda x: len(x[0]))
+        with _compile_lock:
+            if origin in _secret_set:
+                for index, secret in enumerate(_secret_list):
+                    if origin == secret[0]:
+                        _secret_list[index] = (
+                            origin,
+                            replace(origin, sub=sub, mask=mask),
+                        )
+                        break
+            else:
+                _secret_set.add(origin)
+                _secret_list.append((origin, replace(origin, sub=sub, mask=mask)))
+            _is_dirty = True
 
 
 def mask(input: str) -> str:
-    for secret in _secret_list:
-        if secret[0] in input:
-            input = input.replace(secret[0], secret[1])
-    return input
+    if _is_dirty:
+        _compile_secrets()
+    matcher = _matcher
+    # fast path, the string is too short to contain any secret.
+    if not matcher or len(input) < matcher[2]:
+        return input
+    pattern, replacements, _ = matcher
+    return pattern.sub(lambda x: replacements[x.group(0)], input)
+
+
+def _compile_secrets() -> None:
+    """
+    Compile all secrets to one regex, which is a trie of secrets. It finds all
+    secrets in one pass of the string. On each position, the longest secret is
+    matched, so it won't be broken by shorter ones.
+    """
+    global _matcher, _is_dirty
+    with _compile_lock:
+        if not _is_dirty:
+            # compiled by other thread.
+            return
+        trie: Dict[str, Any] = {}
+        for secret, _ in _secret_list:
+            node = trie
+            for char in secret:
+                node = node.setdefault(char, {})
+            # empty key means a secret ends here.
+            node[""] = {}
+
+        _matcher = (
+            re.compile(_trie_to_regex(trie)),
+            dict(_secret_list),
+            min(len(x[0]) for x in _secret_list),
+        )
+        _is_dirty = False
+
+
+def _trie_to_regex(node: Dict[str, Any]) -> str:
+    # merge the chain of single child nodes, so the recursion depth is the
+    # count of branches, not the length of secrets.
+    prefix = ""
+    while len(node) == 1 and "" not in node:
+        char, node = next(iter(node.items()))
+        prefix += re.escape(char)
+
+    branches = [
+        re.escape(char) + _trie_to_regex(child) for char, child in node.items() if char
+    ]
+    if not branches:
+        return prefix
+    regex = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+    if "" in node:
+        # the shorter secret ends here. The longer one is tried first, because
+        # the optional group is greedy.
+        regex = f"(?:{regex})?"
+    return prefix + regex
@@ -142,6 +142,13 @@ class SerialConsole(AwsFeatureMixin, features.SerialConsole):
         output_bytes = diagnostic_data["Output"].encode("ascii")
         return base64.b64decode(output_bytes)
 
+    def _get_console_log_after(
+        self, offset: int, saved_path: Optional[Path]
+    ) -> Tuple[int, bytes]:
+        # the console output is the latest part of log, so the offset cannot be
+        # used, and it's always the whole log.
+        return 0, self._get_console_log(saved_path=saved_path)
+
 
 class NetworkInterface(AwsFeatureMixin, features.NetworkInterface):
     """
@@ -0,0 +1,228 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    MutableMapping,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    cast,
+)
+
+T = TypeVar("T")
+
+# increase it, when the format of saved data changes. Data of other versions
+# is dropped.
+_SCHEMA_VERSION = 1
+
+
+class LazyDict(MutableMapping[str, T]):
+    """
+    A mapping, which keeps raw values and decodes them on the first access. So
+    looking up a few keys doesn't decode all values. Keys, length and "in" don't
+    decode values. It's not a dict subclass, because C-level accesses of dict,
+    like dict(x) and {**x}, skip __getitem__, and get undecoded values.
+
+    If a value fails to decode, on_error is called with the key and the error,
+    and its return value is used. Without on_error, the error is raised.
+    """
+
+    def __init__(
+        self,
+        raw_values: Dict[str, str],
+        decoder: Callable[[str], T],
+        on_error: Optional[Callable[[str, Exception], T]] = None,
+    ):
+        # raw values are replaced by decoded values, so the order is kept.
+        self._values: Dict[str, Any] = dict(raw_values)
+        self._raw_keys: Set[str] = set(raw_values)
+        self._decoder = decoder
+        self._on_error = on_error
+
+    def __getitem__(self, key: str) -> T:
+        value = self._values[key]
+        if key in self._raw_keys:
+            try:
+                value = self._decoder(value)
+            except Exception as identifier:
+                if not self._on_error:
+                    raise identifier
+                value = self._on_error(key, identifier)
+            self._values[key] = value
+            self._raw_keys.discard(key)
+        return cast(T, value)
+
+    def __setitem__(self, key: str, value: T) -> None:
+        self._raw_keys.discard(key)
+        self._values[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        self._raw_keys.discard(key)
+        del self._values[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._values
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __repr__(self) -> str:
+        return repr(self.copy())
+
+    def __reduce__(self) -> Any:
+        # copy and pickle as a plain dict.
+        return (dict, (self.copy(),))
+
+    def copy(self) -> Dict[str, T]:
+        self.decode_all()
+        return dict(self._values)
+
+    def decode_all(self) -> None:
+        for key in list(self._raw_keys):
+            self[key]
+
+
+class LocationCache:
+    """
+    The on-disk cache of SKUs in locations. It's a SQLite database, each SKU is a
+    row, so a location can be loaded without decoding all SKUs, and it's
+    updated by changed SKUs only. SQLite transactions make concurrent refreshes
+    from multiple processes atomic, a reader sees the old or the new data only.
+    """
+
+    def __init__(self, path: Path, timeout: float = 60) -> None:
+        self._path = path
+        self._timeout = timeout
+        self._initialized = False
+
+    def load(self, location: str) -> Optional[Tuple[datetime, Dict[str, str]]]:
+        """
+        return the updated time and raw SKUs of the location, or None if the
+        location is not cached.
+        """
+        if not self._path.exists():
+            return None
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT updated_time FROM locations WHERE location = ?", (location,)
+            ).fetchone()
+            if not row:
+                return None
+            skus: Dict[str, str] = dict(
+                connection.execute(
+                    "SELECT vm_size, data FROM skus WHERE location = ?", (location,)
+                )
+            )
+        return datetime.fromisoformat(row[0]), skus
+
+    def save(self, location: str, updated_time: datetime, skus: Dict[str, str]) -> bool:
+        """
+        Save SKUs of the location. Only changed SKUs are written, and removed
+        SKUs are deleted. If other process saved newer data, it returns False
+        and the data is not saved.
+        """
+        with closing(self._connect()) as connection:
+            # the write lock is acquired at beginning, so the check and writes
+            # are atomic across processes.
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = connection.execute(
+                    "SELECT updated_time FROM locations WHERE location = ?",
+                    (location,),
+                ).fetchone()
+                if row and datetime.fromisoformat(row[0]) >= updated_time:
+                    connection.execute("ROLLBACK")
+                    return False
+
+                existing_skus: Dict[str, str] = dict(
+                    connection.execute(
+                        "SELECT vm_size, data FROM skus WHERE location = ?",
+                        (location,),
+                    )
+                )
+                connection.executemany(
+                    "INSERT OR REPLACE INTO skus (location, vm_size, data) "
+                    "VALUES (?, ?, ?)",
+                    (
+                        (location, vm_size, data)
+                        for vm_size, data in skus.items()
+                        if existing_skus.get(vm_size) != data
+                    ),
+                )
+                connection.executemany(
+                    "DELETE FROM skus WHERE location = ? AND vm_size = ?",
+                    ((location, x) for x in existing_skus if x not in skus),
+                )
+                connection.execute(
+                    "INSERT OR REPLACE INTO locations (location, updated_time) "
+                    "VALUES (?, ?)",
+                    (location, updated_time.isoformat()),
+                )
+                connection.execute("COMMIT")
+            except Exception as identifier:
+                connection.execute("ROLLBACK")
+                raise identifier
+        return True
+
+    def delete(self, location: str) -> None:
+        """
+        Delete the location, like its data cannot be decoded. So it's fetched and
+        saved again.
+        """
+        if not self._path.exists():
+            return
+        with closing(self._connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute("DELETE FROM skus WHERE location = ?", (location,))
+                connection.execute(
+                    "DELETE FROM locations WHERE location = ?", (location,)
+                )
+                connection.execute("COMMIT")
+            except Exception as identifier:
+                connection.execute("ROLLBACK")
+                raise identifier
+
+    def _connect(self) -> sqlite3.Connection:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        # transactions are managed explicitly.
+        connection = sqlite3.connect(
+            self._path, timeout=self._timeout, isolation_level=None
+        )
+        if not self._initialized:
+            self._initialize(connection)
+            self._initialized = True
+        return connection
+
+    def _initialize(self, connection: sqlite3.Connection) -> None:
+        # in WAL mode, readers are not blocked by the writer. It may not be
+        # supported on some file systems, and it falls back to the default mode.
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("BEGIN IMMEDIATE")
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        if version != _SCHEMA_VERSION:
+            connection.execute("DROP TABLE IF EXISTS skus")
+            connection.execute("DROP TABLE IF EXISTS locations")
+            connection.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS locations "
+            "(location TEXT PRIMARY KEY, updated_time TEXT NOT NULL)"
+        )
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS skus (location TEXT NOT NULL, "
+            "vm_size TEXT NOT NULL, data TEXT NOT NULL, "
+            "PRIMARY KEY (location, vm_size))"
+        )
+        connection.execute("COMMIT")
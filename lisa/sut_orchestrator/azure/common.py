@@ -8,7 +8,7 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from threading import Lock
 from time import sleep
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
 
 import requests
 from azure.mgmt.compute import ComputeManagementClient  # type: ignore
@@ -1054,7 +1054,14 @@ def save_console_log(
     log: Logger,
     saved_path: Optional[Path],
     screenshot_file_name: str = "serial_console",
-) -> bytes:
+    offset: int = 0,
+) -> Tuple[int, bytes]:
+    """
+    returns the start offset and the serial log after the offset. The log is
+    appended, so only new content is downloaded by a range request. If the log
+    is shorter than the offset, it's regenerated, and the whole log is returned
+    with the start offset 0.
+    """
     compute_client = get_compute_client(platform)
     with global_credential_access_lock:
         diagnostic_data = (
@@ -1078,13 +1085,28 @@ def save_console_log(
             )
         screenshot_raw_name.unlink()
 
-    log_response = requests.get(diagnostic_data.serial_console_log_blob_uri)
+    log_uri = diagnostic_data.serial_console_log_blob_uri
+    if offset:
+        log_response = requests.get(log_uri, headers={"Range": f"bytes={offset}-"})
+        if log_response.status_code == 206:
+            return offset, log_response.content
+        if log_response.status_code == 416:
+            # the format is "bytes */<size>"
+            size = log_response.headers.get("Content-Range", "").rpartition("/")[2]
+            if size == str(offset):
+                return offset, b""
+        elif log_response.status_code == 200:
+            if len(log_response.content) >= offset:
+                return offset, log_response.content[offset:]
+            return 0, log_response.content
+
+    log_response = requests.get(log_uri)
     if log_response.status_code == 404:
         log.debug(
             "The serial console is not generated. "
             "The reason may be the VM is not started."
         )
-    return log_response.content
+    return 0, log_response.content
 
 
 def load_environment(
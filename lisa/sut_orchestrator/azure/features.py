@@ -341,6 +341,12 @@ class SerialConsole(AzureFeatureMixin, features.SerialConsole):
         return output
 
     def _get_console_log(self, saved_path: Optional[Path]) -> bytes:
+        _, content = self._get_console_log_after(0, saved_path=saved_path)
+        return content
+
+    def _get_console_log_after(
+        self, offset: int, saved_path: Optional[Path]
+    ) -> Tuple[int, bytes]:
         platform: AzurePlatform = self._platform  # type: ignore
         return save_console_log(
             resource_group_name=self._resource_group_name,
@@ -348,6 +354,7 @@ class SerialConsole(AzureFeatureMixin, features.SerialConsole):
             platform=platform,
             log=self._log,
             saved_path=saved_path,
+            offset=offset,
         )
 
     def _get_connection_string(self) -> str:
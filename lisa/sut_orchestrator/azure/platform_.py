@@ -16,7 +16,7 @@ from functools import lru_cache, partial
 from pathlib import Path
 from threading import Lock
 from types import SimpleNamespace
-from typing import Any, Dict, List, Optional, Set, Tuple, Type, Union, cast
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Type, Union, cast
 
 from azure.core.exceptions import HttpResponseError
 from azure.identity import DefaultAzureCredential
@@ -72,7 +72,8 @@ from lisa.util.parallel import run_in_parallel
 from lisa.util.shell import wait_tcp_port_ready
 
 from .. import AZURE
-from . import features
+from . import features, hooks  # noqa: F401
+from .cache import LazyDict, LocationCache
 from .common import (
     AZURE_SHARED_RG_NAME,
     AzureArmParameter,
@@ -219,6 +220,118 @@ class AzureLocation:
     capabilities: Dict[str, AzureCapability] = field(default_factory=dict)
 
 
+class _CapabilityTable:
+    """
+    Capabilities of a location in columns, sorted in the order to match. The
+    columns filter out vm sizes, which cannot meet a requirement, with simple
+    comparisons. NodeSpace.check is still needed to verify the remaining, so the
+    filter must not drop any capability, which may pass the check.
+    """
+
+    def __init__(self, capabilities: List[AzureCapability]) -> None:
+        self.capabilities = _sort_capabilities(capabilities)
+        nodes = [x.capability for x in self.capabilities]
+        self._columns: Dict[str, Tuple[List[float], List[float]]] = {
+            "core_count": _get_bounds_column(x.core_count for x in nodes),
+            "memory_mb": _get_bounds_column(x.memory_mb for x in nodes),
+            "gpu_count": _get_bounds_column(x.gpu_count for x in nodes),
+            "nic_count": _get_bounds_column(
+                x.network_interface.nic_count if x.network_interface else None
+                for x in nodes
+            ),
+            "data_disk_count": _get_bounds_column(
+                x.disk.data_disk_count if x.disk else None for x in nodes
+            ),
+        }
+        # each feature type is a bit, and features of a capability are a mask.
+        self._feature_bits: Dict[str, int] = {}
+        self._feature_masks: List[int] = []
+        for node in nodes:
+            mask = 0
+            for feature_setting in node.features or []:
+                bit = self._feature_bits.setdefault(
+                    feature_setting.type, 1 << len(self._feature_bits)
+                )
+                mask |= bit
+            self._feature_masks.append(mask)
+        self._data_path_bits: Dict[Any, int] = {}
+        self._data_path_masks = [
+            _get_set_space_mask(
+                x.network_interface.data_path if x.network_interface else None,
+                self._data_path_bits,
+                add=True,
+            )
+            for x in nodes
+        ]
+
+    def get_candidates(
+        self, requirement: schema.NodeSpace, vm_sizes: Optional[Set[str]] = None
+    ) -> List[AzureCapability]:
+        """
+        return capabilities, which may meet the requirement, in the sorted order.
+        If vm_sizes is set, only these vm sizes are returned.
+        """
+        indexes: Iterable[int] = range(len(self.capabilities))
+        spaces: Dict[str, search_space.CountSpace] = {
+            "core_count": requirement.core_count,
+            "memory_mb": requirement.memory_mb,
+            "gpu_count": requirement.gpu_count,
+        }
+        if requirement.network_interface:
+            spaces["nic_count"] = requirement.network_interface.nic_count
+        if requirement.disk:
+            spaces["data_disk_count"] = requirement.disk.data_disk_count
+        for name, space in spaces.items():
+            ranges = _get_count_space_ranges(space)
+            if ranges is None:
+                continue
+            mins, maxes = self._columns[name]
+            if len(ranges) == 1:
+                low, high = ranges[0]
+                indexes = [i for i in indexes if mins[i] <= high and maxes[i] >= low]
+            else:
+                indexes = [
+                    i
+                    for i in indexes
+                    if any(mins[i] <= high and maxes[i] >= low for low, high in ranges)
+                ]
+
+        required_mask = 0
+        for feature_setting in requirement.features or []:
+            bit = self._feature_bits.get(feature_setting.type)
+            if bit is None:
+                # no vm size supports the feature.
+                return []
+            required_mask |= bit
+        excluded_mask = 0
+        for feature_setting in requirement.excluded_features or []:
+            excluded_mask |= self._feature_bits.get(feature_setting.type, 0)
+        if required_mask or excluded_mask:
+            masks = self._feature_masks
+            indexes = [
+                i
+                for i in indexes
+                if masks[i] & required_mask == required_mask
+                and not masks[i] & excluded_mask
+            ]
+
+        if (
+            requirement.network_interface
+            and requirement.network_interface.data_path is not None
+        ):
+            # one of data paths should be supported.
+            required_mask = _get_set_space_mask(
+                requirement.network_interface.data_path, self._data_path_bits
+            )
+            masks = self._data_path_masks
+            indexes = [i for i in indexes if masks[i] & required_mask]
+
+        candidates = [self.capabilities[i] for i in indexes]
+        if vm_sizes is not None:
+            candidates = [x for x in candidates if x.vm_size in vm_sizes]
+        return candidates
+
+
 @dataclass_json()
 @dataclass
 class AzurePlatformSchema:
@@ -317,6 +430,8 @@ class AzurePlatform(Platform):
 
     _credentials: Dict[str, DefaultAzureCredential] = {}
     _locations_data_cache: Dict[str, AzureLocation] = {}
+    _location_caches: Dict[Path, LocationCache] = {}
+    _capability_tables: Dict[str, Tuple[AzureLocation, _CapabilityTable]] = {}
 
     def __init__(self, runbook: schema.Platform) -> None:
         super().__init__(runbook=runbook)
@@ -546,7 +661,7 @@ class AzurePlatform(Platform):
         saved_path = environment.log_path / f"{get_datetime_path()}_serial_log"
         saved_path.mkdir(parents=True, exist_ok=True)
         for vm in vms:
-            log_response_content = save_console_log(
+            _, log_response_content = save_console_log(
                 resource_group_name,
                 vm.name,
                 self,
@@ -833,6 +948,65 @@ class AzurePlatform(Platform):
                 self._arm_template = json.load(f)
         return self._arm_template
 
+    def _get_location_cache(self) -> LocationCache:
+        cache_path = constants.CACHE_PATH / "azure_locations.db"
+        location_cache = self._location_caches.get(cache_path)
+        if not location_cache:
+            location_cache = LocationCache(cache_path)
+            self._location_caches[cache_path] = location_cache
+        return location_cache
+
+    def _load_location_info_from_cache(
+        self, location: str, log: Logger
+    ) -> Optional[AzureLocation]:
+        location_cache = self._get_location_cache()
+        loaded = location_cache.load(location)
+        if not loaded:
+            return None
+        updated_time, skus = loaded
+        try:
+            # if schema changed, all SKUs fail to decode. Decode one, so the
+            # cache is dropped and fetched again now.
+            if skus:
+                _decode_capability(next(iter(skus.values())))
+        except Exception as identifier:
+            log.debug(f"error on loading cache, delete cache and fetch. {identifier}")
+            location_cache.delete(location)
+            return None
+        # SKUs are decoded when they are used. It's used as a dict, but it's a
+        # mapping, so all accesses decode values.
+        capabilities = cast(
+            Dict[str, AzureCapability],
+            LazyDict(
+                skus,
+                _decode_capability,
+                partial(self._reload_location_capability, location, log),
+            ),
+        )
+        return AzureLocation(
+            updated_time=updated_time, location=location, capabilities=capabilities
+        )
+
+    def _reload_location_capability(
+        self, location: str, log: Logger, vm_size: str, error: Exception
+    ) -> AzureCapability:
+        # a SKU in the cache is broken, delete the cache and fetch it again.
+        log.debug(
+            f"error on loading {vm_size} from cache, delete cache and fetch. {error}"
+        )
+        self._get_location_cache().delete(location)
+        self._locations_data_cache.pop(self._get_location_key(location), None)
+        return self.get_location_info(location, log).capabilities[vm_size]
+
+    def _save_location_info_to_cache(self, location_data: AzureLocation) -> None:
+        skus = {
+            vm_size: json.dumps(capability.to_dict())  # type: ignore
+            for vm_size, capability in location_data.capabilities.items()
+        }
+        self._get_location_cache().save(
+            location_data.location, location_data.updated_time, skus
+        )
+
     @retry(tries=10, delay=1, jitter=(0.5, 1))
     def _load_location_info_from_file(
         self, cached_file_name: Path, log: Logger
@@ -861,6 +1035,9 @@ class AzurePlatform(Platform):
         key = self._get_location_key(location)
         location_data = self._locations_data_cache.get(key, None)
         if not location_data:
+            location_data = self._load_location_info_from_cache(location, log)
+        if not location_data:
+            # the json file is created by previous versions, or prepared data.
             location_data = self._load_location_info_from_file(
                 cached_file_name=cached_file_name, log=log
             )
@@ -915,8 +1092,7 @@ class AzurePlatform(Platform):
                         raise identifier
             location_data = AzureLocation(location=location, capabilities=all_skus)
             log.debug(f"{location}: saving to disk")
-            with open(cached_file_name, "w") as f:
-                json.dump(location_data.to_dict(), f)  # type: ignore
+            self._save_location_info_to_cache(location_data)
             log.debug(f"{key}: new data, " f"sku: {len(location_data.capabilities)}")
 
         assert location_data
@@ -1637,25 +1813,7 @@ class AzurePlatform(Platform):
         self, capabilities: List[AzureCapability], log: Logger
     ) -> List[AzureCapability]:
         # sort vm size by predefined pattern
-
-        sorted_capabilities: List[AzureCapability] = []
-
-        found_vm_sizes: Set[str] = set()
-        # loop all fall back levels
-        for fallback_pattern in VM_SIZE_FALLBACK_PATTERNS:
-            level_capabilities: List[AzureCapability] = []
-
-            # loop all capabilities
-            for capability in capabilities:
-                vm_size = capability.vm_size
-                if fallback_pattern.match(vm_size) and vm_size not in found_vm_sizes:
-                    level_capabilities.append(capability)
-                    found_vm_sizes.add(vm_size)
-
-            # sort by rough cost
-            level_capabilities.sort(key=lambda x: (x.capability.cost))
-            sorted_capabilities.extend(level_capabilities)
-        return sorted_capabilities
+        return _sort_capabilities(capabilities)
 
     def load_public_ip(self, node: Node, log: Logger) -> str:
         node_context = get_node_context(node)
@@ -2226,10 +2384,22 @@ class AzurePlatform(Platform):
                 awaitable_capabilities,
             ) = self._parse_cap_availabilities(candidate_caps)
 
-            # sort vm sizes to match
-            available_capabilities = self.get_sorted_vm_sizes(
-                available_capabilities, log
-            )
+            node_runbook = req.get_extended_runbook(AzureNodeSchema, AZURE)
+            if node_runbook.vm_size or node_runbook.maximize_capability:
+                # sort vm sizes to match
+                available_capabilities = self.get_sorted_vm_sizes(
+                    available_capabilities, log
+                )
+            else:
+                # all vm sizes of the location are candidates. Use the sorted
+                # table of the location to filter them.
+                table = self._get_capability_table(location, log)
+                available_capabilities = table.get_candidates(
+                    req, {x.vm_size for x in available_capabilities}
+                )
+                awaitable_capabilities = table.get_candidates(
+                    req, {x.vm_size for x in awaitable_capabilities}
+                )
 
             # match vm sizes by capability or use the predefined vm sizes.
             candidate_cap = self._get_matched_capability(req, available_capabilities)
@@ -2252,6 +2422,16 @@ class AzurePlatform(Platform):
 
         return caps, error
 
+    def _get_capability_table(self, location: str, log: Logger) -> _CapabilityTable:
+        location_info = self.get_location_info(location, log)
+        key = self._get_location_key(location)
+        cached_location_info, table = self._capability_tables.get(key, (None, None))
+        # rebuild the table, if the location info is refreshed.
+        if not table or cached_location_info is not location_info:
+            table = _CapabilityTable(list(location_info.capabilities.values()))
+            self._capability_tables[key] = (location_info, table)
+        return table
+
     def _get_allowed_capabilities(
         self, req: schema.NodeSpace, location: str, log: Logger
     ) -> Tuple[List[AzureCapability], str]:
@@ -2486,6 +2666,76 @@ def _convert_to_azure_node_space(node_space: schema.NodeSpace) -> None:
         )
 
 
+def _get_fallback_level(vm_size: str) -> Optional[int]:
+    for level, fallback_pattern in enumerate(VM_SIZE_FALLBACK_PATTERNS):
+        if fallback_pattern.match(vm_size):
+            return level
+    return None
+
+
+def _sort_capabilities(capabilities: List[AzureCapability]) -> List[AzureCapability]:
+    # sort by fall back levels, and then by rough cost. If a vm size is
+    # duplicated, the first one is kept.
+    levels: Dict[str, int] = {}
+    level_capabilities: List[AzureCapability] = []
+    for capability in capabilities:
+        vm_size = capability.vm_size
+        if vm_size in levels:
+            continue
+        level = _get_fallback_level(vm_size)
+        if level is not None:
+            levels[vm_size] = level
+            level_capabilities.append(capability)
+    return sorted(
+        level_capabilities, key=lambda x: (levels[x.vm_size], x.capability.cost)
+    )
+
+
+def _get_count_space_bounds(space: search_space.CountSpace) -> Tuple[float, float]:
+    # the min and max of all possible values. None means any value.
+    if space is None:
+        return (-math.inf, math.inf)
+    if isinstance(space, int):
+        return (space, space)
+    if isinstance(space, search_space.IntRange):
+        return (space.min, space.max)
+    return (min(x.min for x in space), max(x.max for x in space))
+
+
+def _get_bounds_column(
+    spaces: Iterable[search_space.CountSpace],
+) -> Tuple[List[float], List[float]]:
+    bounds = [_get_count_space_bounds(x) for x in spaces]
+    return [x[0] for x in bounds], [x[1] for x in bounds]
+
+
+def _get_count_space_ranges(
+    space: search_space.CountSpace,
+) -> Optional[List[Tuple[float, float]]]:
+    # ranges of a requirement, a capability must overlap one of them. None means
+    # no limitation.
+    if space is None:
+        return None
+    if isinstance(space, list):
+        return [(x.min, x.max) for x in space]
+    return [_get_count_space_bounds(space)]
+
+
+def _get_set_space_mask(space: Any, bits: Dict[Any, int], add: bool = False) -> int:
+    # each item is a bit. If add is True, new items are added to bits.
+    if space is None:
+        return 0
+    if not isinstance(space, search_space.SetSpace):
+        space = [space]
+    mask = 0
+    for item in space:
+        if add:
+            mask |= bits.setdefault(item, 1 << len(bits))
+        else:
+            mask |= bits.get(item, 0)
+    return mask
+
+
 def _get_allowed_locations(nodes_requirement: List[schema.NodeSpace]) -> List[str]:
     existing_locations_str: str = ""
     for req in nodes_requirement:
@@ -2520,3 +2770,7 @@ def _get_vhd_generation(image_info: VirtualMachineImage) -> int:
         vhd_gen = int(image_info.hyper_v_generation.strip("V"))
 
     return vhd_gen
+
+
+def _decode_capability(raw: str) -> AzureCapability:
+    return schema.load_by_type(AzureCapability, json.loads(raw))
@@ -4,8 +4,9 @@
 import os
 import re
 import xml.etree.ElementTree as ET  # noqa: N817
+from functools import partial
 from pathlib import Path
-from typing import List, Type
+from typing import Dict, List, Type
 
 from lisa import schema
 from lisa.environment import Environment
@@ -18,6 +19,7 @@ from lisa.util.logger import Logger, filter_ansi_escape
 
 from .. import CLOUD_HYPERVISOR
 from .console_logger import QemuConsoleLogger
+from .image_cache import add_host_file, get_cached_image_path
 from .schema import BaseLibvirtNodeSchema, CloudHypervisorNodeSchema, DiskImageFormat
 
 CH_VERSION_PATTERN = re.compile(r"cloud-hypervisor (?P<ch_version>.+)")
@@ -65,25 +67,48 @@ class CloudHypervisorPlatform(BaseLibvirtPlatform):
         else:
             node_context.firmware_path = node_runbook.firmware
 
-    def _create_node(
-        self,
-        node: Node,
-        node_context: NodeContext,
-        environment: Environment,
-        log: Logger,
-    ) -> None:
-        if node_context.firmware_source_path:
-            self.host_node.shell.copy(
-                Path(node_context.firmware_source_path),
-                Path(node_context.firmware_path),
+    def _copy_base_images(self, nodes: List[Node]) -> None:
+        super()._copy_base_images(nodes)
+
+        # The nodes may use the same firmware, so each one is copied once.
+        firmwares: Dict[str, str] = {}
+        for node in nodes:
+            node_context = get_node_context(node)
+            if node_context.firmware_source_path:
+                firmwares[
+                    node_context.firmware_path
+                ] = node_context.firmware_source_path
+        for firmware_path, source_path in firmwares.items():
+            self.host_node.shell.copy(Path(source_path), Path(firmware_path))
+
+        if self.image_cache_dir:
+            self._convert_cached_images(nodes)
+
+    # cloud-hypervisor needs raw disks, so a qcow2 image is converted once in the
+    # cache, and the nodes copy the raw image.
+    def _convert_cached_images(self, nodes: List[Node]) -> None:
+        raw_images: Dict[str, str] = {}
+        for node in nodes:
+            node_context = get_node_context(node)
+            if node_context.os_disk_base_file_fmt != DiskImageFormat.QCOW2:
+                continue
+            local_path = (
+                node_context.os_disk_source_file_path
+                or node_context.os_disk_base_file_path
+            )
+            raw_path = get_cached_image_path(self.image_cache_dir, local_path, ".raw")
+            raw_images[raw_path] = node_context.os_disk_base_file_path
+            node_context.os_disk_base_file_path = raw_path
+            node_context.os_disk_base_file_fmt = DiskImageFormat.RAW
+
+        qemu_img = self.host_node.tools[QemuImg]
+        for raw_path, base_file_path in raw_images.items():
+            add_host_file(
+                self.host_node,
+                raw_path,
+                os.path.basename(self.vm_disks_dir),
+                partial(qemu_img.convert, "qcow2", base_file_path, "raw"),
             )
-
-        super()._create_node(
-            node,
-            node_context,
-            environment,
-            log,
-        )
 
     def _create_node_domain_xml(
         self,
@@ -184,8 +209,9 @@ class CloudHypervisorPlatform(BaseLibvirtPlatform):
                 node_context.os_disk_file_path,
             )
         else:
+            # the copy shares blocks with the image, if the file system supports.
             self.host_node.execute(
-                f"cp {node_context.os_disk_base_file_path}"
+                f"cp --reflink=auto {node_context.os_disk_base_file_path}"
                 f" {node_context.os_disk_file_path}",
                 expected_exit_code=0,
                 expected_exit_code_failure_message="Failed to copy os disk image",
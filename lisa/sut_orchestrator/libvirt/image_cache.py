@@ -0,0 +1,66 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import hashlib
+import os
+from functools import partial
+from threading import Lock
+from typing import Callable, Dict, Tuple
+
+from lisa.node import Node
+from lisa.tools import Chmod, Ls
+
+# the folder under the lisa working dir of host, which keeps the cached images.
+IMAGE_CACHE_DIR_NAME = "lisa-image-cache"
+_IMAGE_HASH_BLOCK_SIZE = 1024 * 1024
+
+# the content hash of images by the path, size and modified time. The images are
+# big, so they are hashed once in a run.
+_image_hashes: Dict[Tuple[str, int, int], str] = {}
+_image_hashes_lock = Lock()
+
+
+def get_image_hash(path: str) -> str:
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _image_hashes_lock:
+        image_hash = _image_hashes.get(key)
+        if not image_hash:
+            sha256 = hashlib.sha256()
+            with open(path, "rb") as file:
+                for block in iter(partial(file.read, _IMAGE_HASH_BLOCK_SIZE), b""):
+                    sha256.update(block)
+            image_hash = sha256.hexdigest()[:16]
+            _image_hashes[key] = image_hash
+    return image_hash
+
+
+# The name includes the content hash, so an updated image is copied again.
+def get_cached_image_path(cache_dir: str, source_path: str, suffix: str = "") -> str:
+    return os.path.join(
+        cache_dir,
+        f"{get_image_hash(source_path)}-{os.path.basename(source_path)}{suffix}",
+    )
+
+
+def add_host_file(
+    host_node: Node, path: str, temp_suffix: str, create: Callable[[str], None]
+) -> bool:
+    """
+    Create the file on the host by the create function, if it doesn't exist.
+    Other runs may use the cache at the same time, so the file is created in a
+    temp path and moved, then it shows up after it's completed. Return True, if
+    the file is created.
+    """
+    if host_node.tools[Ls].path_exists(path=path, sudo=True):
+        host_node.tools[Chmod].chmod(path, "a+r", sudo=True)
+        return False
+
+    temp_path = f"{path}.{temp_suffix}.tmp"
+    create(temp_path)
+    host_node.execute(
+        f"mv -f {temp_path} {path}",
+        expected_exit_code=0,
+        expected_exit_code_failure_message=f"failed to move {temp_path} to {path}",
+    )
+    return True
@@ -12,6 +12,7 @@ import sys
 import tempfile
 import time
 import xml.etree.ElementTree as ET  # noqa: N817
+from functools import partial
 from pathlib import Path
 from threading import Lock, Timer
 from typing import Any, Dict, List, Optional, Tuple, Type, cast
@@ -26,9 +27,10 @@ from lisa.feature import Feature
 from lisa.node import Node, RemoteNode, local_node_connect
 from lisa.operating_system import CBLMariner
 from lisa.platform_ import Platform
-from lisa.tools import Chmod, Iptables, Journalctl, Ls, QemuImg, Uname
+from lisa.tools import Iptables, Journalctl, QemuImg, Uname
 from lisa.util import LisaException, constants, get_public_key_data
 from lisa.util.logger import Logger, filter_ansi_escape
+from lisa.util.parallel import run_in_parallel
 
 from . import libvirt_events_thread
 from .console_logger import QemuConsoleLogger
@@ -38,6 +40,7 @@ from .context import (
     get_environment_context,
     get_node_context,
 )
+from .image_cache import IMAGE_CACHE_DIR_NAME, add_host_file, get_cached_image_path
 from .platform_interface import IBaseLibvirtPlatform
 from .schema import (
     FIRMWARE_TYPE_BIOS,
@@ -55,6 +58,10 @@ KEY_HOST_KERNEL = "host_kernel_version"
 KEY_LIBVIRT_VERSION = "libvirt_version"
 KEY_VMM_VERSION = "vmm_version"
 
+# the max count of nodes, which are created or deleted at the same time. It
+# limits the concurrent disk IO on the host.
+_MAX_NODE_WORKERS = 8
+
 
 class _HostCapabilities:
     def __init__(self) -> None:
@@ -75,10 +82,15 @@ class BaseLibvirtPlatform(Platform, IBaseLibvirtPlatform):
         self.platform_runbook: BaseLibvirtPlatformSchema
         self.host_node: Node
         self.vm_disks_dir: str
+        # empty, if the image cache is disabled.
+        self.image_cache_dir: str = ""
 
         # used for port forwarding in case of Remote Host
         self._next_available_port: int
         self._port_forwarding_lock: Lock
+        # nodes are created and deleted in parallel, but they share the libvirt
+        # connection.
+        self._libvirt_conn_lock: Lock
 
         self._host_environment_information_hooks = {
             KEY_HOST_DISTRO: self._get_host_distro,
@@ -109,6 +121,7 @@ class BaseLibvirtPlatform(Platform, IBaseLibvirtPlatform):
         # 49512 is the first available private port
         self._next_available_port = 49152
         self._port_forwarding_lock = Lock()
+        self._libvirt_conn_lock = Lock()
 
         self.platform_runbook = self.runbook.get_extended_runbook(
             self.__platform_runbook_type(), type_name=type(self).type_name()
@@ -339,6 +352,11 @@ class BaseLibvirtPlatform(Platform, IBaseLibvirtPlatform):
         self.vm_disks_dir = os.path.join(
             self.platform_runbook.hosts[0].lisa_working_dir, vm_name_prefix
         )
+        if self.platform_runbook.use_image_cache:
+            self.image_cache_dir = os.path.join(
+                self.platform_runbook.hosts[0].lisa_working_dir,
+                IMAGE_CACHE_DIR_NAME,
+            )
 
         assert environment.runbook.nodes_requirement
         for i, node_space in enumerate(environment.runbook.nodes_requirement):
@@ -404,9 +422,14 @@ class BaseLibvirtPlatform(Platform, IBaseLibvirtPlatform):
 
         if self.host_node.is_remote:
             node_context.os_disk_source_file_path = node_runbook.disk_img
-            node_context.os_disk_base_file_path = os.path.join(
-                self.vm_disks_dir, os.path.basename(node_runbook.disk_img)
-            )
+            if self.image_cache_dir:
+                node_context.os_disk_base_file_path = get_cached_image_path(
+                    self.image_cache_dir, node_runbook.disk_img
+                )
+            else:
+                node_context.os_disk_base_file_path = os.path.join(
+                    self.vm_disks_dir, os.path.basename(node_runbook.disk_img)
+                )
         else:
             node_context.os_disk_base_file_path = node_runbook.disk_img
 
@@ -500,15 +523,55 @@ class BaseLibvirtPlatform(Platform, IBaseLibvirtPlatform):
     ) -> None:
         self.host_node.shell.mkdir(Path(self.vm_disks_dir), exist_ok=True)
 
-        for node in environment.nodes.list():
+        nodes = list(environment.nodes.list())
+        if not nodes:
+            return
+        self._copy_base_images(nodes)
+        # install the tool before the parallel tasks, so they don't install it
+        # at the same time.
+        self.host_node.tools[QemuImg]
+
+        run_in_parallel(
+            [
+                partial(
+                    self._create_node,
+                    node,
+                    get_node_context(node),
+                    environment,
+                    log,
+                )
+                for node in nodes
+            ],
+            log,
+            max_workers=_MAX_NODE_WORKERS,
+        )
+
+    # The nodes may use the same base image, so each image is copied once.
+    def _copy_base_images(self, nodes: List[Node]) -> None:
+        base_images: Dict[str, str] = {}
+        for node in nodes:
             node_context = get_node_context(node)
-            self._create_node(
-                node,
-                node_context,
-                environment,
-                log,
+            if node_context.os_disk_source_file_path:
+                base_images[
+                    node_context.os_disk_base_file_path
+                ] = node_context.os_disk_source_file_path
+
+        if self.image_cache_dir:
+            self.host_node.shell.mkdir(Path(self.image_cache_dir), exist_ok=True)
+
+        # Create required directories and copy the required files to the host
+        # node. The cached images are reused.
+        for base_file_path, source_file_path in base_images.items():
+            add_host_file(
+                self.host_node,
+                base_file_path,
+                os.path.basename(self.vm_disks_dir),
+                partial(self._copy_to_host, source_file_path),
             )
 
+    def _copy_to_host(self, source_path: str, destination_path: str) -> None:
+        self.host_node.shell.copy(Path(source_path), Path(destination_path))
+
     def _create_node(
         self,
         node: Node,
@@ -516,22 +579,6 @@ class BaseLibvirtPlatform(Platform, IBaseLibvirtPlatform):
         environment: Environment,
         log: Logger,
     ) -> None:
-        # Create required directories and copy the required files to the host
-        # node.
-        if node_context.os_disk_source_file_path:
-            source_exists = self.host_node.tools[Ls].path_exists(
-                path=node_context.os_disk_base_file_path, sudo=True
-            )
-            if source_exists:
-                self.host_node.tools[Chmod].chmod(
-                    node_context.os_disk_base_file_path, "a+r", sudo=True
-                )
-            else:
-                self.host_node.shell.copy(
-                    Path(node_context.os_disk_source_file_path),
-                    Path(node_context.os_disk_base_file_path),
-                )
-
         # Create cloud-init ISO file.
         self._create_node_cloud_init_iso(environment, log, node)
 
@@ -543,17 +590,25 @@ class BaseLibvirtPlatform(Platform, IBaseLibvirtPlatform):
 
         # Create libvirt domain (i.e. VM).
         xml = self._create_node_domain_xml(environment, log, node)
-        node_context.domain = self.libvirt_conn.defineXML(xml)
+        # The calls on the shared connection are serialized. They return once
+        # the VM is started, and the VM boots without the lock.
+        with self._libvirt_conn_lock:
+            node_context.domain = self.libvirt_conn.defineXML(xml)
 
-        self._create_domain_and_attach_logger(
-            node_context,
-        )
+            self._create_domain_and_attach_logger(
+                node_context,
+            )
 
     # Delete all the VMs.
     def _delete_nodes(self, environment: Environment, log: Logger) -> None:
         # Delete nodes.
-        for node in environment.nodes.list():
-            self._delete_node(node, log)
+        nodes = list(environment.nodes.list())
+        if nodes:
+            run_in_parallel(
+                [partial(self._delete_node, node, log) for node in nodes],
+                log,
+                max_workers=_MAX_NODE_WORKERS,
+            )
 
         # Delete VM disks directory.
         try:
@@ -569,10 +624,10 @@ class BaseLibvirtPlatform(Platform, IBaseLibvirtPlatform):
     def _delete_node(self, node: Node, log: Logger) -> None:
         node_context = get_node_context(node)
 
+        # Stop the VM. The VMs are stopped in parallel.
         watchdog = Timer(60.0, self._delete_node_watchdog_callback)
         watchdog.start()
 
-        # Stop the VM.
         if node_context.domain:
             log.debug(f"Stop VM: {node_context.vm_name}")
             try:
@@ -581,6 +636,18 @@ class BaseLibvirtPlatform(Platform, IBaseLibvirtPlatform):
             except libvirt.libvirtError as ex:
                 log.warning(f"VM stop failed. {ex}")
 
+        watchdog.cancel()
+
+        # A VM shouldn't be undefined, when the console stream of another VM is
+        # closing, so closing and undefining are serialized. The watchdog starts
+        # after the lock is acquired, so waiting for other nodes doesn't count.
+        with self._libvirt_conn_lock:
+            self._undefine_node(node_context, log)
+
+    def _undefine_node(self, node_context: NodeContext, log: Logger) -> None:
+        watchdog = Timer(60.0, self._delete_node_watchdog_callback)
+        watchdog.start()
+
         # Wait for console log to close.
         # Note: libvirt can deadlock if you try to undefine the VM while the stream
         # is trying to close.
@@ -622,63 +689,83 @@ class BaseLibvirtPlatform(Platform, IBaseLibvirtPlatform):
         # Give all the VMs some time to boot and then acquire an IP address.
         timeout = time.time() + environment_context.network_boot_timeout
 
+        address = ""
         if self.host_node.is_remote:
             remote_node = cast(RemoteNode, self.host_node)
             conn_info = remote_node.connection_info
             address = conn_info[constants.ENVIRONMENTS_NODES_REMOTE_ADDRESS]
 
-        for node in environment.nodes.list():
-            assert isinstance(node, RemoteNode)
-
-            # Get the VM's IP address.
-            local_address = self._get_node_ip_address(environment, log, node, timeout)
-
-            node_port = 22
-            if self.host_node.is_remote:
-                with self._port_forwarding_lock:
-                    port_not_found = True
-                    while port_not_found:
-                        if self._next_available_port > 65535:
-                            raise LisaException(
-                                "No available ports on the host to forward"
-                            )
-
-                        # check if the port is already in use
-                        output = self.host_node.execute(
-                            f"nc -vz 127.0.0.1 {self._next_available_port}"
-                        )
-                        if output.exit_code == 1:  # port not in use
-                            node_port = self._next_available_port
-                            port_not_found = False
-                        self._next_available_port += 1
-
-                self.host_node.tools[Iptables].start_forwarding(
-                    node_port, local_address, 22
+        run_in_parallel(
+            [
+                partial(
+                    self._fill_node_metadata,
+                    environment,
+                    log,
+                    node,
+                    timeout,
+                    address,
                 )
+                for node in environment.nodes.list()
+            ],
+            log,
+        )
 
-                environment_context.port_forwarding_list.append(
-                    (node_port, local_address)
-                )
-            else:
-                address = local_address
-
-            # Set SSH connection info for the node.
-            node.set_connection_info(
-                address=local_address,
-                public_address=address,
-                public_port=node_port,
-                username=self.runbook.admin_username,
-                private_key_file=self.runbook.admin_private_key_file,
-            )
+    def _fill_node_metadata(
+        self,
+        environment: Environment,
+        log: Logger,
+        node: Node,
+        timeout: float,
+        address: str,
+    ) -> None:
+        environment_context = get_environment_context(environment)
+        assert isinstance(node, RemoteNode)
 
-            # Ensure cloud-init completes its setup.
-            node.execute(
-                "cloud-init status --wait",
-                sudo=True,
-                expected_exit_code=0,
-                expected_exit_code_failure_message="waiting on cloud-init",
+        # Get the VM's IP address.
+        local_address = self._get_node_ip_address(environment, log, node, timeout)
+
+        node_port = 22
+        if self.host_node.is_remote:
+            with self._port_forwarding_lock:
+                port_not_found = True
+                while port_not_found:
+                    if self._next_available_port > 65535:
+                        raise LisaException("No available ports on the host to forward")
+
+                    # check if the port is already in use
+                    output = self.host_node.execute(
+                        f"nc -vz 127.0.0.1 {self._next_available_port}"
+                    )
+                    if output.exit_code == 1:  # port not in use
+                        node_port = self._next_available_port
+                        port_not_found = False
+                    self._next_available_port += 1
+
+            self.host_node.tools[Iptables].start_forwarding(
+                node_port, local_address, 22
             )
 
+            environment_context.port_forwarding_list.append((node_port, local_address))
+        else:
+            address = local_address
+
+        # Set SSH connection info for the node.
+        node.set_connection_info(
+            address=local_address,
+            public_address=address,
+            public_port=node_port,
+            username=self.runbook.admin_username,
+            private_key_file=self.runbook.admin_private_key_file,
+        )
+
+        # Ensure cloud-init completes its setup.
+        node.execute(
+            "cloud-init status --wait",
+            sudo=True,
+            expected_exit_code=0,
+            expected_exit_code_failure_message="waiting on cloud-init",
+        )
+
     # Create a cloud-init ISO for a VM.
     def _create_node_cloud_init_iso(
         self, environment: Environment, log: Logger, node: Node
@@ -1022,7 +1109,8 @@ class BaseLibvirtPlatform(Platform, IBaseLibvirtPlatform):
     ) -> Optional[str]:
         node_context = get_node_context(node)
 
-        domain = self.libvirt_conn.lookupByName(node_context.vm_name)
+        with self._libvirt_conn_lock:
+            domain = self.libvirt_conn.lookupByName(node_context.vm_name)
 
         # Acquire IP address from libvirt's DHCP server.
         interfaces = domain.interfaceAddresses(
@@ -1046,9 +1134,10 @@ class BaseLibvirtPlatform(Platform, IBaseLibvirtPlatform):
         enable_secure_boot: bool,
     ) -> Dict[str, Any]:
         # Resolve the machine type to its full name.
-        domain_caps_str = self.libvirt_conn.getDomainCapabilities(
-            machine=machine_type, virttype="kvm"
-        )
+        with self._libvirt_conn_lock:
+            domain_caps_str = self.libvirt_conn.getDomainCapabilities(
+                machine=machine_type, virttype="kvm"
+            )
         domain_caps = ET.fromstring(domain_caps_str)
 
         full_machine_type = domain_caps.findall("./machine")[0].text
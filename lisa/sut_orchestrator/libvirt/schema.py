@@ -47,6 +47,14 @@ class BaseLibvirtPlatformSchema:
     # Specified in seconds. Default: 30s.
     network_boot_timeout: Optional[float] = None
 
+    # Whether to keep OS disk images in a cache directory of the host. The
+    # images are keyed by the content hash, so later environments reuse them,
+    # instead of copying or converting them again. The cache is in the
+    # "lisa-image-cache" folder of lisa_working_dir. It's not cleaned up, so an
+    # image stays there after it's updated, remove the old images, if the disk
+    # space is needed.
+    use_image_cache: bool = False
+
 
 # Possible disk image formats
 class DiskImageFormat(Enum):
@@ -3,30 +3,49 @@
 
 import re
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Optional, Tuple
 
 from lisa import features
 
 from .context import get_node_context
 
+# ANSI control codes
+_ANSI_PATTERN = re.compile(b"\x1b\\[[0-9;]*[mGKF]")
+# the control code may be cut at the end of file, when it's being written.
+_PARTIAL_ANSI_PATTERN = re.compile(b"\x1b(\\[[0-9;]*)?$")
+
 
 # Implements the SerialConsole feature.
 class SerialConsole(features.SerialConsole):
     def _initialize(self, *args: Any, **kwargs: Any) -> None:
         super()._initialize(*args, **kwargs)
+        # the read position of the log file. The control codes are removed, so
+        # it's different with the offset of fetched content.
+        self._file_offset = 0
 
     def _get_console_log(self, saved_path: Optional[Path]) -> bytes:
         node_context = get_node_context(self._node)
+        with open(node_context.console_log_file_path, mode="rb") as file:
+            log = file.read()
+        return _ANSI_PATTERN.sub(b"", log)
+
+    def _get_console_log_after(
+        self, offset: int, saved_path: Optional[Path]
+    ) -> Tuple[int, bytes]:
+        node_context = get_node_context(self._node)
+        if not offset:
+            self._file_offset = 0
 
         # Open the log file.
         # This file is simultaneously being written to by QemuConsoleLogger.
-        with open(
-            node_context.console_log_file_path, mode="r", encoding="utf-8"
-        ) as file:
+        with open(node_context.console_log_file_path, mode="rb") as file:
+            file.seek(self._file_offset)
             log = file.read()
 
-        # Remove ANSI control codes.
-        log = re.sub("\x1b\\[[0-9;]*[mGKF]", "", log)
+        partial_code = _PARTIAL_ANSI_PATTERN.search(log)
+        if partial_code:
+            log = log[: partial_code.start()]
+        self._file_offset += len(log)
 
-        log_bytes = log.encode("utf-8")
-        return log_bytes
+        # Remove ANSI control codes.
+        return offset, _ANSI_PATTERN.sub(b"", log)
@@ -186,40 +186,17 @@ class TestResult:
         self, environment: Environment, save_reason: bool = False
     ) -> bool:
         requirement = self.runtime_data.metadata.requirement
-        assert requirement.environment
-        check_result = requirement.environment.check(environment.capability)
-        if (
-            check_result.result
-            and requirement.os_type
-            and environment.status == EnvironmentStatus.Connected
-        ):
-            for node in environment.nodes.list():
-                # the UT has no OS initialized, skip the check
-                if not hasattr(node, "os"):
-                    continue
-                # use __mro__ to match any super types.
-                # for example, Ubuntu satisfies Linux
-                node_os_capability = search_space.SetSpace[Type[OperatingSystem]](
-                    is_allow_set=True, items=type(node.os).__mro__
-                )
-                os_result = requirement.os_type.check(node_os_capability)
-                # If one of OS mismatches, mark the test case is skipped. It
-                # assumes no more env can meet the requirements, instead of
-                # checking the rest envs one by one. The reason is this checking
-                # is a dynamic checking, and it needs to be checked in each
-                # deployed environment. It may cause to deploy a lot of
-                # environment for checking. In another hand, the OS should be
-                # the same for all environments in the same lisa runner. So it's
-                # safe to skip a test case on first os mismatched.
-                if not os_result.result:
-                    raise SkippedException(f"OS type mismatch: {os_result.reasons}")
+        check_result = requirement.check_environment(environment)
         if save_reason:
-            if self.check_results:
-                self.check_results.merge(check_result)
-            else:
-                self.check_results = check_result
+            self.save_check_result(check_result)
         return check_result.result
 
+    def save_check_result(self, check_result: search_space.ResultReason) -> None:
+        if self.check_results:
+            self.check_results.merge(check_result)
+        else:
+            self.check_results = check_result
+
     def get_elapsed(self) -> float:
         if not hasattr(self, "_timer"):
             return 0.0
@@ -271,6 +248,36 @@ class TestCaseRequirement:
     platform_type: Optional[search_space.SetSpace[str]] = None
     os_type: Optional[search_space.SetSpace[Type[OperatingSystem]]] = None
 
+    def check_environment(self, environment: Environment) -> search_space.ResultReason:
+        assert self.environment
+        check_result = self.environment.check(environment.capability)
+        if (
+            check_result.result
+            and self.os_type
+            and environment.status == EnvironmentStatus.Connected
+        ):
+            for node in environment.nodes.list():
+                # the UT has no OS initialized, skip the check
+                if not hasattr(node, "os"):
+                    continue
+                # use __mro__ to match any super types.
+                # for example, Ubuntu satisfies Linux
+                node_os_capability = search_space.SetSpace[Type[OperatingSystem]](
+                    is_allow_set=True, items=type(node.os).__mro__
+                )
+                os_result = self.os_type.check(node_os_capability)
+                # If one of OS mismatches, mark the test case is skipped. It
+                # assumes no more env can meet the requirements, instead of
+                # checking the rest envs one by one. The reason is this checking
+                # is a dynamic checking, and it needs to be checked in each
+                # deployed environment. It may cause to deploy a lot of
+                # environment for checking. In another hand, the OS should be
+                # the same for all environments in the same lisa runner. So it's
+                # safe to skip a test case on first os mismatched.
+                if not os_result.result:
+                    raise SkippedException(f"OS type mismatch: {os_result.reasons}")
+        return check_result
+
 
 def _create_test_case_requirement(
     node: schema.NodeSpace,
@@ -2,7 +2,7 @@
 # Licensed under the MIT license.
 
 import re
-from typing import List
+from typing import Any, List
 
 from semver import VersionInfo
 
@@ -12,13 +12,28 @@ from lisa.util.process import ExecutableResult
 
 
 class Dmesg(Tool):
-    # meet any pattern will be considered as potential error line.
-    __errors_patterns = [
-        re.compile("Call Trace"),
-        re.compile("rcu_sched self-detected stall on CPU"),
-        re.compile("rcu_sched detected stalls on"),
-        re.compile("BUG: soft lockup"),
-    ]
+    # meet any pattern will be considered as potential error line. They are
+    # combined to one pattern, so each line is searched once.
+    __errors_pattern = re.compile(
+        "|".join(
+            [
+                "Call Trace",
+                "rcu_sched self-detected stall on CPU",
+                "rcu_sched detected stalls on",
+                "BUG: soft lockup",
+            ]
+        )
+    )
+
+    # [    3.191822] hv_vmbus: Vmbus version:3.0
+    __timestamp_pattern = re.compile(r"^\[\s*(?P<timestamp>\d+\.\d+)\]")
+    # The awk script prints lines after the timestamp. The lines without
+    # timestamp are continued lines, so they follow the previous line.
+    __new_lines_script = (
+        r"match($0, /^\[ *[0-9]+\.[0-9]+\]/) "
+        r"{ t = substr($0, RSTART + 1, RLENGTH - 2) + 0 } t > last"
+    )
+    __boot_id_path = "/proc/sys/kernel/random/boot_id"
 
     # [   3.191822] hv_vmbus: Hyper-V Host Build:18362-10.0-3-0.3294; Vmbus version:3.0
     # [   3.191822] hv_vmbus: Vmbus version:3.0
@@ -33,6 +48,13 @@ class Dmesg(Tool):
     def _check_exists(self) -> bool:
         return True
 
+    def _initialize(self, *args: Any, **kwargs: Any) -> None:
+        # the state of incremental check. The tool is kept in the node, so the
+        # state is kept across test cases in the same environment.
+        self._boot_id = ""
+        self._last_timestamp = -1.0
+        self._need_sudo = False
+
     def get_output(self, force_run: bool = False) -> str:
         command_output = self._run(force_run=force_run)
         return command_output.stdout
@@ -41,16 +63,19 @@ class Dmesg(Tool):
         self,
         force_run: bool = False,
         throw_error: bool = True,
+        incremental: bool = False,
     ) -> str:
-        command_output = self._run(force_run=force_run)
-        command_output.assert_exit_code()
-        matched_lines: List[str] = []
-        for line in command_output.stdout.splitlines(keepends=False):
-            for pattern in self.__errors_patterns:
-                if pattern.search(line):
-                    matched_lines.append(line)
-                    # match one rule, so skip for other patterns
-                    break
+        """
+        If incremental is True, only lines after last incremental check are
+        read and checked, so the same errors are not reported again.
+        """
+        if incremental:
+            lines = self._get_new_lines()
+        else:
+            command_output = self._run(force_run=force_run)
+            command_output.assert_exit_code()
+            lines = command_output.stdout.splitlines(keepends=False)
+        matched_lines = [x for x in lines if self.__errors_pattern.search(x)]
         result = "\n".join(matched_lines)
         if result:
             # log first line only, in case it's too long
@@ -88,5 +113,42 @@ class Dmesg(Tool):
         if result.exit_code != 0:
             # may need sudo
             result = self.run(sudo=True, force_run=force_run)
+            self._need_sudo = True
         self._cached_result = result
         return result
+
+    def _get_new_lines(self) -> List[str]:
+        if self._boot_id:
+            # the boot id is printed first. The timestamps restart after reboot,
+            # so the boot id is compared.
+            result = self.node.execute(
+                f"cat {self.__boot_id_path} && {self.command} | "
+                f"awk -v last={self._last_timestamp} '{self.__new_lines_script}'",
+                shell=True,
+                sudo=self._need_sudo,
+                expected_exit_code=0,
+                expected_exit_code_failure_message="failed to read new dmesg lines",
+            )
+            boot_id, _, output = result.stdout.partition("\n")
+            if boot_id.strip() == self._boot_id:
+                return self._update_last_timestamp(output)
+            self._log.debug("the node is rebooted, read all dmesg lines.")
+
+        self._boot_id = self.node.execute(
+            f"cat {self.__boot_id_path}", expected_exit_code=0
+        ).stdout.strip()
+        command_output = self._run(force_run=True)
+        command_output.assert_exit_code()
+        self._last_timestamp = -1.0
+        return self._update_last_timestamp(command_output.stdout)
+
+    def _update_last_timestamp(self, output: str) -> List[str]:
+        lines = output.splitlines(keepends=False)
+        for line in reversed(lines):
+            matched = self.__timestamp_pattern.match(line)
+            if matched:
+                self._last_timestamp = max(
+                    self._last_timestamp, float(matched.group("timestamp"))
+                )
+                break
+        return lines
@@ -326,6 +326,14 @@ class Fio(Tool):
 
     def _install_from_src(self) -> bool:
         self._install_dep_packages()
+        self._install_cached(
+            self._build_from_src,
+            ["/usr/local/bin/fio", "/usr/bin/fio"],
+            version=f"{self.fio_repo}|{self.branch}",
+        )
+        return self._check_exists()
+
+    def _build_from_src(self) -> None:
         tool_path = self.get_tool_path()
         self.node.shell.mkdir(tool_path, exist_ok=True)
         git = self.node.tools[Git]
@@ -341,4 +349,3 @@ class Fio(Tool):
         self.node.execute(
             "ln -s /usr/local/bin/fio /usr/bin/fio", sudo=True, cwd=code_path
         ).assert_exit_code()
-        return self._check_exists()
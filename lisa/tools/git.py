@@ -189,6 +189,22 @@ class Git(Tool):
         )
         return filter_ansi_escape(result.stdout)
 
+    def get_remote_commit_id(self, url: str, ref: str = "HEAD") -> str:
+        """
+        Return the commit id of the ref in the remote repo without cloning it. It
+        returns empty, if the ref cannot be resolved.
+        """
+        result = self.run(
+            f"ls-remote {url} {ref}",
+            shell=True,
+            force_run=True,
+            no_error_log=True,
+        )
+        output = filter_ansi_escape(result.stdout).split()
+        if result.exit_code != 0 or not output:
+            return ""
+        return output[0]
+
     def init_submodules(self, cwd: pathlib.PurePath) -> None:
         self.run(
             "submodule update --init",
@@ -4,6 +4,7 @@ import json
 import re
 import time
 from decimal import Decimal
+from functools import partial
 from typing import TYPE_CHECKING, Any, Dict, List, Pattern, Type, cast
 
 from retry import retry
@@ -441,9 +442,22 @@ class Iperf3(Tool):
         firewall.stop()
 
     def _install_from_src(self) -> None:
+        # the default branch moves, so the built commit is in the cache key.
+        commit_id = self.node.tools[Git].get_remote_commit_id(self._repo)
+        self._install_cached(
+            partial(self._build_from_src, commit_id),
+            [
+                "/usr/local/bin/iperf3",
+                "/usr/local/lib/libiperf*",
+                "/usr/bin/iperf3",
+            ],
+            version=f"{self._repo}|{commit_id}" if commit_id else "",
+        )
+
+    def _build_from_src(self, commit_id: str = "") -> None:
         tool_path = self.get_tool_path()
         git = self.node.tools[Git]
-        git.clone(self._repo, tool_path)
+        git.clone(self._repo, tool_path, ref=commit_id)
         code_path = tool_path.joinpath("iperf")
         make = self.node.tools[Make]
         self.node.execute("./configure", cwd=code_path).assert_exit_code()
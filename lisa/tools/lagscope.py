@@ -3,6 +3,7 @@
 
 import re
 from decimal import Decimal
+from functools import partial
 from typing import TYPE_CHECKING, Any, Dict, List, Type, cast
 
 from lisa import notifier
@@ -289,9 +290,19 @@ class Lagscope(Tool, KillableMixin):
 
     def _install(self) -> bool:
         self._install_dep_packages()
+        # the branch moves, so the built commit is in the cache key.
+        commit_id = self.node.tools[Git].get_remote_commit_id(self.repo, self.branch)
+        self._install_cached(
+            partial(self._build_from_src, commit_id),
+            ["/usr/local/bin/lagscope", "/usr/bin/lagscope"],
+            version=f"{self.repo}|{commit_id}" if commit_id else "",
+        )
+        return self._check_exists()
+
+    def _build_from_src(self, commit_id: str = "") -> None:
         tool_path = self.get_tool_path()
         git = self.node.tools[Git]
-        git.clone(self.repo, tool_path, ref=self.branch)
+        git.clone(self.repo, tool_path, ref=commit_id or self.branch)
         code_path = tool_path.joinpath("lagscope")
         self.node.execute(
             "./do-cmake.sh build",
@@ -315,7 +326,6 @@ class Lagscope(Tool, KillableMixin):
             expected_exit_code=0,
             expected_exit_code_failure_message="fail to create symlink to lagscope",
         )
-        return self._check_exists()
 
     def _install_dep_packages(self) -> None:
         posix_os: Posix = cast(Posix, self.node.os)
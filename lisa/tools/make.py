@@ -8,6 +8,7 @@ from lisa.executable import Tool
 from lisa.operating_system import Posix
 from lisa.tools.gcc import Gcc
 from lisa.tools.lscpu import Lscpu
+from lisa.util.process import Process
 
 if TYPE_CHECKING:
     from lisa.node import Node
@@ -66,6 +67,34 @@ class Make(Tool):
         thread_count: int = 0,
         update_envs: Optional[Dict[str, str]] = None,
     ) -> None:
+        process = self.make_async(
+            arguments=arguments,
+            cwd=cwd,
+            is_clean=is_clean,
+            sudo=sudo,
+            timeout=timeout,
+            thread_count=thread_count,
+            update_envs=update_envs,
+        )
+        process.wait_result(
+            timeout=timeout,
+            expected_exit_code=0,
+            expected_exit_code_failure_message="Failed to make",
+        )
+
+    def make_async(
+        self,
+        arguments: str,
+        cwd: PurePath,
+        is_clean: bool = False,
+        sudo: bool = False,
+        timeout: int = 600,
+        thread_count: int = 0,
+        update_envs: Optional[Dict[str, str]] = None,
+    ) -> Process:
+        """
+        Start make, and return the process. The timeout is used by clean only.
+        """
         if thread_count == 0:
             if self._thread_count == 0:
                 lscpu = self.node.tools[Lscpu]
@@ -84,13 +113,10 @@ class Make(Tool):
             )
 
         # yes '' answers all questions with default value.
-        self.node.execute(
+        return self.node.execute_async(
             f"yes '' | make -j{thread_count} {arguments}",
             cwd=cwd,
-            timeout=timeout,
             sudo=sudo,
             shell=True,
             update_envs=update_envs,
-            expected_exit_code=0,
-            expected_exit_code_failure_message="Failed to make",
         )
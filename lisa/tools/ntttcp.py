@@ -3,6 +3,7 @@
 
 import re
 from decimal import Decimal
+from functools import partial
 from typing import TYPE_CHECKING, Any, Dict, List, Type
 
 from lisa.executable import Tool
@@ -438,16 +439,25 @@ class Ntttcp(Tool):
                     "zlib-devel",
                 ]
             )
+        # the default branch moves, so the built commit is in the cache key.
+        commit_id = self.node.tools[Git].get_remote_commit_id(self.repo)
+        self._install_cached(
+            partial(self._build_from_src, commit_id),
+            ["/usr/local/bin/ntttcp", "/usr/bin/ntttcp"],
+            version=f"{self.repo}|{commit_id}" if commit_id else "",
+        )
+        return self._check_exists()
+
+    def _build_from_src(self, commit_id: str = "") -> None:
         tool_path = self.get_tool_path()
         git = self.node.tools[Git]
-        git.clone(self.repo, tool_path)
+        git.clone(self.repo, tool_path, ref=commit_id)
         make = self.node.tools[Make]
         code_path = tool_path.joinpath("ntttcp-for-linux/src")
         make.make_install(cwd=code_path)
         self.node.execute(
             "ln -s /usr/local/bin/ntttcp /usr/bin/ntttcp", sudo=True, cwd=code_path
         ).assert_exit_code()
-        return self._check_exists()
 
     def _set_tasks_max(self) -> None:
         need_reboot = False
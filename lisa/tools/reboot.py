@@ -138,6 +138,7 @@ class Reboot(Tool):
                 raise LisaException(
                     "timeout to wait reboot, the node may stuck on reboot command."
                 )
+        self.node.mark_rebooted()
 
 
 class WindowsReboot(Reboot):
@@ -195,3 +196,4 @@ class WindowsReboot(Reboot):
             raise LisaException(
                 "timeout to wait reboot, the node may not perform reboot."
             )
+        self.node.mark_rebooted()
@@ -2,21 +2,27 @@
 # Licensed under the MIT license.
 
 from dataclasses import dataclass, field
-from pathlib import PurePath
-from typing import Any, List, Optional, Type, cast
+from functools import partial
+from pathlib import Path, PurePath
+from typing import Any, Dict, List, Optional, Tuple, Type, cast
 
 from dataclasses_json import dataclass_json
 
 from lisa import schema
 from lisa.base_tools import Mv
-from lisa.node import Node
-from lisa.operating_system import Redhat, Ubuntu
+from lisa.node import Node, quick_connect
+from lisa.operating_system import Posix, Redhat, Ubuntu
 from lisa.tools import Echo, Git, Make, Sed, Uname
-from lisa.util import LisaException, field_metadata, subclasses
+from lisa.util import LisaException, constants, field_metadata, subclasses
 from lisa.util.logger import Logger, get_logger
+from lisa.util.parallel import run_in_parallel
+from lisa.util.perf_timer import create_timer
 
 from .kernel_installer import BaseInstaller, BaseInstallerSchema
 
+# the interval in seconds to log the progress of building.
+_PROGRESS_INTERVAL = 60
+
 
 @dataclass_json()
 @dataclass
@@ -77,6 +83,17 @@ class SourceInstallerSchema(BaseInstallerSchema):
     # Steps to modify code by patches and others.
     modifier: List[BaseModifierSchema] = field(default_factory=list)
 
+    # the count of make jobs. The count of CPUs is used, if it's 0.
+    thread_count: int = 0
+    # cache compiled objects by ccache, so rebuilding similar code is faster.
+    use_ccache: bool = False
+    # the ccache folder on the node. It's kept across runs. The default is in
+    # the lisa_working folder.
+    ccache_path: str = ""
+    # If targets are set, the kernel is built to packages once, and the
+    # packages are installed on the target nodes in parallel.
+    targets: List[schema.RemoteNode] = field(default_factory=list)
+
 
 class SourceInstaller(BaseInstaller):
     @classmethod
@@ -101,6 +118,7 @@ class SourceInstaller(BaseInstaller):
         assert runbook.location, "the repo must be defined."
 
         self._install_build_tools(node)
+        self._make_arguments, self._make_envs = self._get_make_settings(node)
 
         factory = subclasses.Factory[BaseLocation](BaseLocation)
         source = factory.create_by_runbook(
@@ -131,15 +149,82 @@ class SourceInstaller(BaseInstaller):
         )
         result.assert_exit_code()
 
+        if self._make_envs:
+            result = node.execute("ccache -s", update_envs=self._make_envs)
+            self._log.debug(f"ccache statistics: {result.stdout}")
+
+        if runbook.targets:
+            self._install_on_targets(node, code_path, kernel_version)
+
         return kernel_version
 
-    def _install_build(self, node: Node, code_path: PurePath) -> None:
+    def _get_make_settings(self, node: Node) -> Tuple[str, Dict[str, str]]:
+        runbook: SourceInstallerSchema = self.runbook
+        if not runbook.use_ccache:
+            return "", {}
+        # ccache may not be in the repo of some distros, so build without it.
+        result = node.execute("command -v ccache", shell=True)
+        if result.exit_code != 0:
+            self._log.info("ccache is not installed, build without ccache.")
+            return "", {}
+
+        if runbook.ccache_path:
+            ccache_path = node.get_pure_path(runbook.ccache_path)
+        else:
+            ccache_path = node.get_working_path().parent.parent / "ccache"
+        node.execute(f"mkdir -p {ccache_path}", sudo=True)
+        node.execute(f"chmod 777 {ccache_path}", sudo=True)
+        # the steps with sudo write the cache too, so make files writable for
+        # all. The same compiler must be used in all steps, or the kernel build
+        # rebuilds all objects.
+        envs = {"CCACHE_DIR": str(ccache_path), "CCACHE_UMASK": "000"}
+        return 'CC="ccache gcc"', envs
+
+    def _make(
+        self,
+        node: Node,
+        code_path: PurePath,
+        arguments: str = "",
+        sudo: bool = False,
+        timeout: int = 600,
+    ) -> None:
+        runbook: SourceInstallerSchema = self.runbook
         make = node.tools[Make]
-        make.make(arguments="modules", cwd=code_path, sudo=True)
+        process = make.make_async(
+            arguments=f"{arguments} {self._make_arguments}".strip(),
+            cwd=code_path,
+            sudo=sudo,
+            thread_count=runbook.thread_count,
+            update_envs=self._make_envs,
+        )
+        # log the last line of output on intervals, so the progress of a long
+        # build is visible. It returns once the process exits.
+        timer = create_timer()
+        position = 0
+        while not process.wait_exit(
+            min(_PROGRESS_INTERVAL, max(timeout - timer.elapsed(False), 0))
+        ):
+            if timer.elapsed(False) >= timeout:
+                break
+            output, position = process.read_output(position)
+            lines = output.strip().splitlines()
+            if lines:
+                self._log.info(
+                    f"make {arguments}: {lines[-1].strip()} "
+                    f"({timer.elapsed(False):.0f}s)"
+                )
+        process.wait_result(
+            timeout=max(timeout - timer.elapsed(False), 1),
+            expected_exit_code=0,
+            expected_exit_code_failure_message=f"failed to make {arguments}",
+        )
 
-        make.make(arguments="modules_install", cwd=code_path, sudo=True)
+    def _install_build(self, node: Node, code_path: PurePath) -> None:
+        self._make(node, code_path, arguments="modules", sudo=True)
+
+        self._make(node, code_path, arguments="modules_install", sudo=True)
 
-        make.make(arguments="install", cwd=code_path, sudo=True)
+        self._make(node, code_path, arguments="install", sudo=True)
 
         # The build for Redhat needs extra steps than RPM package. So put it
         # here, not in OS.
@@ -227,13 +312,112 @@ class SourceInstaller(BaseInstaller):
             )
             result.assert_exit_code()
 
-        make = node.tools[Make]
-        make.make(arguments="olddefconfig", cwd=code_path)
+        self._make(node, code_path, arguments="olddefconfig")
 
         # set timeout to 2 hours
-        make.make(arguments="", cwd=code_path, timeout=60 * 60 * 2)
+        self._make(node, code_path, timeout=60 * 60 * 2)
+
+    def _install_on_targets(
+        self, node: Node, code_path: PurePath, kernel_version: str
+    ) -> None:
+        runbook: SourceInstallerSchema = self.runbook
+        self._log.info(f"building packages for {len(runbook.targets)} targets...")
+        if isinstance(node.os, Redhat):
+            cast(Posix, node.os).install_packages("rpm-build")
+            self._make(node, code_path, arguments="binrpm-pkg", timeout=60 * 60)
+            # the version in rpm package name uses "_" instead of "-".
+            rpm_version = kernel_version.replace("-", "_")
+            package_patterns = [f"$HOME/rpmbuild/RPMS/*/kernel-{rpm_version}-*.rpm"]
+        else:
+            self._make(node, code_path, arguments="bindeb-pkg", timeout=60 * 60)
+            package_patterns = [
+                f"{code_path.parent}/linux-image-{kernel_version}_*.deb",
+                f"{code_path.parent}/linux-headers-{kernel_version}_*.deb",
+            ]
+
+        local_path = constants.RUN_LOCAL_WORKING_PATH / "kernel_packages"
+        local_path.mkdir(parents=True, exist_ok=True)
+        local_packages: List[Path] = []
+        for package_pattern in package_patterns:
+            # the latest package is built by this run.
+            result = node.execute(
+                f"ls -t {package_pattern} 2>/dev/null | head -n 1",
+                shell=True,
+                expected_exit_code=0,
+                expected_exit_code_failure_message="failed to find kernel packages",
+            )
+            if not result.stdout:
+                raise LisaException(f"cannot find kernel package: {package_pattern}")
+            package_path = node.get_pure_path(result.stdout)
+            local_package = local_path / package_path.name
+            node.shell.copy_back(package_path, local_package)
+            local_packages.append(local_package)
+
+        run_in_parallel(
+            [
+                partial(
+                    self._install_on_target,
+                    target_runbook,
+                    index,
+                    local_packages,
+                    kernel_version,
+                )
+                for index, target_runbook in enumerate(runbook.targets)
+            ],
+            self._log,
+        )
+
+    def _install_on_target(
+        self,
+        target_runbook: schema.RemoteNode,
+        index: int,
+        packages: List[Path],
+        kernel_version: str,
+    ) -> None:
+        target = quick_connect(
+            target_runbook, f"target_{index}", parent_logger=self._log
+        )
+        target_path = target.working_path / "kernel_packages"
+        target.shell.mkdir(target_path, exist_ok=True)
+        target_packages: List[str] = []
+        for package in packages:
+            target.shell.copy(package, target_path / package.name)
+            target_packages.append(str(target_path / package.name))
+
+        if isinstance(target.os, Redhat):
+            target.execute(
+                f"rpm -ivh --force {' '.join(target_packages)}",
+                sudo=True,
+                timeout=1800,
+                expected_exit_code=0,
+                expected_exit_code_failure_message="failed to install kernel",
+            )
+            result = target.execute("grub2-set-default 0", sudo=True)
+            result.assert_exit_code()
+            result = target.execute("grub2-mkconfig -o /boot/grub2/grub.cfg", sudo=True)
+            result.assert_exit_code()
+        else:
+            target.execute(
+                f"dpkg -i {' '.join(target_packages)}",
+                sudo=True,
+                timeout=1800,
+                expected_exit_code=0,
+                expected_exit_code_failure_message="failed to install kernel",
+            )
+            cast(Posix, target.os).replace_boot_kernel(kernel_version)
+
+        target.reboot()
+        installed_version = target.tools[Uname].get_linux_information(force_run=True)
+        if installed_version.kernel_version_raw != kernel_version:
+            raise LisaException(
+                f"target {target.name} runs kernel "
+                f"{installed_version.kernel_version_raw}, "
+                f"but expected {kernel_version}"
+            )
+        self._log.info(f"installed kernel {kernel_version} on {target.name}")
 
     def _install_build_tools(self, node: Node) -> None:
+        runbook: SourceInstallerSchema = self.runbook
         os = node.os
         self._log.info("installing build tools")
         if isinstance(os, Redhat):
@@ -248,11 +432,15 @@ class SourceInstaller(BaseInstaller):
                 # git from default CentOS/RedHat 7.x does not support git tag format
                 # syntax temporarily use a community repo, then remove it
                 node.execute("yum remove -y git", sudo=True)
+                os.invalidate_package_cache()
                 node.execute(
                     "rpm -U https://centos7.iuscommunity.org/ius-release.rpm", sudo=True
                 )
                 os.install_packages("git2u")
                 node.execute("rpm -e ius-release", sudo=True)
+                os.invalidate_package_cache()
+            if runbook.use_ccache and os.is_package_in_repo("ccache"):
+                os.install_packages("ccache")
         elif isinstance(os, Ubuntu):
             # ccache is used to speed up recompilation
             os.install_packages(
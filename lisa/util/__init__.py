@@ -5,19 +5,25 @@ import random
 import re
 import string
 import sys
+import warnings
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import (
     TYPE_CHECKING,
     Any,
     Callable,
     Dict,
+    FrozenSet,
     Iterable,
     List,
     Optional,
     Pattern,
+    Set,
+    Tuple,
     Type,
     TypeVar,
+    Union,
     cast,
 )
 
@@ -33,8 +39,27 @@ from lisa.util import constants
 if TYPE_CHECKING:
     from lisa.operating_system import OperatingSystem
 
+# The parser of re is private, and it's deprecated as sre_parse since Python
+# 3.11. It's used to find first chars of patterns in PatternSet. If it's not
+# found, PatternSet matches patterns one by one.
+try:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import sre_constants
+        import sre_parse
+
+    _is_re_parser_found = True
+except ImportError:
+    _is_re_parser_found = False
+
 T = TypeVar("T")
 
+# (combined pattern, [(index of pattern, position of pattern, names, positions
+# of names)], indexes of separated patterns)
+_PatternSetMatcher = Tuple[
+    Optional[Pattern[str]], List[Tuple[int, int, List[str], List[int]]], List[int]
+]
+
 # regex to validate url
 # source -
 # https://github.com/django/django/blob/stable/1.3.x/django/core/validators.py#L45
@@ -424,27 +449,261 @@ def get_matched_str(
     return result
 
 
+# the chars of \s and \d in unicode patterns. They are used to find the first
+# chars of patterns.
+@lru_cache(maxsize=None)
+def _get_category_chars(category: Any) -> Optional[FrozenSet[str]]:
+    if category in (sre_constants.CATEGORY_SPACE, sre_constants.CATEGORY_UNI_SPACE):
+        return frozenset(chr(x) for x in range(0x3001) if chr(x).isspace())
+    if category in (sre_constants.CATEGORY_DIGIT, sre_constants.CATEGORY_UNI_DIGIT):
+        return frozenset(chr(x) for x in range(0x20000) if chr(x).isdecimal())
+    return None
+
+
+def _get_literal_chars(code: int, ignore_case: bool) -> Optional[Set[str]]:
+    char = chr(code)
+    if ignore_case and char.lower() != char.upper():
+        # other chars may match by case folding, like "K" and the kelvin sign.
+        return None
+    return {char}
+
+
+def _get_in_first_chars(items: List[Any], ignore_case: bool) -> Optional[Set[str]]:
+    result: Set[str] = set()
+    for op, av in items:
+        chars: Optional[Set[str]] = None
+        if op == sre_constants.LITERAL:
+            chars = _get_literal_chars(av, ignore_case)
+        elif op == sre_constants.RANGE and av[1] - av[0] < 256:
+            chars = set()
+            for code in range(av[0], av[1] + 1):
+                literal_chars = _get_literal_chars(code, ignore_case)
+                if literal_chars is None:
+                    return None
+                chars.update(literal_chars)
+        elif op == sre_constants.CATEGORY:
+            category_chars = _get_category_chars(av)
+            chars = set(category_chars) if category_chars else None
+        if chars is None:
+            return None
+        result.update(chars)
+    return result
+
+
+def _get_items_first_chars(
+    items: Any, ignore_case: bool
+) -> Tuple[Optional[Set[str]], bool]:
+    """
+    returns possible first chars of parsed items, and whether the items can
+    match an empty string. None means any char.
+    """
+    result: Set[str] = set()
+    for op, av in items:
+        nullable = False
+        chars: Optional[Set[str]] = None
+        if op == sre_constants.AT:
+            continue
+        elif op == sre_constants.LITERAL:
+            chars = _get_literal_chars(av, ignore_case)
+        elif op == sre_constants.IN:
+            chars = _get_in_first_chars(av, ignore_case)
+        elif op == sre_constants.SUBPATTERN:
+            chars, nullable = _get_items_first_chars(
+                av[3], ignore_case or bool(av[1] & re.IGNORECASE)
+            )
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            chars, nullable = _get_items_first_chars(av[2], ignore_case)
+            nullable = nullable or av[0] == 0
+        elif op == sre_constants.BRANCH:
+            chars = set()
+            for branch in av[1]:
+                branch_chars, branch_nullable = _get_items_first_chars(
+                    branch, ignore_case
+                )
+                if branch_chars is None:
+                    chars = None
+                    break
+                chars.update(branch_chars)
+                nullable = nullable or branch_nullable
+        if chars is None:
+            return None, True
+        result.update(chars)
+        if not nullable:
+            return result, False
+    return result, True
+
+
+def _get_first_chars(pattern: Pattern[str]) -> Optional[FrozenSet[str]]:
+    try:
+        parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+        chars, nullable = _get_items_first_chars(
+            parsed, bool(parsed.state.flags & re.IGNORECASE)
+        )
+    except Exception:
+        # the private parser may be changed in new versions.
+        return None
+    if chars is None or nullable:
+        return None
+    return frozenset(chars)
+
+
+class PatternSet:
+    """
+    It matches many patterns on lines, and the time scales with the size of
+    text, instead of the size of text times the count of patterns. The patterns
+    are compiled to one pattern for each first char of lines, so a line is
+    scanned once by the patterns, which can start with the char. Like
+    re.match, patterns match from the start of lines, and named groups are
+    returned for each pattern. Patterns, which cannot be combined, like ones
+    with numbered backreferences, are matched separately. If the parser of re
+    isn't found, all patterns are matched separately.
+    """
+
+    _flag_letters = {
+        re.ASCII: "a",
+        re.IGNORECASE: "i",
+        re.MULTILINE: "m",
+        re.DOTALL: "s",
+        re.VERBOSE: "x",
+    }
+    _global_flags_pattern = re.compile(r"^\(\?[aiLmsux]+\)")
+    _group_name_pattern = re.compile(r"\(\?P([<=])(\w+)")
+    _not_combinable_pattern = re.compile(r"\\[1-9]|\(\?\(")
+
+    def __init__(self, patterns: List[Pattern[str]]) -> None:
+        self._patterns = patterns
+        # None means the pattern may match lines start with any char.
+        self._first_chars: List[Optional[FrozenSet[str]]] = [None] * len(patterns)
+        if _is_re_parser_found:
+            self._pieces = [self._get_piece(i, x) for i, x in enumerate(patterns)]
+            self._first_chars = [_get_first_chars(x) for x in patterns]
+        else:
+            self._pieces = [""] * len(patterns)
+        # first char of line: matcher
+        self._matchers: Dict[str, _PatternSetMatcher] = {}
+        # indexes of patterns: matcher. Chars may have the same patterns.
+        self._matchers_by_indexes: Dict[Tuple[int, ...], _PatternSetMatcher] = {}
+
+    def match_lines(
+        self, lines: Union[str, Iterable[str]]
+    ) -> List[List[Dict[str, str]]]:
+        """
+        The lines can be a string or an iterable like a file, so a stream is
+        matched without reading all.
+        """
+        if isinstance(lines, str):
+            lines = lines.splitlines(keepends=False)
+        results: List[List[Dict[str, str]]] = [[] for _ in self._patterns]
+        for line in lines:
+            first_char = line[:1]
+            matcher = self._matchers.get(first_char)
+            if matcher is None:
+                matcher = self._get_matcher(first_char)
+            combined, groups, separated = matcher
+
+            if combined:
+                matched = combined.match(line)
+                # if no group is captured, none of patterns matches.
+                if matched and matched.lastindex:
+                    values = matched.groups()
+                    for index, position, names, positions in groups:
+                        if values[position] is not None:
+                            results[index].append(
+                                {name: values[x] for name, x in zip(names, positions)}
+                            )
+            for index in separated:
+                separated_matched = self._patterns[index].match(line)
+                if separated_matched:
+                    results[index].append(separated_matched.groupdict())
+        return results
+
+    def _get_matcher(self, first_char: str) -> "_PatternSetMatcher":
+        indexes = tuple(
+            index
+            for index, chars in enumerate(self._first_chars)
+            if chars is None or first_char in chars
+        )
+        matcher = self._matchers_by_indexes.get(indexes)
+        if matcher is None:
+            # each pattern is in an optional lookahead, so all patterns are
+            # tried at the start of line, and the groups are captured.
+            combined_indexes = [x for x in indexes if self._pieces[x]]
+            combined: Optional[Pattern[str]] = None
+            # the positions in groups of the combined pattern. They are used
+            # instead of names, since it's faster for long outputs.
+            groups: List[Tuple[int, int, List[str], List[int]]] = []
+            if combined_indexes:
+                combined = re.compile(
+                    "".join(self._pieces[x] for x in combined_indexes)
+                )
+                group_index = combined.groupindex
+                for index in combined_indexes:
+                    names = list(self._patterns[index].groupindex)
+                    groups.append(
+                        (
+                            index,
+                            group_index[f"_{index}"] - 1,
+                            names,
+                            [group_index[f"_{index}_{name}"] - 1 for name in names],
+                        )
+                    )
+            separated = [x for x in indexes if not self._pieces[x]]
+            matcher = (combined, groups, separated)
+            self._matchers_by_indexes[indexes] = matcher
+        self._matchers[first_char] = matcher
+        return matcher
+
+    def _get_piece(self, index: int, pattern: Pattern[str]) -> str:
+        raw = pattern.pattern
+        if not isinstance(raw, str) or self._not_combinable_pattern.search(raw):
+            return ""
+        # the flags are set in the piece, the global ones are removed.
+        raw = self._global_flags_pattern.sub("", raw)
+        raw = self._group_name_pattern.sub(
+            lambda x: f"(?P{x.group(1)}_{index}_{x.group(2)}", raw
+        )
+        if pattern.flags & re.VERBOSE:
+            # a comment ends at the line end, so it doesn't hide the wrapper.
+            raw = f"{raw}\n"
+        flags = "".join(
+            letter
+            for flag, letter in self._flag_letters.items()
+            if pattern.flags & flag
+        )
+        if flags:
+            raw = f"(?{flags}:{raw})"
+        piece = f"(?:(?=(?P<_{index}>{raw})))?"
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                re.compile(piece)
+        except (re.error, DeprecationWarning):
+            return ""
+        return piece
+
+
+@lru_cache(maxsize=256)
+def _get_pattern_set(patterns: Tuple[Pattern[str], ...]) -> PatternSet:
+    return PatternSet(list(patterns))
+
+
 def find_patterns_groups_in_lines(
     lines: str, patterns: List[Pattern[str]], single_line: bool = True
 ) -> List[List[Dict[str, str]]]:
     """
     for each pattern find the matches and return with group names.
     """
+    if single_line:
+        return _get_pattern_set(tuple(patterns)).match_lines(lines)
+
     results: List[List[Dict[str, str]]] = []
     # create a list for each pattern.
     for _ in range(len(patterns)):
         results.append([])
-    if single_line:
-        for line in lines.splitlines(keepends=False):
-            for index, pattern in enumerate(patterns):
-                matches = pattern.match(line)
-                if matches:
-                    results[index].append(matches.groupdict())
-    else:
-        for index, pattern in enumerate(patterns):
-            finds = pattern.findall(lines)
-            for find in finds:
-                results[index].append(dict(zip(pattern.groupindex, find)))
+    for index, pattern in enumerate(patterns):
+        finds = pattern.findall(lines)
+        for find in finds:
+            results[index].append(dict(zip(pattern.groupindex, find)))
     return results
 
 
@@ -102,17 +102,18 @@ class LogWriter(object):
     def __init__(self, logger: Logger, level: int):
         self._level = level
         self._log = logger
-        self._buffer: str = ""
+        # the output may be written by chars, so join them on flush only.
+        self._buffer: List[str] = []
 
     def write(self, message: str) -> None:
-        self._buffer = "".join([self._buffer, message])
+        self._buffer.append(message)
         if "\n" in message:
             self.flush()
 
     def flush(self) -> None:
-        if len(self._buffer) > 0:
-            self._log.lines(self._level, self._buffer)
-            self._buffer = ""
+        if self._buffer:
+            self._log.lines(self._level, "".join(self._buffer))
+            self._buffer = []
 
     def close(self) -> None:
         self.flush()
@@ -1,23 +1,25 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
-import io
 import logging
 import pathlib
 import shlex
 import signal
 import subprocess
+import threading
 import time
+from collections import deque
 from dataclasses import dataclass
+from itertools import chain
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import IO, Any, Deque, Dict, List, Optional, Pattern, Tuple, Union, cast
 
 import spur  # type: ignore
 from assertpy.assertpy import AssertionBuilder, assert_that, fail
 from spur.errors import NoSuchCommandError  # type: ignore
 
 from lisa.util import LisaException, filter_ansi_escape
-from lisa.util.logger import Logger, LogWriter, add_handler, get_logger
+from lisa.util.logger import Logger, LogWriter, get_logger
 from lisa.util.perf_timer import create_timer
 from lisa.util.shell import Shell
 
@@ -63,6 +65,148 @@ class ExecutableResult:
         return self
 
 
+# the kept size of output in chars, the older output is dropped.
+_MAX_OUTPUT_SIZE = 1024 * 1024
+# the output is written by chars, they are joined to chunks in this size.
+_OUTPUT_CHUNK_SIZE = 4096
+# the max size of a partial line, which is matched by regex.
+_MAX_LINE_SIZE = 64 * 1024
+# the interval in seconds to poll processes, which have no exit event.
+_POLL_INTERVAL = 0.01
+
+
+class OutputBuffer:
+    """
+    The buffer of output, which is used to read and wait for output when the
+    process is running. It keeps the latest output in chunks, and drops the
+    oldest chunks. The full output can be saved to a file. Note, spur still
+    collects the full output for the result, so it doesn't limit the memory of
+    a process.
+    """
+
+    def __init__(
+        self, max_size: int = _MAX_OUTPUT_SIZE, output_path: Optional[Path] = None
+    ) -> None:
+        self._max_size = max_size
+        self._chunks: Deque[str] = deque()
+        self._chunks_size = 0
+        # the written strings, which are not joined to a chunk yet.
+        self._pending: List[str] = []
+        self._pending_size = 0
+        # the position of the first kept char in the whole output.
+        self._start = 0
+        self._lock = threading.Lock()
+        self._file: Optional[IO[str]] = None
+        if output_path:
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(output_path, "w", encoding="utf-8", newline="")
+
+    @property
+    def size(self) -> int:
+        """
+        the size of the whole output, including dropped output.
+        """
+        return self._start + self._chunks_size + self._pending_size
+
+    def write(self, message: str) -> None:
+        with self._lock:
+            self._pending.append(message)
+            self._pending_size += len(message)
+            if self._pending_size >= _OUTPUT_CHUNK_SIZE:
+                self._add_chunk()
+            if self._file:
+                self._file.write(message)
+
+    def read(self, position: int = 0) -> Tuple[str, int]:
+        """
+        Return the output from the position, and the end position for next read.
+        If the output at the position is dropped, it starts from the oldest kept
+        output.
+        """
+        with self._lock:
+            end = self.size
+            position = max(position, self._start)
+            parts: List[str] = []
+            # walk back from the end, so only new output is visited.
+            offset = end
+            for part in chain(reversed(self._pending), reversed(self._chunks)):
+                if offset <= position:
+                    break
+                offset -= len(part)
+                parts.append(part[max(position - offset, 0) :])
+        return "".join(reversed(parts)), end
+
+    def getvalue(self) -> str:
+        return self.read()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def _add_chunk(self) -> None:
+        chunk = "".join(self._pending)
+        self._pending = []
+        self._pending_size = 0
+        self._chunks.append(chunk)
+        self._chunks_size += len(chunk)
+        while self._chunks_size > self._max_size and len(self._chunks) > 1:
+            dropped = self._chunks.popleft()
+            self._chunks_size -= len(dropped)
+            self._start += len(dropped)
+
+
+class OutputMatcher:
+    """
+    Match a keyword or a regex pattern on output incrementally. Only new output
+    is scanned. The keyword is matched across writes by keeping the tail of
+    previous output. The pattern is matched in lines, the partial line is kept
+    until it's completed.
+    """
+
+    def __init__(self, keyword: Union[str, Pattern[str]]) -> None:
+        self._keyword = keyword
+        self._tail = ""
+
+    def match(self, output: str) -> bool:
+        content = self._tail + output
+        if isinstance(self._keyword, str):
+            matched = self._keyword in content
+            tail_size = len(self._keyword) - 1
+            self._tail = content[-tail_size:] if tail_size > 0 else ""
+        else:
+            matched = self._keyword.search(content) is not None
+            line_start = content.rfind("\n") + 1
+            self._tail = content[line_start:][-_MAX_LINE_SIZE:]
+        return matched
+
+
+class _OutputWriter(LogWriter):
+    """
+    It saves output to the buffer, and notifies waiters on new lines, so they
+    don't need to poll the buffer. The output is written by chars, so waiters
+    aren't woken up on each char. Partial lines are checked on intervals.
+    """
+
+    def __init__(
+        self,
+        logger: Logger,
+        level: int,
+        output_buffer: OutputBuffer,
+        output_event: threading.Event,
+    ):
+        super().__init__(logger=logger, level=level)
+        self._output_buffer = output_buffer
+        self._output_event = output_event
+
+    def write(self, message: str) -> None:
+        super().write(message)
+        self._output_buffer.write(message)
+        if "\n" in message:
+            self._output_event.set()
+
+
 # TODO: So much cleanup here. It was using duck typing.
 class Process:
     def __init__(
@@ -81,11 +225,12 @@ class Process:
         self._result: Optional[ExecutableResult] = None
         self._sudo: bool = False
         self._nohup: bool = False
-
-        # add a string stream handler to the logger
-        self._log_buffer = io.StringIO()
-        self._log_handler = logging.StreamHandler(self._log_buffer)
-        add_handler(self._log_handler, self._log)
+        # set when the process exits, or new output arrives.
+        self._exit_event: Optional[threading.Event] = None
+        self._output_event = threading.Event()
+        # they are created on start, so the output_path can be set.
+        self._output_buffer: OutputBuffer
+        self._error_buffer: OutputBuffer
 
     def start(
         self,
@@ -98,9 +243,11 @@ class Process:
         no_error_log: bool = False,
         no_info_log: bool = False,
         no_debug_log: bool = False,
+        output_path: Optional[Path] = None,
     ) -> None:
         """
-        command include all parameters also.
+        command include all parameters also. If output_path is set, the full
+        stdout is saved to the file, the process keeps the latest output only.
         """
         stdout_level = logging.INFO
         stderr_level = logging.ERROR
@@ -115,8 +262,22 @@ class Process:
 
         self.stdout_logger = get_logger("stdout", parent=self._log)
         self.stderr_logger = get_logger("stderr", parent=self._log)
-        self._stdout_writer = LogWriter(logger=self.stdout_logger, level=stdout_level)
-        self._stderr_writer = LogWriter(logger=self.stderr_logger, level=stderr_level)
+        self._output_buffer = OutputBuffer(output_path=output_path)
+        self._stdout_writer = _OutputWriter(
+            logger=self.stdout_logger,
+            level=stdout_level,
+            output_buffer=self._output_buffer,
+            output_event=self._output_event,
+        )
+        # stderr is kept separately, so it's not mixed in the output of
+        # read_output and output_path, but it can be found by wait_output.
+        self._error_buffer = OutputBuffer()
+        self._stderr_writer = _OutputWriter(
+            logger=self.stderr_logger,
+            level=stderr_level,
+            output_buffer=self._error_buffer,
+            output_event=self._output_event,
+        )
 
         self._sudo = sudo
         self._nohup = nohup
@@ -165,12 +326,15 @@ class Process:
             # save for logging.
             self._cmd = split_command
             self._running = True
+            self._exit_event = self._create_exit_event(self._process)
         except (FileNotFoundError, NoSuchCommandError) as identifier:
             # FileNotFoundError: not found command on Windows
             # NoSuchCommandError: not found command on remote Posix
             self._result = ExecutableResult(
                 "", identifier.strerror, 1, split_command, self._timer.elapsed()
             )
+            self._output_buffer.close()
+            self._error_buffer.close()
             self._log.log(stderr_level, f"not found command: {identifier}")
 
     def _process_command(
@@ -219,13 +383,9 @@ class Process:
         expected_exit_code: Optional[int] = None,
         expected_exit_code_failure_message: str = "",
     ) -> ExecutableResult:
-        timer = create_timer()
         is_timeout = False
 
-        while self.is_running() and timeout >= timer.elapsed(False):
-            time.sleep(0.01)
-
-        if timeout < timer.elapsed():
+        if not self.wait_exit(timeout):
             if self._process is not None:
                 self._log.info(f"timeout in {timeout} sec, and killed")
             self.kill()
@@ -251,6 +411,8 @@ class Process:
 
             self._stdout_writer.close()
             self._stderr_writer.close()
+            self._output_buffer.close()
+            self._error_buffer.close()
             # cache for future queries, in case it's queried twice.
             self._result = ExecutableResult(
                 process_result.output.strip(),
@@ -290,40 +452,100 @@ class Process:
             except Exception as identifier:
                 self._log.debug(f"failed on killing process: {identifier}")
 
+    def read_output(self, position: int = 0) -> Tuple[str, int]:
+        """
+        Return the kept stdout after the position, and the position of its end.
+        Pass the returned position in next call to read new output only. It can
+        be used to report progress of a long running process.
+        """
+        return self._output_buffer.read(position)
+
     def is_running(self) -> bool:
         if self._running and self._process:
-            self._running = self._process.is_running()
+            if self._exit_event:
+                self._running = not self._exit_event.is_set()
+            else:
+                self._running = self._process.is_running()
         return self._running
 
     def wait_output(
         self,
-        keyword: str,
+        keyword: Union[str, Pattern[str]],
         timeout: int = 300,
         error_on_missing: bool = True,
         interval: int = 1,
     ) -> None:
-        # check if stdout buffers contain the string "keyword" to determine if
-        # it is running
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            # LogWriter only flushes if "\n" is written, so we need to flush
-            # manually.
-            self._stdout_writer.flush()
-
-            # check if buffer contains the keyword
-            if keyword in self._log_buffer.getvalue():
-                return
-
-            time.sleep(interval)
+        """
+        Wait until stdout or stderr contains the keyword, or matches the regex
+        pattern. The kept output is checked first, and then only new output is
+        checked.
+        """
+        if isinstance(keyword, str):
+            keyword_text = keyword
+        else:
+            keyword_text = keyword.pattern
+        # stdout and stderr are matched separately, so a keyword isn't matched
+        # across them.
+        matchers = [
+            (self._output_buffer, OutputMatcher(keyword)),
+            (self._error_buffer, OutputMatcher(keyword)),
+        ]
+        positions = [0] * len(matchers)
+        timer = create_timer()
+        while timer.elapsed(False) < timeout:
+            # clear before checking, so the output after checking wakes up the
+            # next wait.
+            self._output_event.clear()
+
+            for index, (buffer, matcher) in enumerate(matchers):
+                output, positions[index] = buffer.read(positions[index])
+                if matcher.match(output):
+                    return
+
+            # wake up on new output, and check at least every interval.
+            self._output_event.wait(
+                max(min(interval, timeout - timer.elapsed(False)), 0)
+            )
 
         if error_on_missing:
             raise LisaException(
-                f"{keyword} not found in stdout after {timeout} seconds"
+                f"{keyword_text} not found in output after {timeout} seconds"
             )
         else:
             self._log.debug(
-                f"not found '{keyword}' in {timeout} seconds, but ignore it."
+                f"not found '{keyword_text}' in {timeout} seconds, but ignore it."
+            )
+
+    def wait_exit(self, timeout: float) -> bool:
+        """
+        Block until the process exits, return False if it's timeout. It doesn't
+        kill the process on timeout, so it can be called again.
+        """
+        if self._exit_event:
+            if self.is_running():
+                self._exit_event.wait(timeout)
+        else:
+            # unknown process type, poll it until timeout.
+            timer = create_timer()
+            while self.is_running() and timer.elapsed(False) < timeout:
+                time.sleep(min(_POLL_INTERVAL, max(timeout - timer.elapsed(False), 0)))
+        return not self.is_running()
+
+    def _create_exit_event(self, process: Any) -> Optional[threading.Event]:
+        if isinstance(process, spur.ssh.SshProcess):
+            # paramiko sets the event, when the exit status is received.
+            return cast(threading.Event, process._channel.status_event)
+        elif isinstance(process, spur.local.LocalProcess):
+            exit_event = threading.Event()
+            thread = threading.Thread(
+                target=_wait_local_process,
+                args=(process._subprocess, exit_event),
+                daemon=True,
             )
+            thread.start()
+            return exit_event
+        # unknown process type, fall back to poll it.
+        return None
 
     def _recycle_resource(self) -> None:
         # TODO: The spur library is not very good and leaves open
@@ -357,6 +579,15 @@ class Process:
         return raw_input
 
 
+def _wait_local_process(
+    popen: "subprocess.Popen[str]", exit_event: threading.Event
+) -> None:
+    try:
+        popen.wait()
+    finally:
+        exit_event.set()
+
+
 def _create_exports(update_envs: Dict[str, str]) -> str:
     result: str = ""
 
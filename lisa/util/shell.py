@@ -1,16 +1,35 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import gzip
+import hashlib
 import logging
 import os
+import shlex
 import shutil
 import socket
+import stat
 import sys
+import tarfile
+import threading
 import time
+from contextlib import contextmanager
 from functools import partial
-from pathlib import Path, PurePath
+from pathlib import Path, PurePath, PurePosixPath
 from time import sleep
-from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union, cast
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
 
 import paramiko
 import spur  # type: ignore
@@ -26,6 +45,20 @@ from .perf_timer import create_timer
 
 _get_jump_box_logger = partial(get_logger, name="jump_box")
 
+# sshd rejects new sessions over MaxSessions, the default value is 10.
+_MAX_CHANNEL_COUNT = 10
+# the max time to wait for a free channel, when all channels are used, like by
+# long running processes.
+_CHANNEL_WAIT_TIMEOUT = 600
+# send keepalive packets, so idle connections aren't dropped by NAT or firewall.
+_KEEPALIVE_INTERVAL = 30
+# files larger than it are copied by SFTP, and an interrupted copy can be resumed.
+_RESUMABLE_SIZE = 64 * 1024 * 1024
+_TRANSFER_BLOCK_SIZE = 1024 * 1024
+_TAR_COMPRESS_LEVEL = 6
+# the suffix of a file, which is being copied.
+_PART_SUFFIX = ".part"
+
 
 def wait_tcp_port_ready(
     address: str, port: int, log: Optional[Logger] = None, timeout: int = 300
@@ -66,6 +99,95 @@ def wait_tcp_port_ready(
     return is_ready, result
 
 
+def _list_files(root: Path, files: Optional[List[PurePath]]) -> List[PurePath]:
+    if files is None:
+        return sorted(x.relative_to(root) for x in root.rglob("*") if x.is_file())
+    return list(files)
+
+
+def _get_posix_name(path: PurePath) -> str:
+    return PurePosixPath(*path.parts).as_posix()
+
+
+def _get_file_hash(path: Path, size: Optional[int] = None) -> str:
+    # if size is set, only the beginning of the file is hashed.
+    sha256 = hashlib.sha256()
+    remaining = size
+    with open(path, "rb") as file:
+        while remaining is None or remaining > 0:
+            block_size = _TRANSFER_BLOCK_SIZE
+            if remaining is not None:
+                block_size = min(block_size, remaining)
+                remaining -= block_size
+            block = file.read(block_size)
+            if not block:
+                break
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def _get_hash_command(path: PurePath, has_names: bool) -> str:
+    """
+    The command prints sha256 of files under the path. If has_names is True, the
+    names are read from stdin, and they are separated by NUL. Missing files are
+    ignored.
+    """
+    path_str = shlex.quote(str(path))
+    if has_names:
+        return f"cd {path_str} && xargs -0 -r sha256sum -- 2>/dev/null"
+    return f"cd {path_str} && find . -type f -exec sha256sum {{}} +"
+
+
+def _parse_hashes(output: str) -> Dict[str, str]:
+    # the format is "<sha256>  <name>"
+    result: Dict[str, str] = {}
+    for line in output.splitlines():
+        file_hash, _, name = line.partition("  ")
+        if len(file_hash) != 64 or not name:
+            continue
+        if name.startswith("./"):
+            name = name[2:]
+        result[name] = file_hash
+    return result
+
+
+def _write_tar(
+    stream: IO[bytes], root: Path, names: List[str], mode: Optional[int] = None
+) -> None:
+    with gzip.GzipFile(
+        fileobj=stream, mode="wb", compresslevel=_TAR_COMPRESS_LEVEL
+    ) as gzip_file:
+        with tarfile.open(fileobj=cast(IO[bytes], gzip_file), mode="w|") as tar:
+            for name in names:
+                tar_info = tar.gettarinfo(str(root / name), arcname=name)
+                if mode is not None:
+                    tar_info.mode = mode
+                # the owner is the user on the other side.
+                tar_info.uid = tar_info.gid = 0
+                tar_info.uname = tar_info.gname = ""
+                with open(root / name, "rb") as file:
+                    tar.addfile(tar_info, file)
+
+
+def _read_tar(stream: IO[bytes], root: Path) -> List[str]:
+    names: List[str] = []
+    root.mkdir(parents=True, exist_ok=True)
+    resolved_root = root.resolve()
+    with tarfile.open(fileobj=stream, mode="r|gz") as tar:
+        for member in tar:
+            target = (resolved_root / member.name).resolve()
+            if not member.isfile() or resolved_root not in target.parents:
+                raise LisaException(f"unexpected member in tar: {member.name}")
+            # the owner is the current user.
+            if hasattr(os, "geteuid"):
+                member.uid = os.geteuid()
+                member.gid = os.getegid()
+            member.uname = member.gname = ""
+            tar.extract(member, str(root))
+            names.append(member.name)
+    return names
+
+
 class WindowsShellType(object):
     """
     Windows command generator
@@ -115,6 +237,23 @@ def try_connect(
     ssh_timeout: int = 300,
     sock: Optional[Any] = None,
 ) -> Any:
+    paramiko_client, stdout = _try_connect_client(
+        connection_info, ssh_timeout=ssh_timeout, sock=sock
+    )
+    paramiko_client.close()
+
+    return stdout
+
+
+def _try_connect_client(
+    connection_info: schema.ConnectionInfo,
+    ssh_timeout: int = 300,
+    sock: Optional[Any] = None,
+) -> Tuple[paramiko.SSHClient, Any]:
+    """
+    Connect and run a command to detect the OS. The connected client is
+    returned, so it can be reused by following commands.
+    """
     # spur always run a posix command and will fail on Windows.
     # So try with paramiko firstly.
     paramiko_client = paramiko.SSHClient()
@@ -154,9 +293,8 @@ def try_connect(
                 tries -= 1
 
             stdin.channel.shutdown_write()
-            paramiko_client.close()
 
-            return stdout
+            return paramiko_client, stdout
         except SSHException as e:
             # socket is open, but SSH service not responded
             if (
@@ -185,14 +323,35 @@ def _spawn_ssh_process(shell: spur.ssh.SshShell, **kwargs: Any) -> spur.ssh.SshP
 
 
 class SshShell(InitializableMixin):
-    def __init__(self, connection_info: schema.ConnectionInfo) -> None:
+    def __init__(
+        self,
+        connection_info: schema.ConnectionInfo,
+        max_channel_count: int = _MAX_CHANNEL_COUNT,
+        keepalive_interval: int = _KEEPALIVE_INTERVAL,
+        channel_wait_timeout: float = _CHANNEL_WAIT_TIMEOUT,
+    ) -> None:
         super().__init__()
         self.is_remote = True
         self._connection_info = connection_info
+        self._log = get_logger("shell", connection_info.address)
         self._inner_shell: Optional[spur.SshShell] = None
         self._jump_boxes: List[Any] = []
         self._jump_box_sock: Any = None
 
+        # All commands are opened as channels over one connection. The count of
+        # open channels is limited, so the server won't reject them.
+        self._max_channel_count = max_channel_count
+        self._keepalive_interval = keepalive_interval
+        self._channels: List[paramiko.Channel] = []
+        self._reserved_channel_count = 0
+        self._channel_lock = threading.Lock()
+        self.channel_wait_timeout = channel_wait_timeout
+        # The inner shell is replaced on reconnecting, so it's used in the lock.
+        # It's reentrant, because sftp operations fall back to commands.
+        self._shell_lock = threading.RLock()
+        # it's detected on the first bulk copy.
+        self._is_bulk_copy_supported: Optional[bool] = None
+
         paramiko_logger = logging.getLogger("paramiko")
         paramiko_logger.setLevel(logging.WARN)
 
@@ -213,20 +372,22 @@ class SshShell(InitializableMixin):
         )
 
         try:
-            stdout = try_connect(self._connection_info, sock=sock)
+            paramiko_client, stdout = _try_connect_client(
+                self._connection_info, sock=sock
+            )
         except Exception as identifier:
+            self._close_jump_boxes()
             raise LisaException(
                 f"failed to connect SSH "
                 f"[{self._connection_info.address}:{self._connection_info.port}], "
                 f"{identifier.__class__.__name__}: {identifier}"
             )
 
-        self._close_jump_boxes()
-
         # Some windows doesn't end the text stream, so read first line only.
         # it's  enough to detect os.
         stdout_content = stdout.readline()
         stdout.close()
+        stdout.channel.close()
 
         if stdout_content and "Windows" in stdout_content:
             self.is_posix = False
@@ -235,10 +396,13 @@ class SshShell(InitializableMixin):
             self.is_posix = True
             shell_type = spur.ssh.ShellTypes.sh
 
-        sock = self._establish_jump_boxes(
-            address=self._connection_info.address,
-            port=self._connection_info.port,
-        )
+        transport = paramiko_client.get_transport()
+        assert transport
+        transport.set_keepalive(self._keepalive_interval)
+        if isinstance(transport.sock, socket.socket):
+            # commands are small packets, and wait for replies. Without
+            # NODELAY, they are delayed by Nagle's algorithm.
+            transport.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
 
         spur_kwargs = {
             "hostname": self._connection_info.address,
@@ -255,19 +419,29 @@ class SshShell(InitializableMixin):
         }
 
         spur_ssh_shell = spur.SshShell(shell_type=shell_type, **spur_kwargs)
+        # reuse the connection of OS detection, instead of a new handshake.
+        spur_ssh_shell._client = paramiko_client
         sftp = spurplus.sftp.ReconnectingSFTP(
             sftp_opener=spur_ssh_shell._open_sftp_client
         )
         self._inner_shell = spurplus.SshShell(spur_ssh_shell=spur_ssh_shell, sftp=sftp)
 
+    def initialize(self, *args: Any, **kwargs: Any) -> None:
+        # the connection is shared by threads, so only one thread connects it.
+        with self._shell_lock:
+            super().initialize(*args, **kwargs)
+
     def close(self) -> None:
-        if self._inner_shell:
-            self._inner_shell.close()
-            # after closed, can be reconnect
-            self._inner_shell = None
-        self._is_initialized = False
+        with self._shell_lock:
+            if self._inner_shell:
+                self._inner_shell.close()
+                # after closed, can be reconnect
+                self._inner_shell = None
+            self._is_initialized = False
+            with self._channel_lock:
+                self._channels.clear()
 
-        self._close_jump_boxes()
+            self._close_jump_boxes()
 
     @property
     def is_connected(self) -> bool:
@@ -288,27 +462,49 @@ class SshShell(InitializableMixin):
         use_pty: bool = True,
         allow_error: bool = True,
     ) -> spur.ssh.SshProcess:
-        self.initialize()
-        assert self._inner_shell
-
+        with self._shell_lock:
+            self.initialize()
+            if not self._is_transport_active():
+                # the connection is dropped, like the node is rebooted.
+                self._reconnect()
+
+        self._reserve_channel()
+        process: Optional[spur.ssh.SshProcess] = None
         try:
-            process: spur.ssh.SshProcess = _spawn_ssh_process(
-                self._inner_shell,
-                command=command,
-                update_env=update_env,
-                store_pid=store_pid,
-                cwd=cwd,
-                stdout=stdout,
-                stderr=stderr,
-                encoding=encoding,
-                use_pty=use_pty,
-                allow_error=allow_error,
-            )
-        except FunctionTimedOut:
-            raise LisaException(
-                f"The remote node is timeout on execute {command}. "
-                f"It may be caused by paramiko/spur not support the shell of node."
-            )
+            try:
+                process = self._spawn(
+                    command=command,
+                    update_env=update_env,
+                    store_pid=store_pid,
+                    cwd=cwd,
+                    stdout=stdout,
+                    stderr=stderr,
+                    encoding=encoding,
+                    use_pty=use_pty,
+                    allow_error=allow_error,
+                )
+            except (spur.ssh.ConnectionError, EOFError, OSError, SSHException):
+                # retry on a new connection, if the connection is dropped
+                # before the command starts.
+                if self._is_transport_active():
+                    raise
+                self._reconnect()
+                process = self._spawn(
+                    command=command,
+                    update_env=update_env,
+                    store_pid=store_pid,
+                    cwd=cwd,
+                    stdout=stdout,
+                    stderr=stderr,
+                    encoding=encoding,
+                    use_pty=use_pty,
+                    allow_error=allow_error,
+                )
+        finally:
+            with self._channel_lock:
+                self._reserved_channel_count -= 1
+                if process:
+                    self._channels.append(process._channel)
         return process
 
     def mkdir(
@@ -329,18 +525,19 @@ class SshShell(InitializableMixin):
         """
         path_str = self._purepath_to_str(path)
         self.initialize()
-        assert self._inner_shell
-        try:
-            self._inner_shell.mkdir(
-                path_str, mode=mode, parents=parents, exist_ok=exist_ok
-            )
-        except PermissionError:
-            self._inner_shell.run(command=["sudo", "mkdir", "-p", path_str])
-        except SSHException as identifier:
-            # no sftp, try commands
-            if "Channel closed." in str(identifier):
-                assert isinstance(path_str, str)
-                self.spawn(command=["mkdir", "-p", path_str])
+        with self._shell_lock:
+            assert self._inner_shell
+            try:
+                self._inner_shell.mkdir(
+                    path_str, mode=mode, parents=parents, exist_ok=exist_ok
+                )
+            except PermissionError:
+                self._inner_shell.run(command=["sudo", "mkdir", "-p", path_str])
+            except SSHException as identifier:
+                # no sftp, try commands
+                if "Channel closed." in str(identifier):
+                    assert isinstance(path_str, str)
+                    self.spawn(command=["mkdir", "-p", path_str])
 
     def exists(self, path: PurePath) -> bool:
         """Check if a target directory/file exist
@@ -352,9 +549,10 @@ class SshShell(InitializableMixin):
             bool: True if present, False otherwise
         """
         self.initialize()
-        assert self._inner_shell
-        path_str = self._purepath_to_str(path)
-        return cast(bool, self._inner_shell.exists(path_str))
+        with self._shell_lock:
+            assert self._inner_shell
+            path_str = self._purepath_to_str(path)
+            return cast(bool, self._inner_shell.exists(path_str))
 
     def remove(self, path: PurePath, recursive: bool = False) -> None:
         """Remove a target directory/file
@@ -366,17 +564,18 @@ class SshShell(InitializableMixin):
                        (will fail if that's the case and this flag is off)
         """
         self.initialize()
-        assert self._inner_shell
-        path_str = self._purepath_to_str(path)
-        try:
-            self._inner_shell.remove(path_str, recursive)
-        except PermissionError:
-            self._inner_shell.run(command=["sudo", "rm", path_str])
-        except SSHException as identifier:
-            # no sftp, try commands
-            if "Channel closed." in str(identifier):
-                assert isinstance(path_str, str)
-                self.spawn(command=["rm", path_str])
+        with self._shell_lock:
+            assert self._inner_shell
+            path_str = self._purepath_to_str(path)
+            try:
+                self._inner_shell.remove(path_str, recursive)
+            except PermissionError:
+                self._inner_shell.run(command=["sudo", "rm", path_str])
+            except SSHException as identifier:
+                # no sftp, try commands
+                if "Channel closed." in str(identifier):
+                    assert isinstance(path_str, str)
+                    self.spawn(command=["rm", path_str])
 
     def chmod(self, path: PurePath, mode: int) -> None:
         """
@@ -390,9 +589,10 @@ class SshShell(InitializableMixin):
             mode: numerical chmod mode entry
         """
         self.initialize()
-        assert self._inner_shell
-        path_str = self._purepath_to_str(path)
-        self._inner_shell.chmod(path_str, mode)
+        with self._shell_lock:
+            assert self._inner_shell
+            path_str = self._purepath_to_str(path)
+            self._inner_shell.chmod(path_str, mode)
 
     def stat(self, path: PurePath) -> os.stat_result:
         """Display file/directory status.
@@ -404,9 +604,10 @@ class SshShell(InitializableMixin):
             os.stat_result: The status structure/class
         """
         self.initialize()
-        assert self._inner_shell
         path_str = self._purepath_to_str(path)
-        sftp_attributes: paramiko.SFTPAttributes = self._inner_shell.stat(path_str)
+        with self._shell_lock:
+            assert self._inner_shell
+            sftp_attributes: paramiko.SFTPAttributes = self._inner_shell.stat(path_str)
 
         result = os.stat_result(
             (
@@ -444,9 +645,10 @@ class SshShell(InitializableMixin):
             bool: True if it is a directory, False otherwise
         """
         self.initialize()
-        assert self._inner_shell
-        path_str = self._purepath_to_str(path)
-        return cast(bool, self._inner_shell.is_dir(path_str))
+        with self._shell_lock:
+            assert self._inner_shell
+            path_str = self._purepath_to_str(path)
+            return cast(bool, self._inner_shell.is_dir(path_str))
 
     def is_symlink(self, path: PurePath) -> bool:
         """Check if given path is a symlink
@@ -458,9 +660,10 @@ class SshShell(InitializableMixin):
             bool: True if it is a symlink, False otherwise
         """
         self.initialize()
-        assert self._inner_shell
-        path_str = self._purepath_to_str(path)
-        return cast(bool, self._inner_shell.is_symlink(path_str))
+        with self._shell_lock:
+            assert self._inner_shell
+            path_str = self._purepath_to_str(path)
+            return cast(bool, self._inner_shell.is_symlink(path_str))
 
     def symlink(self, source: PurePath, destination: PurePath) -> None:
         """Create a symbolic link from source to destination, in the target node
@@ -473,10 +676,11 @@ class SshShell(InitializableMixin):
                                             might be ran from Windows)
         """
         self.initialize()
-        assert self._inner_shell
-        source_str = self._purepath_to_str(source)
-        destination_str = self._purepath_to_str(destination)
-        self._inner_shell.symlink(source_str, destination_str)
+        with self._shell_lock:
+            assert self._inner_shell
+            source_str = self._purepath_to_str(source)
+            destination_str = self._purepath_to_str(destination)
+            self._inner_shell.symlink(source_str, destination_str)
 
     def copy(self, local_path: PurePath, node_path: PurePath) -> None:
         """Upload local file to target node
@@ -490,15 +694,19 @@ class SshShell(InitializableMixin):
         """
         self.mkdir(node_path.parent, parents=True, exist_ok=True)
         self.initialize()
-        assert self._inner_shell
+        if self.is_posix and Path(local_path).stat().st_size >= _RESUMABLE_SIZE:
+            self._put_resumable(Path(local_path), node_path)
+            return
         local_path_str = self._purepath_to_str(local_path)
         node_path_str = self._purepath_to_str(node_path)
-        self._inner_shell.put(
-            local_path_str,
-            node_path_str,
-            create_directories=True,
-            consistent=self.is_posix,
-        )
+        with self._shell_lock:
+            assert self._inner_shell
+            self._inner_shell.put(
+                local_path_str,
+                node_path_str,
+                create_directories=True,
+                consistent=self.is_posix,
+            )
 
     def copy_back(self, node_path: PurePath, local_path: PurePath) -> None:
         """Download target node's file to local node
@@ -511,14 +719,168 @@ class SshShell(InitializableMixin):
                                      might be ran from Windows)
         """
         self.initialize()
-        assert self._inner_shell
+        if self.is_posix and self.stat(node_path).st_size >= _RESUMABLE_SIZE:
+            self._get_resumable(node_path, Path(local_path))
+            return
         node_path_str = self._purepath_to_str(node_path)
         local_path_str = self._purepath_to_str(local_path)
-        self._inner_shell.get(
-            node_path_str,
-            local_path_str,
-            consistent=self.is_posix,
-        )
+        with self._shell_lock:
+            assert self._inner_shell
+            self._inner_shell.get(
+                node_path_str,
+                local_path_str,
+                consistent=self.is_posix,
+            )
+
+    def copy_bulk(
+        self,
+        local_path: PurePath,
+        node_path: PurePath,
+        files: Optional[List[PurePath]] = None,
+        mode: Optional[int] = None,
+    ) -> List[PurePath]:
+        """Upload a local directory, or listed files in it, to target node. Files
+        are streamed in one compressed tar, and file modes are kept. Files with
+        the same content on the node are skipped. Large files are copied one by
+        one, so an interrupted copy can be resumed. If the node doesn't have GNU
+        tar, sha256sum and xargs, all files are copied one by one.
+        Inputs:
+            local_path: local directory. (Absolute)
+            node_path: target directory. (Absolute. Use a PurePosixPath, if the
+                                          target node is a Posix one, because LISA
+                                          might be ran from Windows)
+            files: relative paths in local_path. All files are copied, if it's
+                   None.
+            mode: file mode on target node. The local mode is kept, if it's None.
+        Outputs:
+            List[PurePath]: relative paths of copied files.
+        """
+        assert isinstance(local_path, Path), f"actual: {type(local_path)}"
+        self.initialize()
+        file_list = _list_files(local_path, files)
+        if not self._check_bulk_copy():
+            for file in file_list:
+                self.copy(local_path / file, node_path / file)
+                if mode is not None:
+                    self.chmod(node_path / file, mode)
+            return file_list
+
+        names = [_get_posix_name(x) for x in file_list]
+        output = self._run_with_input(
+            _get_hash_command(node_path, has_names=files is not None),
+            "\0".join(names) if files is not None else "",
+        ).output
+        node_hashes = _parse_hashes(output)
+        changed_files: List[PurePath] = []
+        large_files: List[PurePath] = []
+        tar_names: List[str] = []
+        for file, name in zip(file_list, names):
+            file_path = local_path / file
+            if node_hashes.get(name) == _get_file_hash(file_path):
+                continue
+            changed_files.append(file)
+            if file_path.stat().st_size >= _RESUMABLE_SIZE:
+                large_files.append(file)
+            else:
+                tar_names.append(name)
+
+        if tar_names:
+            command = (
+                f"mkdir -p {shlex.quote(str(node_path))} && "
+                f"tar -xzpf - --no-same-owner -C {shlex.quote(str(node_path))}"
+            )
+            process = self.spawn(
+                command=["sh", "-c", command], use_pty=False, allow_error=True
+            )
+            try:
+                _write_tar(process._stdin, local_path, tar_names, mode)
+                process._stdin.flush()
+                process._channel.shutdown_write()
+            except OSError:
+                # tar exits on errors, the error is in stderr.
+                ...
+            result = process.wait_for_result()
+            if result.return_code != 0:
+                raise LisaException(
+                    f"failed to copy files to {node_path}: {result.stderr_output}"
+                )
+        for file in large_files:
+            self.copy(local_path / file, node_path / _get_posix_name(file))
+            if mode is not None:
+                self.chmod(node_path / _get_posix_name(file), mode)
+        return changed_files
+
+    def copy_back_bulk(
+        self,
+        node_path: PurePath,
+        local_path: PurePath,
+        files: Optional[List[PurePath]] = None,
+    ) -> List[PurePath]:
+        """Download a directory, or listed files in it, from target node. Files
+        are streamed in one compressed tar, and file modes are kept. Files with
+        the same content in local are skipped. If the node doesn't have GNU tar
+        and sha256sum, files are copied one by one.
+        Inputs:
+            node_path: target directory. (Absolute. Use a PurePosixPath, if the
+                                          target node is a Posix one, because LISA
+                                          might be ran from Windows)
+            local_path: local directory. (Absolute)
+            files: relative paths in node_path. All files are copied, if it's
+                   None.
+        Outputs:
+            List[PurePath]: relative paths of copied files.
+        """
+        assert isinstance(local_path, Path), f"actual: {type(local_path)}"
+        self.initialize()
+        if not self._check_bulk_copy():
+            if files is None:
+                if not self.is_posix:
+                    raise LisaException("listing files is not supported on Windows.")
+                output = self._run_with_input(
+                    f"cd {shlex.quote(str(node_path))} && find . -type f", ""
+                ).output
+                files = sorted(PurePosixPath(x[2:]) for x in output.splitlines() if x)
+            for file in files:
+                self.copy_back(node_path / file, local_path / file)
+            return list(files)
+
+        names = [_get_posix_name(x) for x in files] if files is not None else []
+        output = self._run_with_input(
+            _get_hash_command(node_path, has_names=files is not None),
+            "\0".join(names),
+        ).output
+        node_hashes = _parse_hashes(output)
+        missing_names = [x for x in names if x not in node_hashes]
+        if missing_names:
+            raise LisaException(f"not found files in {node_path}: {missing_names}")
+
+        changed_names = [
+            name
+            for name, node_hash in sorted(node_hashes.items())
+            if not (local_path / name).is_file()
+            or _get_file_hash(local_path / name) != node_hash
+        ]
+        if changed_names:
+            command = f"cd {shlex.quote(str(node_path))} && tar -czf - --null -T -"
+            process = self.spawn(
+                command=["sh", "-c", command], use_pty=False, allow_error=True
+            )
+            try:
+                process.stdin_write("\0".join(changed_names).encode("utf-8"))
+                process._channel.shutdown_write()
+            except OSError:
+                # tar exits on errors, the error is in stderr.
+                ...
+            _read_tar(process._stdout, local_path)
+            # drain the rest, spur decodes it as text.
+            while process._stdout.read(_TRANSFER_BLOCK_SIZE):
+                pass
+            result = process.wait_for_result()
+            if result.return_code != 0:
+                raise LisaException(
+                    f"failed to copy files from {node_path}: {result.stderr_output}"
+                )
+        return [PurePosixPath(x) for x in changed_names]
 
     def _purepath_to_str(
         self, path: Union[Path, PurePath, str]
@@ -530,6 +892,190 @@ class SshShell(InitializableMixin):
             path = str(path)
         return path
 
+    def _run_with_input(self, command: str, input: str) -> Any:
+        process = self.spawn(command=["sh", "-c", command], use_pty=False)
+        try:
+            if input:
+                process.stdin_write(input.encode("utf-8"))
+            process._channel.shutdown_write()
+        except OSError:
+            # the command exits without reading stdin.
+            ...
+        return process.wait_for_result()
+
+    def _check_bulk_copy(self) -> bool:
+        """
+        Bulk copies need GNU tar, sha256sum and xargs on the node. If they don't
+        exist, like on Windows or busybox, files are copied one by one.
+        """
+        if self._is_bulk_copy_supported is None:
+            if self.is_posix:
+                command = (
+                    'tar --version 2>/dev/null | grep -q "GNU tar" && '
+                    "command -v sha256sum >/dev/null && "
+                    "printf '' | xargs -0 -r true && echo supported"
+                )
+                process = self.spawn(
+                    command=["sh", "-c", command], use_pty=False, allow_error=True
+                )
+                output = process.wait_for_result().output
+                self._is_bulk_copy_supported = "supported" in output
+            else:
+                self._is_bulk_copy_supported = False
+            if not self._is_bulk_copy_supported:
+                self._log.debug("bulk copy is not supported, copy files one by one.")
+        return self._is_bulk_copy_supported
+
+    def _get_node_hash(self, path: PurePath, size: int) -> str:
+        # only the beginning of the file is hashed.
+        output = self._run_with_input(
+            f"head -c {size} -- {shlex.quote(str(path))} | sha256sum", ""
+        ).output
+        return cast(str, output.split(" ", 1)[0])
+
+    @contextmanager
+    def _open_sftp(self) -> Iterator[paramiko.SFTPClient]:
+        self._reserve_channel()
+        sftp: Optional[paramiko.SFTPClient] = None
+        try:
+            # the data is transferred on its own channel, so only opening it
+            # needs the lock.
+            with self._shell_lock:
+                assert self._inner_shell
+                sftp = self._inner_shell.as_spur()._open_sftp_client()
+        finally:
+            with self._channel_lock:
+                self._reserved_channel_count -= 1
+                channel = sftp.get_channel() if sftp else None
+                if channel:
+                    self._channels.append(channel)
+        assert sftp
+        try:
+            yield sftp
+        finally:
+            sftp.close()
+
+    def _put_resumable(self, local_path: Path, node_path: PurePath) -> None:
+        """
+        Data is written to a ".part" file, and it's renamed after completed. If a
+        copy is interrupted, the next copy resumes from the end of the ".part"
+        file, if the hash of it is the same as the beginning of the local file.
+        Otherwise, the file is copied again.
+        """
+        part_path = f"{node_path}{_PART_SUFFIX}"
+        local_stat = local_path.stat()
+        with self._open_sftp() as sftp:
+            try:
+                offset = sftp.stat(part_path).st_size or 0
+            except IOError:
+                offset = 0
+            if offset > local_stat.st_size:
+                offset = 0
+            if offset and self._get_node_hash(
+                PurePosixPath(part_path), offset
+            ) != _get_file_hash(local_path, offset):
+                # the part file is not from the same source, copy it again.
+                offset = 0
+            with open(local_path, "rb") as local_file, sftp.open(
+                part_path, "ab" if offset else "wb"
+            ) as node_file:
+                node_file.set_pipelined(True)
+                local_file.seek(offset)
+                shutil.copyfileobj(local_file, node_file, _TRANSFER_BLOCK_SIZE)
+            sftp.chmod(part_path, stat.S_IMODE(local_stat.st_mode))
+            sftp.posix_rename(part_path, str(node_path))
+
+    def _get_resumable(self, node_path: PurePath, local_path: Path) -> None:
+        part_path = local_path.with_name(f"{local_path.name}{_PART_SUFFIX}")
+        with self._open_sftp() as sftp:
+            size = sftp.stat(str(node_path)).st_size or 0
+            offset = part_path.stat().st_size if part_path.exists() else 0
+            if offset > size:
+                offset = 0
+            if offset and self._get_node_hash(node_path, offset) != _get_file_hash(
+                part_path, offset
+            ):
+                # the part file is not from the same source, copy it again.
+                offset = 0
+            local_path.parent.mkdir(parents=True, exist_ok=True)
+            with sftp.open(str(node_path), "rb") as node_file, open(
+                part_path, "ab" if offset else "wb"
+            ) as local_file:
+                node_file.seek(offset)
+                node_file.prefetch(size)
+                shutil.copyfileobj(node_file, local_file, _TRANSFER_BLOCK_SIZE)
+        os.replace(part_path, local_path)
+
+    def _spawn(self, **kwargs: Any) -> spur.ssh.SshProcess:
+        try:
+            # the command runs on its own channel, so only opening it needs the
+            # lock.
+            with self._shell_lock:
+                assert self._inner_shell
+                process: spur.ssh.SshProcess = _spawn_ssh_process(
+                    self._inner_shell, **kwargs
+                )
+        except FunctionTimedOut:
+            raise LisaException(
+                f"The remote node is timeout on execute {kwargs['command']}. "
+                f"It may be caused by paramiko/spur not support the shell of node."
+            )
+        return process
+
+    def _is_transport_active(self) -> bool:
+        with self._shell_lock:
+            if not self._inner_shell:
+                return False
+            client = self._inner_shell.as_spur()._client
+        if not client:
+            return False
+        transport = client.get_transport()
+        return transport is not None and transport.is_active()
+
+    def _reconnect(self) -> None:
+        with self._shell_lock:
+            # other threads may reconnect it already, when they wait the lock.
+            if self._is_transport_active():
+                return
+            self.close()
+            self.initialize()
+
+    def _reserve_channel(self) -> None:
+        """
+        Wait until the count of open channels is less than the max count.
+        """
+        timer = create_timer()
+        is_waiting_logged = False
+        while True:
+            with self._channel_lock:
+                self._channels = [x for x in self._channels if not x.closed]
+                if (
+                    len(self._channels) + self._reserved_channel_count
+                    < self._max_channel_count
+                ):
+                    self._reserved_channel_count += 1
+                    return
+                oldest_channel = self._channels[0] if self._channels else None
+
+            if not is_waiting_logged:
+                self._log.debug(
+                    f"all {self._max_channel_count} channels are used, waiting "
+                    f"for a free one up to {self.channel_wait_timeout} seconds."
+                )
+                is_waiting_logged = True
+            remaining_time = self.channel_wait_timeout - timer.elapsed(False)
+            if remaining_time <= 0:
+                raise LisaException(
+                    f"timeout on waiting channels of {self._connection_info}, "
+                    f"{len(self._channels)} channels are open."
+                )
+            if oldest_channel and not oldest_channel.status_event.is_set():
+                oldest_channel.status_event.wait(min(1, remaining_time))
+            else:
+                # other threads are opening channels, or the process exits,
+                # and the channel is closing.
+                sleep(0.01)
+
     def _establish_jump_boxes(self, address: str, port: int) -> Any:
         jump_boxes_runbook = development.get_jump_boxes()
         sock: Any = None
@@ -764,5 +1310,56 @@ class LocalShell(InitializableMixin):
         """
         self.copy(local_path=node_path, node_path=local_path)
 
+    def copy_bulk(
+        self,
+        local_path: PurePath,
+        node_path: PurePath,
+        files: Optional[List[PurePath]] = None,
+        mode: Optional[int] = None,
+    ) -> List[PurePath]:
+        """Copy a local directory, or listed files in it, to target directory.
+        Files with the same content are skipped.
+        Inputs:
+            local_path: local directory. (Absolute)
+            node_path: target directory. (Absolute)
+            files: relative paths in local_path. All files are copied, if it's
+                   None.
+            mode: mode of copied files. The source mode is kept, if it's None.
+        Outputs:
+            List[PurePath]: relative paths of copied files.
+        """
+        assert isinstance(local_path, Path), f"actual: {type(local_path)}"
+        assert isinstance(node_path, Path), f"actual: {type(node_path)}"
+        changed_files: List[PurePath] = []
+        for file in _list_files(local_path, files):
+            source_path = local_path / file
+            target_path = node_path / file
+            if target_path.is_file() and _get_file_hash(target_path) == _get_file_hash(
+                source_path
+            ):
+                continue
+            self.copy(source_path, target_path)
+            if mode is not None:
+                target_path.chmod(mode)
+            changed_files.append(file)
+        return changed_files
+
+    def copy_back_bulk(
+        self,
+        node_path: PurePath,
+        local_path: PurePath,
+        files: Optional[List[PurePath]] = None,
+    ) -> List[PurePath]:
+        """Copy a directory, or listed files in it, to local directory.
+        Inputs:
+            node_path: target directory. (Absolute)
+            local_path: local directory. (Absolute)
+            files: relative paths in node_path. All files are copied, if it's
+                   None.
+        Outputs:
+            List[PurePath]: relative paths of copied files.
+        """
+        return self.copy_bulk(local_path=node_path, node_path=local_path, files=files)
+
 
 Shell = Union[LocalShell, SshShell]
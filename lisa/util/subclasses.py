@@ -1,8 +1,9 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import importlib
 from collections import UserDict
-from typing import TYPE_CHECKING, Any, Generic, Iterable, Type, TypeVar, cast
+from typing import TYPE_CHECKING, Any, Dict, Generic, Iterable, Type, TypeVar, cast
 
 from lisa import schema
 from lisa.util import BaseClassMixin, InitializableMixin, LisaException, constants
@@ -30,6 +31,23 @@ class BaseClassWithRunbookMixin(BaseClassMixin):
 
 T_BASECLASS = TypeVar("T_BASECLASS", bound=BaseClassMixin)
 
+# full name of base type: {type name: module}. The modules are imported on the
+# first use of the type names.
+_lazy_modules: Dict[str, Dict[str, str]] = {}
+
+
+def add_lazy_modules(base_type_name: str, modules: Dict[str, str]) -> None:
+    """
+    Register modules of subclasses, which are imported when the type name is
+    used by a factory of the base type. The base type name is the full name,
+    like "lisa.notifier.Notifier".
+    """
+    _lazy_modules.setdefault(base_type_name, {}).update(modules)
+
+
+def get_lazy_modules(base_type: Type[Any]) -> Dict[str, str]:
+    return _lazy_modules.get(f"{base_type.__module__}.{base_type.__qualname__}", {})
+
 
 if TYPE_CHECKING:
     SubClassTypeDict = UserDict[str, type]
@@ -44,11 +62,20 @@ class Factory(InitializableMixin, Generic[T_BASECLASS], SubClassTypeDict):
         self._log = get_logger("subclasses", base_type.__name__)
 
     def _initialize(self, *args: Any, **kwargs: Any) -> None:
+        self._register_subclasses()
+        self._log.debug(
+            f"registered: " f"[{', '.join([name for name in self.keys()])}]"
+        )
+
+    def _register_subclasses(self) -> None:
         # initialize types from subclasses.
         # each type should be unique in code, or there is warning message.
         for subclass_type in self._get_subclasses(self._base_type):
             subclass_type_name = subclass_type.type_name()
             exists_type = self.get(subclass_type_name)
+            if exists_type is subclass_type:
+                # registered before a lazy module is imported.
+                continue
             if exists_type:
                 # so far, it happens on ut only.
                 # When UT code import each other, it happens.
@@ -60,9 +87,6 @@ class Factory(InitializableMixin, Generic[T_BASECLASS], SubClassTypeDict):
                 )
             else:
                 self[subclass_type.type_name()] = subclass_type
-        self._log.debug(
-            f"registered: " f"[{', '.join([name for name in self.keys()])}]"
-        )
 
     def load_typed_runbook(self, raw_runbook: Any) -> T_BASECLASS:
         type_name = raw_runbook[constants.TYPE]
@@ -106,9 +130,29 @@ class Factory(InitializableMixin, Generic[T_BASECLASS], SubClassTypeDict):
         self.initialize()
         sub_type = self.get(type_name)
         if sub_type is None:
+            self._import_lazy_module(type_name)
+            sub_type = self.get(type_name)
+        if sub_type is None:
+            supported_types = sorted(
+                set(self.keys()).union(get_lazy_modules(self._base_type))
+            )
             raise LisaException(
                 f"cannot find subclass '{type_name}' of {self._base_type.__name__}. "
-                f"Supported types include: {list(self.keys())}. "
-                f"Are you missing an import in 'mixin_modules.py' or an extension?"
+                f"Supported types include: {supported_types}. "
+                f"Are you missing an entry in 'mixin_modules.py' or an extension?"
             )
         return sub_type
+
+    def _import_lazy_module(self, type_name: str) -> None:
+        module_name = get_lazy_modules(self._base_type).get(type_name)
+        if not module_name:
+            return
+        self._log.debug(f"importing '{module_name}' for type '{type_name}'")
+        try:
+            importlib.import_module(module_name)
+        except ModuleNotFoundError as identifier:
+            raise LisaException(
+                f"cannot import module '{module_name}' of type '{type_name}'. "
+                f"Is the package of the type installed? {identifier}"
+            )
+        self._register_subclasses()
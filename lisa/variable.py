@@ -4,7 +4,6 @@
 import os
 import re
 from dataclasses import dataclass
-from distutils.util import strtobool
 from typing import Any, Dict, List, Optional, Union
 
 import yaml
@@ -17,6 +16,10 @@ DataType = Union[str, bool, int]
 _VARIABLE_PATTERN = re.compile(r"(\$\(.+?\))", re.MULTILINE)
 _ENV_START = "LISA_"
 _SECRET_ENV_START = "S_LISA_"
+# same as distutils.util.strtobool. distutils imports setuptools, and it slows
+# down the startup.
+_TRUE_VALUES = {"y", "yes", "t", "true", "on", "1"}
+_FALSE_VALUES = {"n", "no", "f", "false", "off", "0"}
 
 
 @dataclass
@@ -61,7 +64,7 @@ def _try_convert_type(original_value: Any, new_value: Any) -> Any:
 
     try:
         if target_type is bool:
-            new_value = bool(strtobool(new_value))
+            new_value = _str_to_bool(new_value)
         else:
             new_value = target_type(new_value)
     except Exception:
@@ -70,6 +73,15 @@ def _try_convert_type(original_value: Any, new_value: Any) -> Any:
     return new_value
 
 
+def _str_to_bool(value: str) -> bool:
+    value = value.lower()
+    if value in _TRUE_VALUES:
+        return True
+    if value in _FALSE_VALUES:
+        return False
+    raise ValueError(f"invalid truth value {value}")
+
+
 def replace_variables(data: Any, variables: Dict[str, VariableEntry]) -> Any:
 
     new_variables: Dict[str, VariableEntry] = {}
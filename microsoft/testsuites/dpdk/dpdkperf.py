@@ -11,7 +11,7 @@ from lisa import (
     simple_requirement,
 )
 from lisa.features import Gpu, Infiniband, IsolatedResource, Sriov
-from lisa.messages import NetworkPPSPerformanceMessage, create_perf_message
+from lisa.messages import NetworkPPSPerformanceMessage, PerfSamples, create_perf_message
 from lisa.testsuite import TestResult
 from lisa.tools import Lscpu
 from lisa.util import constants
@@ -403,6 +403,9 @@ class DpdkPerformance(TestSuite):
         sender_fields["tx_pps_maximum"] = sender.get_max_tx_pps()
         sender_fields["tx_pps_average"] = sender.get_mean_tx_pps()
         sender_fields["tx_pps_minimum"] = sender.get_min_tx_pps()
+        sender_fields["samples"] = [
+            PerfSamples.create("tx_pps", sender.tx_pps_data, "pps")
+        ]
 
         # receive side fields
         receiver = receive_kit.testpmd
@@ -410,6 +413,9 @@ class DpdkPerformance(TestSuite):
         receiver_fields["rx_pps_maximum"] = receiver.get_max_rx_pps()
         receiver_fields["rx_pps_average"] = receiver.get_mean_rx_pps()
         receiver_fields["rx_pps_minimum"] = receiver.get_min_rx_pps()
+        receiver_fields["samples"] = [
+            PerfSamples.create("rx_pps", receiver.rx_pps_data, "pps")
+        ]
 
         send_results = create_perf_message(
             NetworkPPSPerformanceMessage,
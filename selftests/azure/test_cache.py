@@ -0,0 +1,225 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import copy
+import json
+import pickle
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+from unittest import mock
+from unittest.case import TestCase
+
+from lisa import schema
+from lisa.sut_orchestrator.azure.cache import LazyDict, LocationCache
+from lisa.sut_orchestrator.azure.platform_ import (
+    AzureCapability,
+    AzureLocation,
+    AzurePlatform,
+)
+from lisa.util.logger import get_logger
+from lisa.util.perf_timer import create_timer
+
+_fixture_path = Path(__file__).parent
+
+
+def load_fixture(location: str) -> AzureLocation:
+    with open(_fixture_path / f"azure_locations_{location}.json", "r") as f:
+        return schema.load_by_type(AzureLocation, json.load(f))
+
+
+def encode_skus(location_data: AzureLocation) -> Dict[str, str]:
+    return {
+        vm_size: json.dumps(capability.to_dict())  # type: ignore
+        for vm_size, capability in location_data.capabilities.items()
+    }
+
+
+class LocationCacheTestCase(TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self._cache_path = Path(self._temp_dir.name) / "azure_locations.db"
+
+    def tearDown(self) -> None:
+        self._temp_dir.cleanup()
+
+    def test_lazy_dict(self) -> None:
+        decoded: List[str] = []
+
+        def decode(raw: str) -> Any:
+            decoded.append(raw)
+            return int(raw)
+
+        lazy_dict = LazyDict({"a": "1", "b": "2", "c": "3"}, decode)
+        self.assertEqual(3, len(lazy_dict))
+        self.assertTrue("b" in lazy_dict)
+        self.assertListEqual(["a", "b", "c"], list(lazy_dict))
+        self.assertListEqual([], decoded)
+
+        self.assertEqual(2, lazy_dict["b"])
+        self.assertEqual(2, lazy_dict.get("b"))
+        self.assertIsNone(lazy_dict.get("d"))
+        self.assertListEqual(["2"], decoded)
+
+        self.assertListEqual([1, 2, 3], list(lazy_dict.values()))
+        self.assertDictEqual({"a": 1, "b": 2, "c": 3}, lazy_dict.copy())
+        self.assertListEqual(["2", "1", "3"], decoded)
+
+    def test_lazy_dict_conversions(self) -> None:
+        # the conversions, which read a dict in C, get decoded values too.
+        expected = {"a": 1, "b": 2}
+        conversions: List[Callable[[LazyDict[int]], Any]] = [
+            dict,
+            lambda x: {**x},
+            copy.copy,
+            copy.deepcopy,
+            lambda x: pickle.loads(pickle.dumps(x)),
+            lambda x: json.loads(json.dumps(dict(x))),
+        ]
+        for conversion in conversions:
+            lazy_dict = LazyDict({"a": "1", "b": "2"}, int)
+            self.assertDictEqual(expected, conversion(lazy_dict))
+        self.assertEqual(expected, LazyDict({"a": "1", "b": "2"}, int))
+        self.assertEqual("{'a': 1, 'b': 2}", repr(LazyDict({"a": "1", "b": "2"}, int)))
+
+        lazy_dict = LazyDict({"a": "1", "b": "2"}, int)
+        lazy_dict["c"] = 3
+        del lazy_dict["a"]
+        self.assertListEqual([("b", 2), ("c", 3)], list(lazy_dict.items()))
+        self.assertEqual(2, lazy_dict.pop("b"))
+        self.assertEqual(1, len(lazy_dict))
+
+    def test_lazy_dict_on_error(self) -> None:
+        errors: List[str] = []
+
+        def on_error(key: str, identifier: Exception) -> int:
+            errors.append(key)
+            return -1
+
+        lazy_dict = LazyDict({"a": "1", "b": "broken"}, int, on_error)
+        self.assertEqual(1, lazy_dict["a"])
+        self.assertEqual(-1, lazy_dict["b"])
+        self.assertEqual(-1, lazy_dict["b"])
+        self.assertListEqual(["b"], errors)
+
+        # without on_error, the error is raised.
+        with self.assertRaises(ValueError):
+            LazyDict({"b": "broken"}, int)["b"]
+
+    def test_save_and_load(self) -> None:
+        location_cache = LocationCache(self._cache_path)
+        self.assertIsNone(location_cache.load("eastus"))
+
+        now = datetime.now()
+        skus = {"size_a": "a", "size_b": "b"}
+        self.assertTrue(location_cache.save("eastus", now, skus))
+        self.assertEqual((now, skus), location_cache.load("eastus"))
+        self.assertIsNone(location_cache.load("westus3"))
+
+        # other process can read it.
+        self.assertEqual((now, skus), LocationCache(self._cache_path).load("eastus"))
+
+        # the deleted location is fetched and saved again.
+        location_cache.delete("eastus")
+        self.assertIsNone(location_cache.load("eastus"))
+        self.assertTrue(location_cache.save("eastus", now, skus))
+        self.assertEqual((now, skus), location_cache.load("eastus"))
+
+    def test_incremental_update(self) -> None:
+        location_cache = LocationCache(self._cache_path)
+        now = datetime.now()
+        location_cache.save("eastus", now, {"size_a": "a", "size_b": "b"})
+        location_cache.save("westus3", now, {"size_a": "a"})
+
+        newer_skus = {"size_a": "a", "size_c": "c"}
+        self.assertTrue(
+            location_cache.save("eastus", now + timedelta(days=1), newer_skus)
+        )
+        self.assertEqual(
+            (now + timedelta(days=1), newer_skus), location_cache.load("eastus")
+        )
+        # other locations are not impacted.
+        self.assertEqual((now, {"size_a": "a"}), location_cache.load("westus3"))
+
+    def test_older_data_not_saved(self) -> None:
+        # if other process saved newer data, the older data is dropped.
+        now = datetime.now()
+        LocationCache(self._cache_path).save("eastus", now, {"size_a": "new"})
+        location_cache = LocationCache(self._cache_path)
+        self.assertFalse(
+            location_cache.save("eastus", now - timedelta(hours=1), {"size_a": "old"})
+        )
+        self.assertEqual((now, {"size_a": "new"}), location_cache.load("eastus"))
+
+    def test_broken_cache(self) -> None:
+        log = get_logger("test", "cache")
+        location_cache = LocationCache(self._cache_path)
+        platform = AzurePlatform.__new__(AzurePlatform)
+        platform.subscription_id = "subscription"
+        capabilities = encode_skus(load_fixture("westus3"))
+        vm_sizes = list(capabilities)
+
+        with mock.patch.object(
+            platform, "_get_location_cache", return_value=location_cache
+        ):
+            # if the data is in an old schema, it's dropped on loading.
+            location_cache.save("westus3", datetime.now(), {"size_a": "{}"})
+            self.assertIsNone(platform._load_location_info_from_cache("westus3", log))
+            self.assertIsNone(location_cache.load("westus3"))
+
+            # if a SKU is broken, the location is dropped and fetched on using it.
+            capabilities[vm_sizes[1]] = "broken"
+            location_cache.save("westus3", datetime.now(), capabilities)
+            location_data = platform._load_location_info_from_cache("westus3", log)
+            assert location_data
+            fetched = load_fixture("westus3")
+            with mock.patch.object(
+                platform, "get_location_info", return_value=fetched
+            ) as get_location_info:
+                self.assertEqual(
+                    fetched.capabilities[vm_sizes[1]],
+                    location_data.capabilities[vm_sizes[1]],
+                )
+            get_location_info.assert_called_once_with("westus3", log)
+            self.assertIsNone(location_cache.load("westus3"))
+
+    def test_load_benchmark(self) -> None:
+        log = get_logger("test", "cache")
+        locations = ["eastus", "westus3"]
+        location_cache = LocationCache(self._cache_path)
+        for location in locations:
+            location_data = load_fixture(location)
+            location_cache.save(location, datetime.now(), encode_skus(location_data))
+
+        iterations = 2
+        timer = create_timer()
+        for _ in range(iterations):
+            for location in locations:
+                load_fixture(location)
+        json_elapsed = timer.elapsed()
+
+        timer = create_timer()
+        for _ in range(iterations):
+            for location in locations:
+                loaded = location_cache.load(location)
+                assert loaded
+                capabilities = LazyDict(
+                    loaded[1],
+                    lambda x: schema.load_by_type(AzureCapability, json.loads(x)),
+                )
+                # look up a vm size, like a predefined vm size in runbook.
+                vm_size = next(iter(capabilities))
+                self.assertEqual(vm_size, capabilities[vm_size].vm_size)
+        cache_elapsed = timer.elapsed()
+
+        log.info(
+            f"loaded {len(locations) * iterations} locations, "
+            f"json: {json_elapsed:.3f}s, cache: {cache_elapsed:.3f}s"
+        )
+
+        # all SKUs are the same after decoding.
+        for location in locations:
+            loaded = location_cache.load(location)
+            assert loaded
+            self.assertDictEqual(encode_skus(load_fixture(location)), loaded[1])
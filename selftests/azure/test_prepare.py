@@ -1,6 +1,7 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import copy
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 from unittest.case import TestCase
@@ -13,6 +14,7 @@ from lisa.sut_orchestrator import AZURE
 from lisa.sut_orchestrator.azure import common, platform_
 from lisa.util import LisaException, NotMeetRequirementException, constants
 from lisa.util.logger import get_logger
+from lisa.util.perf_timer import create_timer
 
 
 class AzurePrepareTestCase(TestCase):
@@ -333,6 +335,102 @@ class AzurePrepareTestCase(TestCase):
             environment=env,
         )
 
+    def test_capability_table_matches_all_checks(self) -> None:
+        # the filtered and sorted candidates must match the same vm size as
+        # checking all sorted vm sizes one by one.
+        for location in ["westus3", "eastus"]:
+            location_info = self._platform.get_location_info(location, self._log)
+            all_capabilities = list(location_info.capabilities.values())
+            table = self._platform._get_capability_table(location, self._log)
+            for requirement in self.generate_requirements():
+                expected = self._platform._get_matched_capability(
+                    requirement,
+                    self._platform.get_sorted_vm_sizes(all_capabilities, self._log),
+                )
+                actual = self._platform._get_matched_capability(
+                    requirement, table.get_candidates(requirement)
+                )
+                self.assertEqual(expected, actual, f"requirement: {requirement}")
+
+    def test_match_capabilities_benchmark(self) -> None:
+        # real locations have hundreds of vm sizes, generate them from samples.
+        location = "benchmark"
+        location_info = self.generate_location(location, 600)
+        all_capabilities = list(location_info.capabilities.values())
+        requirements = self.generate_requirements()
+
+        timer = create_timer()
+        expected = [
+            self._platform._get_matched_capability(
+                requirement,
+                self._platform.get_sorted_vm_sizes(all_capabilities, self._log),
+            )
+            for requirement in requirements
+        ]
+        check_elapsed = timer.elapsed()
+
+        timer = create_timer()
+        actual = [
+            self._platform._get_matched_capabilities(
+                location, [requirement], self._log
+            )[0][0]
+            for requirement in requirements
+        ]
+        table_elapsed = timer.elapsed()
+
+        self._log.info(
+            f"matched {len(requirements)} requirements on "
+            f"{len(all_capabilities)} vm sizes, check all: {check_elapsed:.3f}s, "
+            f"capability table: {table_elapsed:.3f}s"
+        )
+        self.assertListEqual([x or False for x in expected], actual)
+
+    def generate_location(self, location: str, count: int) -> platform_.AzureLocation:
+        samples = list(
+            self._platform.get_location_info("eastus", self._log).capabilities.values()
+        )
+        capabilities: Dict[str, platform_.AzureCapability] = {}
+        for index in range(count):
+            sample = samples[index % len(samples)]
+            vm_size = f"{sample.vm_size}_{index}"
+            capability = copy.deepcopy(sample.capability)
+            capability.core_count = 2 ** (index % 7)
+            capability.memory_mb = 1024 * 2 ** (index % 9)
+            capabilities[vm_size] = platform_.AzureCapability(
+                location=location,
+                vm_size=vm_size,
+                capability=capability,
+                resource_sku=sample.resource_sku,
+            )
+        location_info = platform_.AzureLocation(
+            location=location, capabilities=capabilities
+        )
+        self._platform._locations_data_cache[
+            self._platform._get_location_key(location)
+        ] = location_info
+        return location_info
+
+    def generate_requirements(self) -> List[schema.NodeSpace]:
+        requirements: List[schema.NodeSpace] = []
+        for core_count in [1, 4, 16, 64]:
+            for memory_mb in [512, 8192, 65536]:
+                for nic_count in [1, 3, 8]:
+                    for gpu_count in [0, 1]:
+                        requirement = schema.NodeSpace(
+                            core_count=search_space.IntRange(min=core_count),
+                            memory_mb=search_space.IntRange(min=memory_mb),
+                            gpu_count=search_space.IntRange(min=gpu_count),
+                            network_interface=schema.NetworkInterfaceOptionSettings(
+                                nic_count=search_space.IntRange(min=nic_count)
+                            ),
+                        )
+                        _ = requirement.get_extended_runbook(
+                            common.AzureNodeSchema, AZURE
+                        )
+                        self._platform._load_image_features(requirement)
+                        requirements.append(requirement)
+        return requirements
+
     def verify_exists_vm_size(
         self, location: str, vm_size: str, expect_exists: bool
     ) -> Optional[platform_.AzureCapability]:
@@ -0,0 +1,100 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest import TestCase
+
+from lisa.node import local
+from lisa.sut_orchestrator.libvirt.image_cache import (
+    add_host_file,
+    get_cached_image_path,
+)
+from lisa.tools import Chmod, Ls
+from lisa.util.process import ExecutableResult
+
+
+class _StandInLs:
+    def path_exists(self, path: str, sudo: bool = False) -> bool:
+        return os.path.exists(path)
+
+
+class _StandInChmod:
+    def __init__(self) -> None:
+        self.paths: List[str] = []
+
+    def chmod(self, path: str, permission: str, sudo: bool = False) -> None:
+        self.paths.append(path)
+
+
+class _StandInHostNode:
+    """
+    The host node runs commands locally, and the tools, which need sudo, are
+    answered by the local file system.
+    """
+
+    def __init__(self) -> None:
+        self._local = local()
+        self.chmod = _StandInChmod()
+        self.tools: Dict[Any, Any] = {Ls: _StandInLs(), Chmod: self.chmod}
+
+    def execute(self, cmd: str, **kwargs: Any) -> ExecutableResult:
+        return self._local.execute(cmd, **kwargs)
+
+
+class ImageCacheTestCase(TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self._root = Path(self._temp_dir.name)
+        self._cache_dir = self._root / "cache"
+        self._cache_dir.mkdir()
+
+    def tearDown(self) -> None:
+        self._temp_dir.cleanup()
+
+    def test_cached_image_path(self) -> None:
+        image = self._root / "images" / "disk.qcow2"
+        image.parent.mkdir()
+        image.write_bytes(b"image v1")
+        copied_image = self._root / "disk.qcow2"
+        shutil.copyfile(image, copied_image)
+
+        cache_dir = str(self._cache_dir)
+        cached_path = get_cached_image_path(cache_dir, str(image))
+        self.assertEqual(cache_dir, os.path.dirname(cached_path))
+        self.assertTrue(cached_path.endswith("-disk.qcow2"))
+        # the same content in other paths is cached once.
+        self.assertEqual(
+            cached_path, get_cached_image_path(cache_dir, str(copied_image))
+        )
+        self.assertEqual(
+            f"{cached_path}.raw", get_cached_image_path(cache_dir, str(image), ".raw")
+        )
+
+        # an updated image is cached in a new path.
+        image.write_bytes(b"image v2 with a new size")
+        self.assertNotEqual(cached_path, get_cached_image_path(cache_dir, str(image)))
+
+    def test_add_host_file(self) -> None:
+        host_node: Any = _StandInHostNode()
+        path = str(self._cache_dir / "disk.qcow2")
+        created_paths: List[str] = []
+
+        def create(temp_path: str) -> None:
+            # the final path doesn't exist, until the temp file is completed.
+            self.assertFalse(os.path.exists(path))
+            created_paths.append(temp_path)
+            Path(temp_path).write_text("image")
+
+        self.assertTrue(add_host_file(host_node, path, "lisa-run", create))
+        self.assertListEqual([f"{path}.lisa-run.tmp"], created_paths)
+        self.assertEqual("image", Path(path).read_text())
+        self.assertListEqual(["disk.qcow2"], os.listdir(self._cache_dir))
+
+        # the existing file is reused, and it's readable for all.
+        self.assertFalse(add_host_file(host_node, path, "other-run", create))
+        self.assertEqual(1, len(created_paths))
+        self.assertListEqual([path], host_node.chmod.paths)
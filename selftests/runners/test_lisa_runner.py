@@ -8,7 +8,7 @@ import lisa
 from lisa import LisaException, constants, schema
 from lisa.environment import EnvironmentStatus, load_environments
 from lisa.messages import TestResultMessage, TestStatus
-from lisa.notifier import register_notifier
+from lisa.notifier import flush, register_notifier
 from lisa.runner import RunnerResult
 from lisa.runners.lisa_runner import LisaRunner
 from lisa.testsuite import TestResult, simple_requirement
@@ -653,4 +653,5 @@ class RunnerTestCase(TestCase):
                 if isinstance(task, Task):
                     task()
 
+        flush()
         return [x for x in results_collector.results.values()]
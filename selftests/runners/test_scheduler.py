@@ -0,0 +1,154 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+from typing import List
+from unittest import TestCase
+
+from lisa import schema, search_space
+from lisa.environment import (
+    Environment,
+    Environments,
+    EnvironmentSpace,
+    EnvironmentStatus,
+)
+from lisa.messages import TestStatus
+from lisa.runners.scheduler import ResultScheduler, sort_test_results
+from lisa.testsuite import (
+    TestCaseMetadata,
+    TestCaseRuntimeData,
+    TestResult,
+    TestSuiteMetadata,
+    simple_requirement,
+)
+from lisa.util.logger import get_logger
+from lisa.util.perf_timer import create_timer
+
+
+def generate_results(
+    count: int, case_count: int, use_new_environment: bool = False
+) -> List[TestResult]:
+    # generate cases without registering them, so they don't impact other tests.
+    suite = TestSuiteMetadata("a1", "c1", "synthetic suite")
+    suite.name = "SyntheticSuite"
+    suite.full_name = "SyntheticSuite"
+    cases: List[TestCaseMetadata] = []
+    for index in range(case_count):
+        case = TestCaseMetadata(
+            f"case {index}",
+            priority=index % 3,
+            use_new_environment=use_new_environment and index % 5 == 0,
+            requirement=simple_requirement(min_core_count=2 ** (index % 5)),
+        )
+        case.suite = suite
+        case.name = f"case_{index}"
+        case.full_name = f"SyntheticSuite.case_{index}"
+        cases.append(case)
+
+    return [
+        TestResult(f"r_{index}", TestCaseRuntimeData(cases[index % case_count]))
+        for index in range(count)
+    ]
+
+
+def generate_environments(count: int) -> List[Environment]:
+    environments = Environments()
+    for index in range(count):
+        node = schema.NodeSpace(
+            node_count=1, core_count=search_space.IntRange(min=2 ** (index % 6))
+        )
+        environments.from_requirement(EnvironmentSpace(nodes=[node]))
+    return list(environments.values())
+
+
+class SchedulerTestCase(TestCase):
+    def setUp(self) -> None:
+        self._log = get_logger("scheduler")
+
+    def test_sorted_results(self) -> None:
+        test_results = generate_results(100, 20)
+        scheduler = ResultScheduler(test_results, self._log)
+        self.assertListEqual(sort_test_results(test_results), scheduler.get_results())
+        self.assertListEqual(
+            [
+                x
+                for x in sort_test_results(test_results)
+                if x.runtime_data.priority == 1
+            ],
+            scheduler.get_results(priority=1),
+        )
+
+    def test_runnable_results_match_requirement(self) -> None:
+        test_results = generate_results(100, 20)
+        environments = generate_environments(6)
+        scheduler = ResultScheduler(test_results, self._log)
+        for environment in environments:
+            expected = [
+                x
+                for x in sort_test_results(test_results)
+                if x.check_environment(environment)
+            ]
+            self.assertListEqual(
+                expected, list(scheduler.get_runnable_results(environment))
+            )
+
+    def test_only_one_new_environment_result(self) -> None:
+        test_results = generate_results(100, 20, use_new_environment=True)
+        environment = generate_environments(6)[5]
+        scheduler = ResultScheduler(test_results, self._log)
+
+        runnable_results = list(scheduler.get_runnable_results(environment))
+        self.assertEqual(
+            1, len([x for x in runnable_results if x.runtime_data.use_new_environment])
+        )
+        environment.is_new = False
+        runnable_results = list(scheduler.get_runnable_results(environment))
+        self.assertEqual(
+            0, len([x for x in runnable_results if x.runtime_data.use_new_environment])
+        )
+
+    def test_check_cache_hits(self) -> None:
+        test_results = generate_results(100, 20)
+        environments = generate_environments(6)
+        scheduler = ResultScheduler(test_results, self._log)
+
+        for environment in environments:
+            list(scheduler.get_runnable_results(environment))
+        miss_count = scheduler.miss_count
+        # 20 cases are in 20 groups.
+        self.assertEqual(20 * len(environments), miss_count)
+
+        for environment in environments:
+            list(scheduler.get_runnable_results(environment))
+        self.assertEqual(miss_count, scheduler.miss_count)
+        self.assertEqual(miss_count, scheduler.hit_count)
+
+        # the cache is dropped, when the status of environment changes.
+        environments[0].status = EnvironmentStatus.Prepared
+        list(scheduler.get_runnable_results(environments[0]))
+        self.assertEqual(miss_count + 20, scheduler.miss_count)
+
+    def test_schedule_benchmark(self) -> None:
+        # schedule 2k results on 100 environments. Each dispatch picks the
+        # first runnable result of an environment, and complete it.
+        result_count = 2000
+        case_count = 50
+        test_results = generate_results(result_count, case_count)
+        environments = generate_environments(100)
+
+        timer = create_timer()
+        scheduler = ResultScheduler(test_results, self._log)
+        dispatched_count = 0
+        while scheduler.has_results():
+            for priority in range(3):
+                for environment in environments:
+                    test_result = next(
+                        scheduler.get_runnable_results(environment, priority), None
+                    )
+                    if test_result:
+                        test_result.status = TestStatus.PASSED
+                        dispatched_count += 1
+        self._log.info(f"scheduled {dispatched_count} results, {scheduler}, {timer}")
+
+        self.assertEqual(result_count, dispatched_count)
+        # each requirement is checked once on each environment.
+        self.assertEqual(case_count * len(environments), scheduler.miss_count)
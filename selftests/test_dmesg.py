@@ -0,0 +1,97 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Any, List
+from unittest import TestCase
+
+from lisa.tools import Dmesg
+from lisa.util import LisaException
+from lisa.util.logger import get_logger
+from lisa.util.process import ExecutableResult
+
+
+class _StandInProcess:
+    def __init__(self, result: ExecutableResult) -> None:
+        self._result = result
+
+    def wait_result(self, *args: Any, **kwargs: Any) -> ExecutableResult:
+        return self._result
+
+
+class _StandInNode:
+    """
+    It runs commands locally, and dmesg and the boot id are read from files.
+    """
+
+    def __init__(self, working_path: Path) -> None:
+        self.log = get_logger("node", "stand-in")
+        self.is_posix = True
+        self.dmesg_file = working_path / "dmesg"
+        self.boot_id_file = working_path / "boot_id"
+        self.boot_id_file.write_text("boot-1\n")
+        self.commands: List[str] = []
+
+    def execute(self, cmd: str, **kwargs: Any) -> ExecutableResult:
+        self.commands.append(cmd)
+        cmd = cmd.replace("/proc/sys/kernel/random/boot_id", str(self.boot_id_file))
+        cmd = cmd.replace("dmesg", f"cat {self.dmesg_file}")
+        process = subprocess.run(
+            cmd, shell=True, capture_output=True, text=True, check=False
+        )
+        return ExecutableResult(
+            process.stdout, process.stderr, process.returncode, cmd, 0
+        )
+
+    def execute_async(self, cmd: str, **kwargs: Any) -> _StandInProcess:
+        return _StandInProcess(self.execute(cmd, **kwargs))
+
+
+class DmesgTestCase(TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self._node = _StandInNode(Path(self._temp_dir.name))
+        self._dmesg = Dmesg(self._node)  # type: ignore
+        self._dmesg.initialize()
+
+    def tearDown(self) -> None:
+        self._temp_dir.cleanup()
+
+    def test_combined_pattern(self) -> None:
+        self._node.dmesg_file.write_text(
+            "[    1.000000] booting\n"
+            "[    2.000000] BUG: soft lockup - CPU#0 stuck for 22s!\n"
+            "[    3.000000] Call Trace:\n"
+        )
+        result = self._dmesg.check_kernel_errors(throw_error=False)
+        self.assertEqual(2, len(result.splitlines()))
+
+    def test_incremental(self) -> None:
+        self._node.dmesg_file.write_text(
+            "[    1.000000] booting\n" "[    2.500000] Call Trace:\n" " continued\n"
+        )
+        with self.assertRaises(LisaException):
+            self._dmesg.check_kernel_errors(incremental=True)
+
+        # the error is reported once.
+        with open(self._node.dmesg_file, "a") as file:
+            file.write("[   10.250000] new line\n")
+        self.assertEqual("", self._dmesg.check_kernel_errors(incremental=True))
+        self.assertIn("awk", self._node.commands[-1])
+
+        with open(self._node.dmesg_file, "a") as file:
+            file.write("[   11.000000] rcu_sched detected stalls on CPUs\n")
+        result = self._dmesg.check_kernel_errors(throw_error=False, incremental=True)
+        self.assertEqual("[   11.000000] rcu_sched detected stalls on CPUs", result)
+
+    def test_incremental_after_reboot(self) -> None:
+        self._node.dmesg_file.write_text("[   20.000000] booting\n")
+        self._dmesg.check_kernel_errors(incremental=True)
+
+        # timestamps restart after reboot, all lines are read again.
+        self._node.boot_id_file.write_text("boot-2\n")
+        self._node.dmesg_file.write_text("[    1.000000] Call Trace:\n")
+        result = self._dmesg.check_kernel_errors(throw_error=False, incremental=True)
+        self.assertEqual("[    1.000000] Call Trace:", result)
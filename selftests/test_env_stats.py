@@ -0,0 +1,64 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import tempfile
+import time
+from pathlib import Path
+from unittest import TestCase
+
+from lisa import schema
+from lisa.environment import EnvironmentMessage, EnvironmentStatus
+from lisa.messages import TestResultMessage, TestStatus
+from lisa.notifiers.env_stats import EnvironmentStats
+from lisa.util import constants
+
+
+class EnvironmentStatsTestCase(TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self._original_path = constants.RUN_LOCAL_LOG_PATH
+        constants.RUN_LOCAL_LOG_PATH = Path(self._temp_dir.name)
+        self._env_path = constants.RUN_LOCAL_LOG_PATH / "environments"
+
+    def tearDown(self) -> None:
+        constants.RUN_LOCAL_LOG_PATH = self._original_path
+        self._temp_dir.cleanup()
+
+    def test_events_and_summary(self) -> None:
+        notifier = EnvironmentStats(schema.Notifier(type="env_stats"))
+        notifier.initialize()
+        notifier._update_frequency = 0.1
+
+        notifier._received_message(
+            EnvironmentMessage(name="env_0", status=EnvironmentStatus.Deployed)
+        )
+        for status in [TestStatus.RUNNING, TestStatus.RUNNING, TestStatus.PASSED]:
+            notifier._received_message(
+                TestResultMessage(
+                    id_="1",
+                    full_name="suite.case",
+                    status=status,
+                    information={"environment": "env_0"},
+                )
+            )
+
+        # the event is appended once for each change.
+        events = (self._env_path / "environment_events.log").read_text().splitlines()
+        self.assertEqual(3, len(events))
+        self.assertIn("TestStatus.PASSED", events[-1])
+
+        # the summary is written by the background thread.
+        summary_path = self._env_path / "environment_stats.log"
+        for _ in range(50):
+            if summary_path.exists():
+                break
+            time.sleep(0.1)
+        self.assertIn("env_0", summary_path.read_text())
+
+        notifier._received_message(
+            EnvironmentMessage(name="env_0", status=EnvironmentStatus.Deleted)
+        )
+        notifier.finalize()
+        summary = summary_path.read_text().splitlines()
+        self.assertIn("Deleted", summary[1])
+        self.assertTrue(summary[1].endswith(" 1"))
@@ -3,7 +3,7 @@
 
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, List, Optional, Type, cast
+from typing import Any, Dict, List, Optional, Type, cast
 from unittest import TestCase
 
 from dataclasses_json import dataclass_json
@@ -11,9 +11,9 @@ from marshmallow import validate
 
 import lisa
 from lisa import constants, node, schema, search_space
-from lisa.environment import load_environments
+from lisa.environment import Environment, EnvironmentStatus, load_environments
 from lisa.testsuite import simple_requirement
-from lisa.util import field_metadata
+from lisa.util import field_metadata, hookimpl, plugin_manager
 from lisa.util.logger import Logger
 
 CUSTOM_LOCAL = "custom_local"
@@ -108,6 +108,16 @@ class CustomRemoteNode(node.RemoteNode):
         return CustomRemoteNodeSchema
 
 
+class _CountedInformation:
+    def __init__(self) -> None:
+        self.count = 0
+
+    @hookimpl
+    def get_environment_information(self, environment: Environment) -> Dict[str, str]:
+        self.count += 1
+        return {"count": str(self.count)}
+
+
 def generate_runbook(
     is_single_env: bool = False,
     local: bool = False,
@@ -285,3 +295,24 @@ class EnvironmentTestCase(TestCase):
                     self.assertEqual(r_n.custom_remote_field, CUSTOM_REMOTE)
                     done += 1
             self.assertEqual(2, done)
+
+    def test_cached_information(self) -> None:
+        runbook = generate_runbook(local=True, is_single_env=True)
+        env = load_environments(runbook)["customized_0"]
+        counted = _CountedInformation()
+        plugin_manager.register(counted)
+        try:
+            self.assertEqual("1", env.get_information()["count"])
+            self.assertEqual("1", env.get_information()["count"])
+
+            # it's refreshed in a new stage, or after a node is rebooted.
+            env.status = EnvironmentStatus.Prepared
+            self.assertEqual("2", env.get_information()["count"])
+            env.default_node.mark_rebooted()
+            self.assertEqual("3", env.get_information()["count"])
+            env.mark_dirty()
+            self.assertEqual("4", env.get_information()["count"])
+            self.assertEqual("5", env.get_information(force_run=True)["count"])
+            self.assertEqual("5", env.get_information()["count"])
+        finally:
+            plugin_manager.unregister(counted)
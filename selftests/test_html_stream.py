@@ -0,0 +1,82 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import json
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest import TestCase
+
+from lisa.messages import (
+    SubTestMessage,
+    TestResultMessage,
+    TestRunMessage,
+    TestRunStatus,
+    TestStatus,
+)
+from lisa.notifiers.html_stream import HtmlStream, HtmlStreamSchema
+from lisa.util import constants
+
+
+def _get_embedded_rows(report_path: Path) -> List[Dict[str, Any]]:
+    content = report_path.read_text(encoding="utf-8")
+    matched = re.search(
+        r'<script id="data" type="application/x-ndjson">\n(.*?)</script>',
+        content,
+        re.S,
+    )
+    assert matched
+    return [json.loads(x) for x in matched.group(1).splitlines()]
+
+
+class HtmlStreamTestCase(TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self._original_path = constants.RUN_LOCAL_LOG_PATH
+        constants.RUN_LOCAL_LOG_PATH = Path(self._temp_dir.name)
+
+    def tearDown(self) -> None:
+        constants.RUN_LOCAL_LOG_PATH = self._original_path
+        self._temp_dir.cleanup()
+
+    def test_stream_and_render(self) -> None:
+        notifier = HtmlStream(HtmlStreamSchema(type="html_stream", render_interval=0))
+        notifier.initialize()
+        report_path = constants.RUN_LOCAL_LOG_PATH / "lisa_report.html"
+        self.assertListEqual([], _get_embedded_rows(report_path))
+
+        for message in [
+            TestRunMessage(status=TestRunStatus.INITIALIZING, run_name="run"),
+            TestResultMessage(
+                id_="1", name="case", suite_full_name="suite", status=TestStatus.RUNNING
+            ),
+            SubTestMessage(id_="1", name="sub", status=TestStatus.FAILED, elapsed=1),
+        ]:
+            notifier._received_message(message)
+        # the report is rendered during the run.
+        self.assertEqual(
+            ["run", "SubTestResult"],
+            [x["type"] for x in _get_embedded_rows(report_path)],
+        )
+
+        notifier._received_message(
+            TestResultMessage(
+                id_="1",
+                name="case",
+                suite_full_name="suite",
+                status=TestStatus.PASSED,
+                message="</script><b>",
+            )
+        )
+        notifier._received_message(TestRunMessage(status=TestRunStatus.SUCCESS))
+        notifier.finalize()
+
+        rows = _get_embedded_rows(report_path)
+        data_path = constants.RUN_LOCAL_LOG_PATH / "lisa_report.ndjson"
+        self.assertListEqual(
+            rows, [json.loads(x) for x in data_path.read_text().splitlines()]
+        )
+        self.assertEqual("suite", rows[1]["suite"])
+        self.assertEqual("</script><b>", rows[2]["message"])
+        self.assertEqual("SUCCESS", rows[3]["status"])
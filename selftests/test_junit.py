@@ -0,0 +1,95 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import tempfile
+import xml.etree.ElementTree as ET  # noqa: N817
+from datetime import datetime
+from pathlib import Path
+from typing import List, Tuple
+from unittest import TestCase
+
+from lisa.messages import (
+    MessageBase,
+    SubTestMessage,
+    TestResultMessage,
+    TestRunMessage,
+    TestRunStatus,
+    TestStatus,
+)
+from lisa.notifiers.junit import JUnit, JUnitSchema
+from lisa.util import constants
+
+
+def _create_result(
+    id_: str, suite: str, status: TestStatus, elapsed: float
+) -> TestResultMessage:
+    return TestResultMessage(
+        id_=id_,
+        name=f"case_{id_}",
+        suite_full_name=suite,
+        status=status,
+        elapsed=elapsed,
+        time=datetime(2022, 1, 1),
+        message="failed" if status == TestStatus.FAILED else "",
+    )
+
+
+def _get_messages() -> List[MessageBase]:
+    return [
+        TestRunMessage(status=TestRunStatus.INITIALIZING, runbook_name="run" * 200),
+        _create_result("1", "suite_a", TestStatus.RUNNING, 0),
+        _create_result("2", "suite_b", TestStatus.RUNNING, 0),
+        SubTestMessage(id_="2", name="sub_1", status=TestStatus.RUNNING, elapsed=1),
+        SubTestMessage(id_="2", name="sub_1", status=TestStatus.FAILED, elapsed=2),
+        _create_result("1", "suite_a", TestStatus.PASSED, 3),
+        _create_result("3", "suite_a", TestStatus.RUNNING, 3),
+        _create_result("2", "suite_b", TestStatus.PASSED, 4),
+        _create_result("3", "suite_a", TestStatus.SKIPPED, 5),
+        TestRunMessage(status=TestRunStatus.SUCCESS, elapsed=6),
+    ]
+
+
+def _get_cases(root: ET.Element) -> List[Tuple[str, List[Tuple[str, str]]]]:
+    return sorted(
+        (suite.attrib["name"], sorted(case.attrib.items()))
+        for suite in root
+        for case in suite.iter("testcase")
+    )
+
+
+class JUnitTestCase(TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self._original_path = constants.RUN_LOCAL_LOG_PATH
+        constants.RUN_LOCAL_LOG_PATH = Path(self._temp_dir.name)
+
+    def tearDown(self) -> None:
+        constants.RUN_LOCAL_LOG_PATH = self._original_path
+        self._temp_dir.cleanup()
+
+    def test_streaming(self) -> None:
+        expected = self._run(streaming=False)
+        actual = self._run(streaming=True)
+
+        self.assertDictEqual(expected.attrib, actual.attrib)
+        self.assertListEqual(_get_cases(expected), _get_cases(actual))
+        # suite_a is closed, and reopened by the case 3. The sub test is counted.
+        self.assertListEqual(
+            ["suite_a", "suite_b", "suite_a"], [x.attrib["name"] for x in actual]
+        )
+        self.assertListEqual(["1", "2", "1"], [x.attrib["tests"] for x in actual])
+
+    def _run(self, streaming: bool) -> ET.Element:
+        path = f"{streaming}.xml"
+        junit = JUnit(JUnitSchema(type="junit", path=path, streaming=streaming))
+        junit.initialize()
+        for message in _get_messages():
+            junit._received_message(message)
+            if streaming:
+                # the report is valid after each message.
+                ET.parse(constants.RUN_LOCAL_LOG_PATH / path)
+        junit.finalize()
+
+        root = ET.parse(constants.RUN_LOCAL_LOG_PATH / path).getroot()
+        self.assertEqual("testsuites", root.tag)
+        return root
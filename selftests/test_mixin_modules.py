@@ -0,0 +1,117 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import importlib
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+from unittest import TestCase
+
+from lisa import mixin_modules
+from lisa.util import LisaException
+from lisa.util.logger import get_logger
+from lisa.util.subclasses import Factory
+
+# the budget of importing lisa and types of a local-only runbook. It's relative
+# to the time of importing the dependencies, which lisa needs anyway, in the same
+# process. So it's stable on slow or loaded machines, and an SDK, which is
+# imported by mistake, still exceeds it.
+_IMPORT_TIME_RATIO = 3.0
+# the dependencies are imported before lisa, so their time is the baseline.
+_BASELINE_PACKAGES = ["dataclasses_json", "paramiko", "spur", "yaml", "assertpy"]
+# the packages shouldn't be imported, if the runbook doesn't use them.
+_SDK_PACKAGES = ["azure.mgmt", "azure.identity", "boto3", "libvirt", "pytest_html"]
+
+_LOCAL_STARTUP_SCRIPT = f"""
+import json
+import sys
+
+import {", ".join(_BASELINE_PACKAGES)}
+import lisa.main
+from lisa.notifier import Notifier
+from lisa.platform_ import Platform
+from lisa.runner import BaseRunner
+from lisa.util.subclasses import Factory
+
+for base_type, type_name in [
+    (Notifier, "console"),
+    (Notifier, "file"),
+    (Platform, "ready"),
+    (BaseRunner, "lisa"),
+]:
+    Factory(base_type)._get_sub_type(type_name)
+# stdout is redirected to log by lisa.
+sys.__stdout__.write(json.dumps(list(sys.modules)))
+"""
+
+
+def _parse_import_time(output: str) -> Dict[str, float]:
+    # the format is: "import time: self [us] | cumulative | imported package".
+    # Top level packages are not indented, so the sum of them is the total.
+    result: Dict[str, float] = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if name.startswith(" ") and not name.startswith("  "):
+            result[name.strip()] = int(cumulative) / 1000000
+    return result
+
+
+class MixinModulesTestCase(TestCase):
+    def test_lazy_modules(self) -> None:
+        log = get_logger("test", "mixin")
+        for base_type_name, type_modules in mixin_modules.modules.items():
+            base_module_name, base_name = base_type_name.rsplit(".", 1)
+            base_type = getattr(importlib.import_module(base_module_name), base_name)
+            factory = Factory[base_type](base_type)  # type: ignore
+            for type_name, module_name in type_modules.items():
+                try:
+                    importlib.import_module(module_name)
+                except ImportError as identifier:
+                    log.info(f"skipped '{module_name}': {identifier}")
+                    continue
+                sub_type = factory._get_sub_type(type_name)
+                self.assertEqual(type_name, sub_type.type_name())  # type: ignore
+
+    def test_unknown_type(self) -> None:
+        from lisa.notifier import Notifier
+
+        factory = Factory[Notifier](Notifier)
+        with self.assertRaises(LisaException) as context:
+            factory._get_sub_type("selftest_not_exist")
+        # types are listed, even they are not imported.
+        self.assertIn("junit", str(context.exception))
+
+    def test_local_startup_import_time(self) -> None:
+        log = get_logger("test", "mixin")
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _LOCAL_STARTUP_SCRIPT],
+            cwd=Path(__file__).parent.parent,
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(0, process.returncode, process.stderr[-2000:])
+
+        modules = json.loads(process.stdout)
+        for package in _SDK_PACKAGES:
+            imported = [
+                x for x in modules if x == package or x.startswith(f"{package}.")
+            ]
+            self.assertListEqual([], imported, f"'{package}' shouldn't be imported")
+
+        import_times = _parse_import_time(process.stderr)
+        baseline = sum(import_times.get(x, 0) for x in _BASELINE_PACKAGES)
+        lisa_times = {
+            key: value for key, value in import_times.items() if key.startswith("lisa")
+        }
+        total = sum(lisa_times.values())
+        slowest = sorted(lisa_times.items(), key=lambda x: x[1], reverse=True)[:5]
+        log.info(
+            f"import time: {total:.3f}s, dependencies: {baseline:.3f}s, "
+            f"slowest: {slowest}"
+        )
+        self.assertGreater(baseline, 0)
+        self.assertLess(total, baseline * _IMPORT_TIME_RATIO)
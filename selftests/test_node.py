@@ -0,0 +1,38 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+from unittest import TestCase
+
+from lisa.node import local
+
+
+class NodeTestCase(TestCase):
+    def test_execute_batch(self) -> None:
+        node = local()
+        results = node.execute_batch(
+            [
+                "echo hello; echo world",
+                "ls /lisa_not_existing_path",
+                "printf 'no new line'",
+                "cd /; exit 3",
+                "pwd",
+            ]
+        )
+        self.assertEqual(5, len(results))
+
+        self.assertEqual("hello\nworld", results[0].stdout)
+        self.assertEqual("", results[0].stderr)
+        self.assertEqual(0, results[0].exit_code)
+        self.assertEqual("echo hello; echo world", results[0].cmd)
+
+        self.assertEqual("", results[1].stdout)
+        self.assertIn("lisa_not_existing_path", results[1].stderr)
+        self.assertNotEqual(0, results[1].exit_code)
+
+        self.assertEqual("no new line", results[2].stdout)
+        self.assertEqual(3, results[3].exit_code)
+        # commands run in sub shells, so they don't impact each other.
+        self.assertNotEqual("/", results[4].stdout)
+
+        for result in results:
+            self.assertLess(result.elapsed, 5)
@@ -0,0 +1,113 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Type
+from unittest import TestCase
+
+from lisa import notifier, schema
+from lisa.messages import MessageBase
+from lisa.util.logger import get_logger
+from lisa.util.perf_timer import create_timer
+
+
+@dataclass
+class SampleMessage(MessageBase):
+    type: str = "Sample"
+    index: int = 0
+
+
+class SlowNotifier(notifier.Notifier):
+    @classmethod
+    def type_name(cls) -> str:
+        return "selftest_slow"
+
+    @classmethod
+    def type_schema(cls) -> Type[schema.TypedSchema]:
+        return schema.Notifier
+
+    def __init__(self, runbook: schema.TypedSchema) -> None:
+        super().__init__(runbook)
+        self.received: List[int] = []
+        self.messages: List[MessageBase] = []
+        self.event = threading.Event()
+        self.event.set()
+
+    def _received_message(self, message: MessageBase) -> None:
+        assert isinstance(message, SampleMessage)
+        self.event.wait()
+        time.sleep(0.01)
+        self.received.append(message.index)
+        self.messages.append(message)
+
+    def _subscribed_message_type(self) -> List[Type[MessageBase]]:
+        return [SampleMessage]
+
+
+class DroppingNotifier(SlowNotifier):
+    queue_size = 2
+    drop_on_full = True
+
+    @classmethod
+    def type_name(cls) -> str:
+        return "selftest_dropping"
+
+
+class NotifierTestCase(TestCase):
+    def test_not_blocked_by_slow_notifier(self) -> None:
+        count = 50
+        slow_notifier = SlowNotifier(schema.Notifier())
+        slow_notifier.event.clear()
+        notifier.register_notifier(slow_notifier)
+
+        timer = create_timer()
+        for index in range(count):
+            notifier.notify(SampleMessage(index=index))
+        notify_elapsed = timer.elapsed(False)
+        # the notifier is blocked, but messages are queued without waiting it.
+        self.assertListEqual([], slow_notifier.received)
+        slow_notifier.event.set()
+        notifier.flush()
+        get_logger("notifier").info(
+            f"notified {count} messages in {notify_elapsed:.3f}s, "
+            f"handled in {timer.elapsed(False):.3f}s"
+        )
+        self.assertListEqual(list(range(count)), slow_notifier.received)
+
+    def test_message_snapshot(self) -> None:
+        slow_notifier = SlowNotifier(schema.Notifier())
+        notifier.register_notifier(slow_notifier)
+        other_notifier = SlowNotifier(schema.Notifier())
+        notifier.register_notifier(other_notifier)
+
+        message = SampleMessage(index=1)
+        notifier.notify(message)
+        # the producer may reuse the message.
+        message.index = 2
+        notifier.notify(message)
+        notifier.flush()
+
+        self.assertListEqual([1, 2], slow_notifier.received)
+        self.assertListEqual([1, 2], other_notifier.received)
+        # the message is copied once, and the copy is shared by notifiers.
+        for received, other_received in zip(
+            slow_notifier.messages, other_notifier.messages
+        ):
+            self.assertIsNot(message, received)
+            self.assertIs(received, other_received)
+
+    def test_drop_on_full(self) -> None:
+        dropping_notifier = DroppingNotifier(schema.Notifier())
+        dropping_notifier.event.clear()
+        notifier.register_notifier(dropping_notifier)
+
+        for index in range(10):
+            notifier.notify(SampleMessage(index=index))
+        dropping_notifier.event.set()
+        notifier.flush()
+
+        # one is handling, and two are in the queue.
+        self.assertLessEqual(len(dropping_notifier.received), 3)
+        self.assertEqual(0, dropping_notifier.received[0])
@@ -0,0 +1,136 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+from typing import Any, Dict, List
+from unittest import TestCase
+
+from lisa.operating_system import CBLMariner, Debian
+from lisa.util.logger import get_logger
+from lisa.util.process import ExecutableResult
+
+_DPKG_OUTPUT = (
+    "git\tamd64\t1:2.25.1-1ubuntu3.2\tinstall ok installed\n"
+    "libc6\tamd64\t2.31-0ubuntu9.9\tinstall ok installed\n"
+    "vim\tamd64\t2:8.1.2269-1ubuntu5\tdeinstall ok config-files\n"
+)
+_RPM_OUTPUT = (
+    "dpdk\tx86_64\tdpdk-20.11-3.el8.x86_64\n"
+    "gpg-pubkey\t(none)\tgpg-pubkey-3dbdc284-53674dd4.(none)\n"
+)
+
+
+class _StandInNode:
+    """
+    It answers commands by the first matched prefix, and records all commands,
+    so round trips can be counted.
+    """
+
+    def __init__(self, outputs: Dict[str, str]) -> None:
+        self.log = get_logger("node", "stand-in")
+        self.commands: List[str] = []
+        self._outputs = outputs
+
+    def execute(self, cmd: str, **kwargs: Any) -> ExecutableResult:
+        self.commands.append(cmd)
+        exit_code = 1 if cmd.startswith("pidof") else 0
+        stdout = next(
+            (value for key, value in self._outputs.items() if cmd.startswith(key)),
+            "",
+        )
+        return ExecutableResult(stdout, "", exit_code, cmd, 0)
+
+    def count(self, prefix: str) -> int:
+        return len([x for x in self.commands if x.startswith(prefix)])
+
+
+class OperatingSystemTestCase(TestCase):
+    def test_installed_packages(self) -> None:
+        node = _StandInNode({"dpkg-query": _DPKG_OUTPUT})
+        os = Debian(node)
+
+        self.assertTrue(os.package_exists("git"))
+        self.assertTrue(os.package_exists("libc6:amd64"))
+        version = os.get_package_information("git")
+        self.assertEqual((2, 25, 1), (version.major, version.minor, version.patch))
+        # installed packages are answered by one round trip.
+        self.assertEqual(1, len(node.commands))
+
+        # removed packages with config files are not installed. The missed
+        # packages are queried by the package manager.
+        self.assertFalse(os.package_exists("vim"))
+        self.assertFalse(os.package_exists("curl"))
+        self.assertEqual(2, node.count("dpkg --get-selections"))
+
+        os.invalidate_package_cache()
+        self.assertTrue(os.package_exists("git"))
+        self.assertEqual(2, node.count("dpkg-query"))
+
+    def test_install_packages(self) -> None:
+        node = _StandInNode({"dpkg-query": _DPKG_OUTPUT})
+        os = Debian(node)
+
+        # installed packages are passed too by default, so they can be upgraded.
+        os.install_packages(["git", "jq"])
+        install_commands = [x for x in node.commands if " install " in x]
+        self.assertEqual(1, len(install_commands))
+        self.assertIn("-y install git jq", install_commands[0])
+        self.assertEqual(0, node.count("dpkg-query"))
+
+        os.queue_packages(["jq", "git"])
+        os.install_packages(["curl", "jq"], skip_installed=True)
+        install_commands = [x for x in node.commands if " install " in x]
+        # queued packages are in the same transaction, installed ones are skipped.
+        self.assertEqual(2, len(install_commands))
+        self.assertIn("-y install jq curl", install_commands[1])
+
+        # the index is loaded again after installation.
+        os.install_packages(["git", "libc6"], skip_installed=True)
+        self.assertEqual(2, node.count("dpkg-query"))
+        self.assertEqual(2, len([x for x in node.commands if " install " in x]))
+
+    def test_repo_packages(self) -> None:
+        node = _StandInNode(
+            {
+                "apt-cache policy curl": "Candidate: 7.68.0",
+                "apt-cache policy not-exist": "Unable to locate package not-exist",
+            }
+        )
+        os = Debian(node)
+
+        self.assertTrue(os.is_package_in_repo("curl"))
+        self.assertTrue(os.is_package_in_repo("curl"))
+        self.assertFalse(os.is_package_in_repo("not-exist"))
+        self.assertFalse(os.is_package_in_repo("not-exist"))
+        self.assertEqual(2, node.count("apt-cache policy"))
+
+        os.install_packages("curl")
+        self.assertTrue(os.is_package_in_repo("curl"))
+        self.assertEqual(3, node.count("apt-cache policy"))
+
+    def test_rpm_installed_packages(self) -> None:
+        node = _StandInNode({"rpm -qa": _RPM_OUTPUT})
+        os = CBLMariner(node)
+
+        self.assertTrue(os.package_exists("dpdk"))
+        self.assertTrue(os.package_exists("dpdk.x86_64"))
+        version = os.get_package_information("dpdk")
+        self.assertEqual((20, 11, 0), (version.major, version.minor, version.patch))
+        self.assertEqual(1, len(node.commands))
+        self.assertFalse(os.package_exists("dpdk.aarch64"))
+        self.assertEqual(1, node.count("dnf list installed"))
+
+    def test_installed_packages_fallback(self) -> None:
+        # the package is installed by a command after the index is loaded, or
+        # it's a pattern, which isn't in the index.
+        node = _StandInNode(
+            {
+                "dpkg-query": _DPKG_OUTPUT,
+                "dpkg --get-selections": "curl\t\t\tinstall\n",
+            }
+        )
+        os = Debian(node)
+
+        self.assertTrue(os.package_exists("git"))
+        self.assertTrue(os.package_exists("curl"))
+        self.assertEqual(1, node.count("dpkg-query"))
+        self.assertEqual(1, node.count("dpkg --get-selections"))
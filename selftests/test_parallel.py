@@ -0,0 +1,40 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import time
+from functools import partial
+from threading import Lock
+from typing import List
+from unittest import TestCase
+
+from lisa.util.logger import get_logger
+from lisa.util.parallel import run_in_parallel
+
+
+class ParallelTestCase(TestCase):
+    def setUp(self) -> None:
+        self._lock = Lock()
+        self._running = 0
+        self._max_running = 0
+
+    def test_max_workers(self) -> None:
+        log = get_logger("test", "parallel")
+        results = run_in_parallel(
+            [partial(self._task, x) for x in range(6)], log, max_workers=2
+        )
+        self.assertListEqual(list(range(6)), sorted(results))
+        self.assertEqual(2, self._max_running)
+
+    def test_all_workers(self) -> None:
+        results: List[int] = run_in_parallel([partial(self._task, x) for x in range(4)])
+        self.assertListEqual(list(range(4)), sorted(results))
+        self.assertEqual(4, self._max_running)
+
+    def _task(self, value: int) -> int:
+        with self._lock:
+            self._running += 1
+            self._max_running = max(self._max_running, self._running)
+        time.sleep(0.2)
+        with self._lock:
+            self._running -= 1
+        return value
@@ -0,0 +1,159 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import io
+import re
+from typing import Dict, List, Pattern
+from unittest import TestCase, mock
+
+from lisa import util
+from lisa.util import PatternSet, find_patterns_groups_in_lines
+from lisa.util.logger import get_logger
+from lisa.util.perf_timer import create_timer
+
+# the patterns of tool parsers.
+_PATTERNS = [
+    # ethtool -S
+    re.compile(r"^\s+(?P<name>.*?)\: +?(?P<value>\d*?)\r?$"),
+    # lscpu
+    re.compile(r"^(?P<name>CPU|Total CPU)\(s\):[ ]+(?P<value>[\d]+)\r?$", re.M),
+    re.compile(r"^[ ]*Thread\(s\) per core:[ ]+(?P<value>[\d]+)\r?$", re.M),
+    re.compile(r"^[ ]*Socket\(s\):[ ]+(?P<value>[\d]+)\r?$", re.M),
+    re.compile(r"^Architecture:\s+(?P<value>.*)?\r?$", re.M),
+    re.compile(r"^[ ]*Core\(s\) per socket:[ ]+(?P<value>[\d]+)\r?$", re.M),
+    re.compile(r"^Core\(s\) per cluster:[ ]+(?P<value>[\d]+)\r?$", re.M),
+    re.compile(r"^Cluster\(s\):[ ]+(?P<value>[\d]+)\r?$", re.M),
+    re.compile(r"^Model name:\s+(?P<value>.*)\r?$", re.M),
+    re.compile(r"^NUMA node\(s\):\s+(?P<value>\d+)\r?$", re.M),
+    re.compile(r"^NUMA node(?P<node>\d+) CPU\(s\):\s+(?P<value>\S+)\r?$", re.M),
+    re.compile(r"^Vendor ID:\s+(?P<value>.*)\r?$", re.M),
+    # lspci -vvv
+    re.compile(r"^\s+Kernel driver in use: (?P<driver>[A-Za-z0-9_-]*)"),
+    re.compile(
+        r"^(?P<slot>[0-9a-f:.]+) (?P<class>[^:]+): (?P<vendor>.+?) "
+        r"\(rev (?P<rev>\w+)\)"
+    ),
+    # sar -n DEV
+    re.compile(
+        r"^(?P<time>\d{2}:\d{2}:\d{2}( (AM|PM))?)\s+(?P<iface>\w+)\s+"
+        r"(?P<rxpck>[\d.]+)\s+(?P<txpck>[\d.]+)",
+        re.I,
+    ),
+]
+
+
+def _get_tool_output(count: int) -> str:
+    lines: List[str] = []
+    for index in range(count):
+        lines += [
+            f"     rx_queue_{index}_packets: {index * 7}",
+            f"     tx_queue_{index}_bytes: {index * 1024}",
+            f"0000:{index % 256:02x}:00.0 Ethernet controller: Mellanox "
+            f"Technologies MT27710 Family (rev 80)",
+            "\tKernel driver in use: mlx5_core",
+            f"12:00:{index % 60:02d} AM  eth0  {index}.00  {index * 2}.00  0.00",
+            "Architecture:        x86_64",
+            "CPU(s):              16",
+            "Thread(s) per core:  2",
+            "Model name:          Intel(R) Xeon(R) Platinum 8272CL CPU @ 2.60GHz",
+            f"NUMA node{index % 2} CPU(s):   0-7",
+        ]
+    return "\n".join(lines)
+
+
+def _find_by_patterns(
+    lines: str, patterns: List[Pattern[str]]
+) -> List[List[Dict[str, str]]]:
+    # the original implementation, which runs each pattern on each line.
+    results: List[List[Dict[str, str]]] = [[] for _ in patterns]
+    for line in lines.splitlines(keepends=False):
+        for index, pattern in enumerate(patterns):
+            matches = pattern.match(line)
+            if matches:
+                results[index].append(matches.groupdict())
+    return results
+
+
+class PatternSetTestCase(TestCase):
+    def test_same_results(self) -> None:
+        output = _get_tool_output(20)
+        self.assertListEqual(
+            _find_by_patterns(output, _PATTERNS),
+            PatternSet(_PATTERNS).match_lines(output),
+        )
+        self.assertListEqual(
+            _find_by_patterns(output, _PATTERNS),
+            find_patterns_groups_in_lines(output, _PATTERNS),
+        )
+
+    def test_same_group_names_and_flags(self) -> None:
+        patterns = [
+            re.compile(r"^(?P<key>\w+)=(?P<value>\w+)$"),
+            re.compile(r"^(?P<key>[a-z]+)=(?P=key)$", re.I),
+            re.compile(
+                r"""
+                ^(?P<key>\w+)  # name
+                =(?P<value>\d+)$  # number
+                """,
+                re.X,
+            ),
+        ]
+        pattern_set = PatternSet(patterns)
+        self.assertListEqual(
+            [
+                [{"key": "A", "value": "a"}, {"key": "b", "value": "2"}],
+                [{"key": "A"}],
+                [{"key": "b", "value": "2"}],
+            ],
+            pattern_set.match_lines("A=a\nb=2\nc d"),
+        )
+
+    def test_separated_pattern(self) -> None:
+        # numbered backreferences cannot be combined.
+        patterns = [re.compile(r"^(\w)=\1$"), re.compile(r"^(?P<name>\w)=")]
+        pattern_set = PatternSet(patterns)
+        self.assertListEqual(
+            [[{}], [{"name": "a"}, {"name": "b"}]],
+            pattern_set.match_lines("a=a\nb=c"),
+        )
+
+    def test_without_re_parser(self) -> None:
+        # if the parser of re isn't found, patterns are matched one by one.
+        output = _get_tool_output(5)
+        with mock.patch.object(util, "_is_re_parser_found", False):
+            pattern_set = PatternSet(_PATTERNS)
+        self.assertListEqual(
+            _find_by_patterns(output, _PATTERNS), pattern_set.match_lines(output)
+        )
+        combined, _, separated = pattern_set._get_matcher("a")
+        self.assertIsNone(combined)
+        self.assertEqual(len(_PATTERNS), len(separated))
+
+    def test_stream(self) -> None:
+        output = _get_tool_output(5)
+        self.assertListEqual(
+            PatternSet(_PATTERNS).match_lines(output),
+            PatternSet(_PATTERNS).match_lines(
+                x.rstrip("\n") for x in io.StringIO(output)
+            ),
+        )
+
+    def test_benchmark(self) -> None:
+        log = get_logger("test", "pattern_set")
+        output = _get_tool_output(2000)
+        pattern_set = PatternSet(_PATTERNS)
+
+        timer = create_timer()
+        expected = _find_by_patterns(output, _PATTERNS)
+        patterns_elapsed = timer.elapsed()
+
+        timer = create_timer()
+        actual = pattern_set.match_lines(output)
+        pattern_set_elapsed = timer.elapsed()
+
+        log.info(
+            f"{len(output.splitlines())} lines, {len(_PATTERNS)} patterns, "
+            f"each pattern: {patterns_elapsed:.3f}s, "
+            f"pattern set: {pattern_set_elapsed:.3f}s"
+        )
+        self.assertListEqual(expected, actual)
@@ -0,0 +1,61 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import json
+import tempfile
+from array import array
+from decimal import Decimal
+from pathlib import Path
+from unittest import TestCase
+
+from lisa.messages import NetworkPPSPerformanceMessage, PerfSamples
+from lisa.notifiers.perf_samples import PerfSamplesDump, PerfSamplesSchema
+from lisa.util import LisaException, constants
+
+
+class PerfSamplesTestCase(TestCase):
+    def test_statistics(self) -> None:
+        samples = PerfSamples.create("pps", [Decimal(4), 1, 3.0, 2])
+        self.assertEqual(4, len(samples))
+        self.assertListEqual([0, 1, 2, 3], list(samples.timestamps))
+        self.assertEqual(2.5, samples.percentile(50))
+        self.assertEqual(4, samples.percentile(100))
+        self.assertAlmostEqual(3.7, samples.percentile(90))
+        self.assertAlmostEqual(1.118034, samples.stddev(), places=6)
+        self.assertIn("count=4", repr(samples))
+
+        with self.assertRaises(LisaException):
+            PerfSamples("empty").percentile(50)
+
+    def test_dump(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            original_path = constants.RUN_LOCAL_LOG_PATH
+            constants.RUN_LOCAL_LOG_PATH = Path(temp_dir)
+            try:
+                dump = PerfSamplesDump(PerfSamplesSchema(type="perf_samples"))
+                dump.initialize()
+                message = NetworkPPSPerformanceMessage(
+                    tool="sar",
+                    samples=[
+                        PerfSamples.create("rx_pps", [1, 2, 3]),
+                        PerfSamples("empty"),
+                        PerfSamples.create("tx_pps", [5, 6]),
+                    ],
+                )
+                dump._received_message(message)
+                dump.finalize()
+
+                index_lines = Path(temp_dir, "perf_samples.ndjson").read_text()
+                indexes = [json.loads(x) for x in index_lines.splitlines()]
+                data = array("d")
+                with open(Path(temp_dir, "perf_samples.bin"), "rb") as data_file:
+                    data.frombytes(data_file.read())
+            finally:
+                constants.RUN_LOCAL_LOG_PATH = original_path
+
+        self.assertListEqual(["rx_pps", "tx_pps"], [x["name"] for x in indexes])
+        tx_index = indexes[1]
+        self.assertEqual("NetworkPPSPerformanceMessage", tx_index["type"])
+        self.assertEqual(5.5, tx_index["percentiles"]["p50"])
+        offset = tx_index["values_offset"] // data.itemsize
+        self.assertListEqual([5, 6], list(data[offset : offset + tx_index["count"]]))
@@ -0,0 +1,212 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import io
+import re
+import tempfile
+import time
+from pathlib import Path
+from unittest import TestCase, mock
+
+from lisa.util import LisaException
+from lisa.util import process as process_module
+from lisa.util.logger import LogWriter, get_logger
+from lisa.util.perf_timer import create_timer
+from lisa.util.process import OutputBuffer, OutputMatcher, Process
+from lisa.util.shell import LocalShell
+
+
+class ProcessTestCase(TestCase):
+    def setUp(self) -> None:
+        self._log = get_logger("process")
+        self._shell = LocalShell()
+        self._shell.initialize()
+
+    def test_wait_result(self) -> None:
+        process = self._start("echo hello")
+        result = process.wait_result(timeout=10)
+        self.assertEqual(0, result.exit_code)
+        self.assertEqual("hello", result.stdout)
+        self.assertFalse(process.is_running())
+
+    def test_wait_result_timeout(self) -> None:
+        process = self._start("sleep 1")
+        timer = create_timer()
+        result = process.wait_result(timeout=0.2)
+        self.assertLess(timer.elapsed(), 5)
+        self.assertNotEqual(0, result.exit_code)
+
+    def test_wait_exit(self) -> None:
+        process = self._start("sh -c 'sleep 0.5; echo done'")
+        # the process is still running, and it's not killed on timeout.
+        self.assertFalse(process.wait_exit(0.1))
+        self.assertTrue(process.is_running())
+        self.assertTrue(process.wait_exit(10))
+        result = process.wait_result(timeout=10)
+        self.assertEqual(0, result.exit_code)
+        self.assertEqual("done", result.stdout)
+
+    def test_wait_exit_polling(self) -> None:
+        # processes without exit event are polled until timeout.
+        process = self._start("sh -c 'sleep 0.5'")
+        process._exit_event = None
+        self.assertFalse(process.wait_exit(0.1))
+        self.assertTrue(process.is_running())
+        self.assertTrue(process.wait_exit(10))
+        self.assertEqual(0, process.wait_result(timeout=10).exit_code)
+
+    def test_wait_output(self) -> None:
+        process = self._start("sh -c 'sleep 0.1; echo ready 42; sleep 2'")
+        timer = create_timer()
+        process.wait_output("ready", timeout=60, interval=30)
+        # it's woken up by the output, not by the interval.
+        self.assertLess(timer.elapsed(), 30)
+        process.wait_output(re.compile(r"ready \d+"), timeout=10)
+        with self.assertRaises(LisaException):
+            process.wait_output("missing", timeout=1, interval=1)
+        process.kill()
+        process.wait_result(timeout=10)
+
+        # stderr is matched too, but it's not in the read output. The local
+        # process runs in a pty, which merges stderr, so write it directly.
+        process = self._start("sleep 2")
+        process._stderr_writer.write("error message\n")
+        process.wait_output("error message", timeout=10)
+        self.assertEqual("", process.read_output()[0])
+        process.kill()
+        process.wait_result(timeout=10)
+
+    def test_read_output(self) -> None:
+        process = self._start("sh -c 'echo first; sleep 0.5; echo second'")
+        process.wait_output("first", timeout=10)
+        output, position = process.read_output()
+        self.assertEqual("first", output.strip())
+        process.wait_result(timeout=10)
+        # only new output is returned.
+        output, _ = process.read_output(position)
+        self.assertEqual("second", output.strip())
+
+    def test_output_buffer(self) -> None:
+        buffer = OutputBuffer(max_size=10000)
+        for index in range(10000):
+            buffer.write(f"{index}\n")
+        self.assertEqual(sum(len(f"{x}\n") for x in range(10000)), buffer.size)
+        # the oldest output is dropped.
+        output = buffer.getvalue()
+        self.assertLess(len(output), 10000 + 4096)
+        self.assertTrue(output.endswith("9998\n9999\n"))
+        self.assertNotIn("\n100\n", output)
+
+        # read new output only.
+        position = buffer.size
+        buffer.write("new")
+        buffer.write(" output")
+        self.assertEqual(("new output", position + 10), buffer.read(position))
+        self.assertEqual(("", position + 10), buffer.read(position + 10))
+
+    def test_output_matcher(self) -> None:
+        # keyword across writes.
+        matcher = OutputMatcher("ready")
+        self.assertFalse(matcher.match("not re"))
+        self.assertTrue(matcher.match("ady"))
+
+        # pattern in a partial line, which is completed later.
+        matcher = OutputMatcher(re.compile(r"^count: \d+ done$", re.M))
+        self.assertFalse(matcher.match("line 1\ncount: 1"))
+        self.assertFalse(matcher.match("2"))
+        self.assertTrue(matcher.match(" done\nline 3"))
+
+    def test_output_file(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = Path(temp_dir) / "output.log"
+            process = Process("test", self._shell, parent_logger=self._log)
+            process.start("seq 1 20000", no_debug_log=True, output_path=output_path)
+            process.wait_output("20000", timeout=30)
+            result = process.wait_result(timeout=30)
+            self.assertEqual(0, result.exit_code)
+
+            # the full output is in the file.
+            expected = [str(x) for x in range(1, 20001)]
+            self.assertListEqual(expected, output_path.read_text().split())
+            self.assertEqual(output_path.stat().st_size, process._output_buffer.size)
+
+    def test_output_benchmark(self) -> None:
+        # the output is written by chars, like the process does. Compare with
+        # joining the whole line on each write and searching the whole buffer,
+        # as before.
+        line = "x" * 200000 + "\n"
+        log = get_logger("process", "benchmark")
+
+        timer = create_timer()
+        old_buffer = ""
+        string_buffer = io.StringIO()
+        for index, char in enumerate(line):
+            old_buffer = "".join([old_buffer, char])
+            string_buffer.write(char)
+            if index % 100 == 0:
+                self.assertNotIn("ready", string_buffer.getvalue())
+        old_elapsed = timer.elapsed()
+
+        timer = create_timer()
+        writer = LogWriter(log, 0)
+        buffer = OutputBuffer(max_size=65536)
+        matcher = OutputMatcher("ready")
+        position = 0
+        for index, char in enumerate(line):
+            writer.write(char)
+            buffer.write(char)
+            if index % 100 == 0:
+                output, position = buffer.read(position)
+                self.assertFalse(matcher.match(output))
+        new_elapsed = timer.elapsed()
+
+        log.info(
+            f"{len(line)} chars, joined: {old_elapsed:.3f}s, "
+            f"chunked: {new_elapsed:.3f}s"
+        )
+        # the chars are joined to chunks, and only the latest output is kept.
+        self.assertEqual(len(line), buffer.size)
+        kept = buffer.getvalue()
+        self.assertLessEqual(len(kept), 65536 + 4096)
+        self.assertTrue(line.endswith(kept))
+        self.assertTrue(all(len(x) == 4096 for x in buffer._chunks))
+        # only a short tail is kept to match the keyword across writes.
+        self.assertEqual(len("ready") - 1, len(matcher._tail))
+
+    def test_wait_result_benchmark(self) -> None:
+        # compare the latency and CPU time of short commands, between waiting
+        # on the exit event and polling every 10 ms as before.
+        count = 100
+        timer = create_timer()
+        cpu_time = time.process_time()
+        with mock.patch.object(process_module.time, "sleep") as sleep:
+            for _ in range(count):
+                process = self._start("true")
+                process.wait_result(timeout=10)
+                # it's woken up by the exit event, not by polling.
+                assert process._exit_event
+                self.assertTrue(process._exit_event.is_set())
+        sleep.assert_not_called()
+        event_elapsed = timer.elapsed()
+        event_cpu_time = time.process_time() - cpu_time
+
+        timer = create_timer()
+        cpu_time = time.process_time()
+        for _ in range(count):
+            process = self._start("true")
+            while process._process and process._process.is_running():
+                time.sleep(0.01)
+            process.wait_result(timeout=10)
+        polling_elapsed = timer.elapsed()
+        polling_cpu_time = time.process_time() - cpu_time
+
+        self._log.info(
+            f"{count} commands, event: {event_elapsed:.3f}s "
+            f"(cpu {event_cpu_time:.3f}s), polling: {polling_elapsed:.3f}s "
+            f"(cpu {polling_cpu_time:.3f}s)"
+        )
+
+    def _start(self, command: str) -> Process:
+        process = Process("test", self._shell, parent_logger=self._log)
+        process.start(command, no_info_log=True)
+        return process
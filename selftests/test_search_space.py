@@ -1,10 +1,11 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import copy
 import logging
 import unittest
 from dataclasses import dataclass
-from typing import Any, List, Optional, TypeVar
+from typing import Any, List, Optional, TypeVar, cast
 
 from lisa.search_space import (
     CountSpace,
@@ -14,11 +15,15 @@ from lisa.search_space import (
     SetSpace,
     check,
     check_countspace,
+    clear_cache,
+    fingerprint,
     generate_min_capability,
     generate_min_capability_countspace,
+    get_cache_statistics,
 )
 from lisa.util import LisaException
 from lisa.util.logger import get_logger
+from lisa.util.perf_timer import create_timer
 
 T = TypeVar("T")
 
@@ -184,6 +189,113 @@ class SearchSpaceTestCase(unittest.TestCase):
             IntRange(min=5, max=5, max_inclusive=False)
         self.assertIn("shouldn't be equal to", str(cm.exception))
 
+    def test_fingerprint(self) -> None:
+        self.assertEqual(
+            fingerprint(IntRange(min=1, max=5)), fingerprint(IntRange(min=1, max=5))
+        )
+        self.assertNotEqual(
+            fingerprint(IntRange(min=1, max=5)),
+            fingerprint(IntRange(min=1, max=5, max_inclusive=False)),
+        )
+        # the order of items doesn't matter in a set.
+        self.assertEqual(
+            fingerprint(SetSpace(True, ["a", "b"])),
+            fingerprint(SetSpace(True, ["b", "a"])),
+        )
+        self.assertNotEqual(
+            fingerprint(SetSpace(True, ["a", "b"])),
+            fingerprint(SetSpace(False, ["a", "b"])),
+        )
+        self.assertNotEqual(fingerprint(1), fingerprint(True))
+        self.assertNotEqual(
+            fingerprint([IntRange(min=1), IntRange(min=2)]),
+            fingerprint([IntRange(min=2), IntRange(min=1)]),
+        )
+        item = MockItem(number=IntRange(min=1, max=5))
+        item_fingerprint = fingerprint(item)
+        self.assertEqual(item_fingerprint, fingerprint(copy.deepcopy(item)))
+        item.number = 3
+        self.assertNotEqual(item_fingerprint, fingerprint(item))
+
+    def test_set_space_deepcopy(self) -> None:
+        set_space = SetSpace(True, ["a", "b"])
+        copied = copy.deepcopy(set_space)
+        self.assertSetEqual({"a", "b"}, set(copied))
+        self.assertListEqual(["a", "b"], copied.items)
+        self.assertTrue(copied.is_allow_set)
+
+    def test_cached_generate_min_capability(self) -> None:
+        clear_cache()
+        requirement = MockItem(number=IntRange(min=2, max=5))
+        capability = MockItem(number=IntRange(min=1, max=10))
+
+        first = requirement.generate_min_capability(capability)
+        # equal objects hit the cache.
+        second = copy.deepcopy(requirement).generate_min_capability(
+            copy.deepcopy(capability)
+        )
+        self.assertEqual(first, second)
+        # the cached result is copied, so the change is not visible to others.
+        self.assertIsNot(first, second)
+        second.number = 10
+        self.assertEqual(2, requirement.generate_min_capability(capability).number)
+
+        statistics = get_cache_statistics()["generate_min_capability"]
+        self.assertEqual(3, statistics.calls)
+        self.assertEqual(2, statistics.hits)
+        self.assertEqual(1, statistics.misses)
+
+        # changed requirement doesn't hit the cache.
+        requirement.number = IntRange(min=3, max=5)
+        self.assertEqual(3, requirement.generate_min_capability(capability).number)
+        self.assertEqual(2, get_cache_statistics()["generate_min_capability"].misses)
+
+        # failed ones are not cached.
+        requirement.number = IntRange(min=11)
+        with self.assertRaises(LisaException):
+            requirement.generate_min_capability(capability)
+        with self.assertRaises(LisaException):
+            requirement.generate_min_capability(capability)
+
+        clear_cache()
+        statistics = get_cache_statistics()["generate_min_capability"]
+        self.assertEqual(0, statistics.calls)
+        self.assertEqual(0, statistics.size)
+
+    def test_cached_generate_min_capability_benchmark(self) -> None:
+        # like merging test requirements, requirements of many test cases are
+        # the same, and they are merged with the same platform requirement.
+        capability = [IntRange(min=1, max=16), IntRange(min=32, max=64)]
+        requirements = [
+            MockItem(number=[IntRange(min=x % 20), IntRange(min=x % 20 + 30)])
+            for x in range(5000)
+        ]
+
+        timer = create_timer()
+        expected = []
+        for requirement in requirements:
+            clear_cache()
+            number = cast(List[IntRange], requirement.number)
+            expected.append(generate_min_capability(number, capability))
+        uncached_elapsed = timer.elapsed()
+
+        clear_cache()
+        timer = create_timer()
+        actual = [
+            generate_min_capability(cast(List[IntRange], x.number), capability)
+            for x in requirements
+        ]
+        cached_elapsed = timer.elapsed()
+
+        statistics = get_cache_statistics()["generate_min_capability"]
+        self._log.info(
+            f"generated {len(requirements)} min capabilities, uncached: "
+            f"{uncached_elapsed:.3f}s, cached: {cached_elapsed:.3f}s, "
+            f"hit rate: {statistics.hit_rate:.3f}"
+        )
+        self.assertListEqual(expected, actual)
+        self.assertEqual(20, statistics.misses)
+
     def _verify_matrix(
         self,
         expected_meet: List[List[bool]],
@@ -1,11 +1,47 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import random
 import re
+import string
+import uuid
+from typing import List, Tuple
+from unittest import mock
 from unittest.case import TestCase
 
+from lisa import secret as secret_module
 from lisa.secret import PATTERN_GUID, add_secret, mask, reset
 from lisa.util.logger import get_logger
+from lisa.util.perf_timer import create_timer
+
+
+def generate_secrets(count: int) -> List[str]:
+    secrets: List[str] = []
+    for index in range(count):
+        kind = index % 4
+        if kind == 0:
+            secrets.append(str(uuid.uuid4()))
+        elif kind == 1:
+            secrets.append(
+                "".join(random.choices(string.ascii_letters + string.digits, k=88))
+                + "=="
+            )
+        elif kind == 2:
+            secrets.append(f"/home/user{index}/.ssh/id_rsa_{index}")
+        else:
+            secrets.append(
+                f"https://account{index}.blob.core.windows.net/c?sv=2020&sig="
+                + "".join(random.choices(string.ascii_letters, k=32))
+            )
+    return secrets
+
+
+def mask_by_replace(secrets: List[Tuple[str, str]], input: str) -> str:
+    # the previous implementation, it's the baseline of the benchmark.
+    for secret in secrets:
+        if secret[0] in input:
+            input = input.replace(secret[0], secret[1])
+    return input
 
 
 class SecretTestCase(TestCase):
@@ -79,3 +115,58 @@ class SecretTestCase(TestCase):
         with self.assertLogs("lisa") as cm:
             log.info("with args t2: %s", "t1")
         self.assertListEqual(["INFO:lisa.:with args ******: ******"], cm.output)
+
+    def test_overlapped_secrets(self) -> None:
+        add_secret("abc", sub="1")
+        add_secret("bcd", sub="2")
+        add_secret("ab", sub="3")
+        add_secret("a.c", sub="4")
+        self.assertEqual("1d 3x 2 a4", mask("abcd abx bcd aa.c"))
+        self.assertEqual("", mask(""))
+        self.assertEqual("a", mask("a"))
+
+    def test_compile_on_mask(self) -> None:
+        # secrets are compiled once on the next mask, not on each add.
+        with mock.patch.object(
+            secret_module, "_trie_to_regex", wraps=secret_module._trie_to_regex
+        ) as trie_to_regex:
+            for index in range(10):
+                add_secret(f"secret{index}")
+            trie_to_regex.assert_not_called()
+            self.assertEqual("****** ******", mask("secret1 secret9"))
+            trie_to_regex.assert_called()
+            call_count = trie_to_regex.call_count
+            self.assertEqual("******", mask("secret2"))
+            self.assertEqual(call_count, trie_to_regex.call_count)
+
+            # the secret added later is masked too.
+            add_secret("later")
+            self.assertEqual("******", mask("later"))
+
+    def test_mask_benchmark(self) -> None:
+        random.seed(0)
+        secrets = generate_secrets(200)
+        for item in secrets:
+            add_secret(item)
+        secret_list = [(x, "******") for x in sorted(secrets, key=len, reverse=True)]
+
+        lines: List[str] = []
+        for index in range(20000):
+            line = f"{index} [INFO] lisa.node: cmd: ls -la /var/log, exit code: 0"
+            if index % 100 == 0:
+                line += f" {secrets[index % len(secrets)]}"
+            lines.append(line)
+
+        timer = create_timer()
+        expected = [mask_by_replace(secret_list, x) for x in lines]
+        replace_elapsed = timer.elapsed()
+        timer = create_timer()
+        actual = [mask(x) for x in lines]
+        mask_elapsed = timer.elapsed()
+
+        get_logger("secret").info(
+            f"masked {len(lines)} lines with {len(secrets)} secrets, "
+            f"replace: {replace_elapsed:.3f}s, compiled: {mask_elapsed:.3f}s"
+        )
+        self.assertListEqual(expected, actual)
+        self.assertEqual(200, len([x for x in actual if "******" in x]))
@@ -0,0 +1,96 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Tuple
+from unittest import TestCase
+
+from lisa import schema
+from lisa.features.serial_console import NAME_SERIAL_CONSOLE_LOG, SerialConsole
+from lisa.util import LisaException
+from lisa.util.logger import get_logger
+
+
+class _StandInNode:
+    def __init__(self, local_log_path: Path) -> None:
+        self.log = get_logger("node", "stand-in")
+        self.local_log_path = local_log_path
+
+
+class _AppendedSerialConsole(SerialConsole):
+    """
+    The log is appended by the test, and the offsets of queries are recorded.
+    """
+
+    def __init__(self, node: _StandInNode) -> None:
+        super().__init__(schema.FeatureSettings(), node, None)  # type: ignore
+        self.log = b""
+        self.offsets: List[int] = []
+
+    def _get_console_log_after(
+        self, offset: int, saved_path: Optional[Path]
+    ) -> Tuple[int, bytes]:
+        self.offsets.append(offset)
+        if len(self.log) < offset:
+            return 0, self.log
+        return offset, self.log[offset:]
+
+
+class SerialConsoleTestCase(TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self._log_path = Path(self._temp_dir.name)
+        self._console = _AppendedSerialConsole(_StandInNode(self._log_path))
+        self._console.initialize()
+
+    def tearDown(self) -> None:
+        self._temp_dir.cleanup()
+
+    def test_incremental_fetch(self) -> None:
+        console = self._console
+        console.log = "booting é".encode("utf-8")[:-1]
+        console.check_panic(saved_path=None)
+        # the character is cut, it's decoded in next fetch.
+        console.log = "booting é\nlogin: ".encode("utf-8")
+        console.check_panic(saved_path=None, force_run=True)
+        self.assertEqual("booting é\nlogin: ", console.get_console_log())
+        self.assertListEqual([0, len("booting ".encode("utf-8")) + 1], console.offsets)
+
+        # one log file is appended.
+        log_file = self._log_path / NAME_SERIAL_CONSOLE_LOG
+        self.assertEqual(console.log, log_file.read_bytes())
+
+    def test_panic_in_new_lines(self) -> None:
+        console = self._console
+        console.log = b"line 1\nline 2\n"
+        console.check_panic(saved_path=None)
+
+        console.log += b"Kernel panic - not syncing: Fatal exception\n"
+        with self.assertRaises(LisaException) as context:
+            console.check_panic(saved_path=None, force_run=True)
+        self.assertIn("Kernel panic", str(context.exception))
+
+        # the found panic is kept after the lines are scanned.
+        console.log += b"line 3\n"
+        with self.assertRaises(LisaException):
+            console.check_panic(saved_path=None, force_run=True)
+
+    def test_prompt_without_line_end(self) -> None:
+        console = self._console
+        console.log = b"Loading initial ramdisk\n(initramfs) "
+        with self.assertRaises(LisaException):
+            console.check_initramfs(saved_path=None)
+
+    def test_restarted_log(self) -> None:
+        console = self._console
+        console.log = b"Kernel panic - not syncing: Fatal exception\n"
+        with self.assertRaises(LisaException):
+            console.check_panic(saved_path=None)
+
+        # the log is shorter, so it's restarted, and the panic is gone.
+        console.log = b"booting\n"
+        console.check_panic(saved_path=None, force_run=True)
+        self.assertEqual("booting\n", console.get_console_log())
+        log_file = self._log_path / NAME_SERIAL_CONSOLE_LOG
+        self.assertEqual(b"booting\n", log_file.read_bytes())
@@ -0,0 +1,537 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import logging
+import os
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from functools import partial
+from pathlib import Path, PurePath, PurePosixPath
+from typing import Any, List, Optional
+from unittest import TestCase
+
+import paramiko
+from paramiko.common import (
+    AUTH_SUCCESSFUL,
+    OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED,
+    OPEN_SUCCEEDED,
+)
+
+from lisa import schema
+from lisa.node import quick_connect
+from lisa.util import LisaException
+from lisa.util.logger import get_logger
+from lisa.util.parallel import run_in_parallel
+from lisa.util.perf_timer import create_timer
+from lisa.util.process import Process
+from lisa.util.shell import SshShell
+
+_host_key: Optional[paramiko.RSAKey] = None
+logging.getLogger("sshd_stand_in").setLevel(logging.CRITICAL)
+
+
+class _StandInServer(paramiko.ServerInterface):
+    """
+    A minimal sshd stand-in, it runs exec requests by local sh.
+    """
+
+    def __init__(self, sshd: "_StandInSshd") -> None:
+        self._sshd = sshd
+
+    def get_allowed_auths(self, username: str) -> str:
+        return "password"
+
+    def check_auth_password(self, username: str, password: str) -> int:
+        return AUTH_SUCCESSFUL
+
+    def check_channel_request(self, kind: str, chanid: int) -> int:
+        if kind == "session":
+            return OPEN_SUCCEEDED
+        return OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_pty_request(self, *args: Any, **kwargs: Any) -> bool:
+        return True
+
+    def check_channel_exec_request(
+        self, channel: paramiko.Channel, command: bytes
+    ) -> bool:
+        thread = threading.Thread(
+            target=self._sshd.run_command, args=(channel, command), daemon=True
+        )
+        thread.start()
+        return True
+
+
+class _StandInSftpHandle(paramiko.SFTPHandle):
+    def __init__(self, flags: int, file: Any) -> None:
+        super().__init__(flags)
+        self.readfile = file
+        self.writefile = file
+
+
+def _sftp_error(identifier: OSError) -> int:
+    return int(paramiko.SFTPServer.convert_errno(identifier.errno))
+
+
+class _StandInSftpServer(paramiko.SFTPServerInterface):
+    """
+    It serves the local file system.
+    """
+
+    def list_folder(self, path: str) -> Any:
+        try:
+            return [
+                paramiko.SFTPAttributes.from_stat(
+                    os.lstat(os.path.join(path, name)), filename=name
+                )
+                for name in os.listdir(path)
+            ]
+        except OSError as identifier:
+            return _sftp_error(identifier)
+
+    def stat(self, path: str) -> Any:
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.stat(path))
+        except OSError as identifier:
+            return _sftp_error(identifier)
+
+    def lstat(self, path: str) -> Any:
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.lstat(path))
+        except OSError as identifier:
+            return _sftp_error(identifier)
+
+    def open(self, path: str, flags: int, attr: paramiko.SFTPAttributes) -> Any:
+        try:
+            fd = os.open(path, flags, 0o666)
+        except OSError as identifier:
+            return _sftp_error(identifier)
+        if flags & os.O_WRONLY:
+            mode = "ab" if flags & os.O_APPEND else "wb"
+        elif flags & os.O_RDWR:
+            mode = "a+b" if flags & os.O_APPEND else "r+b"
+        else:
+            mode = "rb"
+        return _StandInSftpHandle(flags, os.fdopen(fd, mode))
+
+    def remove(self, path: str) -> int:
+        try:
+            os.remove(path)
+        except OSError as identifier:
+            return _sftp_error(identifier)
+        return int(paramiko.sftp.SFTP_OK)
+
+    def mkdir(self, path: str, attr: paramiko.SFTPAttributes) -> int:
+        try:
+            os.mkdir(path)
+        except OSError as identifier:
+            return _sftp_error(identifier)
+        return int(paramiko.sftp.SFTP_OK)
+
+    def posix_rename(self, oldpath: str, newpath: str) -> int:
+        try:
+            os.replace(oldpath, newpath)
+        except OSError as identifier:
+            return _sftp_error(identifier)
+        return int(paramiko.sftp.SFTP_OK)
+
+    def chattr(self, path: str, attr: paramiko.SFTPAttributes) -> int:
+        try:
+            if attr.st_mode is not None:
+                os.chmod(path, attr.st_mode)
+        except OSError as identifier:
+            return _sftp_error(identifier)
+        return int(paramiko.sftp.SFTP_OK)
+
+
+class _StandInSshd:
+    def __init__(self) -> None:
+        global _host_key
+        if _host_key is None:
+            _host_key = paramiko.RSAKey.generate(2048)
+        self._host_key = _host_key
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.bind(("127.0.0.1", 0))
+        self._socket.listen(10)
+        self.port: int = self._socket.getsockname()[1]
+        self.transports: List[paramiko.Transport] = []
+        self.running_count = 0
+        self.max_running_count = 0
+        self.command_count = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._accept, daemon=True)
+        self._thread.start()
+
+    @property
+    def handshake_count(self) -> int:
+        return len(self.transports)
+
+    def close(self) -> None:
+        self._socket.close()
+        self.disconnect()
+
+    def run_command(self, channel: paramiko.Channel, command: bytes) -> None:
+        stdin_thread: Optional[threading.Thread] = None
+        with self._lock:
+            self.running_count += 1
+            self.command_count += 1
+            self.max_running_count = max(self.max_running_count, self.running_count)
+        try:
+            # the transport thread replies the exec request, after this thread
+            # starts. Wait for it, so the channel isn't closed before the reply.
+            time.sleep(0.01)
+            process = subprocess.Popen(
+                ["sh", "-c", command.decode()],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+            )
+            stdout = process.stdout
+            assert stdout
+            stdin_thread = threading.Thread(
+                target=self._forward_stdin, args=(channel, process), daemon=True
+            )
+            stdin_thread.start()
+            # stream the output, spur reads pid before the command exits.
+            for block in iter(partial(os.read, stdout.fileno(), 65536), b""):
+                channel.sendall(block)
+            channel.send_exit_status(process.wait())
+        finally:
+            with self._lock:
+                self.running_count -= 1
+            channel.close()
+            if stdin_thread:
+                stdin_thread.join()
+
+    def _forward_stdin(
+        self, channel: paramiko.Channel, process: "subprocess.Popen[bytes]"
+    ) -> None:
+        assert process.stdin
+        try:
+            for block in iter(lambda: channel.recv(65536), b""):
+                process.stdin.write(block)
+            process.stdin.close()
+        except (OSError, ValueError):
+            # the process exits without reading stdin.
+            ...
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                client, _ = self._socket.accept()
+            except OSError:
+                # the socket is closed
+                break
+            # negotiate in a thread, so port probes don't block others.
+            thread = threading.Thread(
+                target=self._start_server, args=(client,), daemon=True
+            )
+            thread.start()
+
+    def disconnect(self) -> None:
+        for transport in self.transports:
+            transport.close()
+
+    def _start_server(self, client: socket.socket) -> None:
+        # like sshd does for interactive sessions.
+        client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        transport = paramiko.Transport(client)
+        # mute the errors of port probes.
+        transport.set_log_channel("sshd_stand_in")
+        transport.add_server_key(self._host_key)
+        transport.set_subsystem_handler("sftp", paramiko.SFTPServer, _StandInSftpServer)
+        try:
+            transport.start_server(server=_StandInServer(self))
+        except paramiko.SSHException:
+            # port probes close the connection without handshake.
+            return
+        with self._lock:
+            self.transports.append(transport)
+
+
+class SshShellTestCase(TestCase):
+    def setUp(self) -> None:
+        self._log = get_logger("shell")
+        self._sshd = _StandInSshd()
+        self._connection_info = schema.ConnectionInfo(
+            address="127.0.0.1", port=self._sshd.port, password="password"
+        )
+
+    def tearDown(self) -> None:
+        self._sshd.close()
+
+    def test_execute_benchmark(self) -> None:
+        count = 50
+        shell = SshShell(self._connection_info)
+
+        timer = create_timer()
+        shell.initialize()
+        initialize_elapsed = timer.elapsed()
+
+        timer = create_timer()
+        for _ in range(count):
+            result = self._execute(shell, "echo hello")
+            self.assertEqual("hello", result.stdout)
+        elapsed = timer.elapsed()
+        self._log.info(
+            f"{count} commands in {elapsed:.3f}s, {count / elapsed:.1f} commands/s, "
+            f"initialize: {initialize_elapsed:.3f}s, "
+            f"handshakes: {self._sshd.handshake_count}"
+        )
+        shell.close()
+
+    def test_execute_batch_benchmark(self) -> None:
+        # the stand-in delays each command, like the round trip of a remote
+        # node.
+        node = quick_connect(
+            schema.RemoteNode(
+                address="127.0.0.1",
+                port=self._sshd.port,
+                public_address="127.0.0.1",
+                public_port=self._sshd.port,
+                password="password",
+            )
+        )
+        cmds = [f"echo {index}" for index in range(20)]
+
+        timer = create_timer()
+        results = [node.execute(cmd, shell=True) for cmd in cmds]
+        sequential_elapsed = timer.elapsed()
+
+        command_count = self._sshd.command_count
+        timer = create_timer()
+        batch_results = node.execute_batch(cmds)
+        batch_elapsed = timer.elapsed()
+        # all commands run in one remote command.
+        self.assertEqual(1, self._sshd.command_count - command_count)
+
+        self._log.info(
+            f"{len(cmds)} commands, sequential: {sequential_elapsed:.3f}s, "
+            f"batch: {batch_elapsed:.3f}s"
+        )
+        self.assertListEqual(
+            [x.stdout for x in results], [x.stdout for x in batch_results]
+        )
+        node.close()
+
+    def test_reconnect(self) -> None:
+        shell = SshShell(self._connection_info)
+        shell.initialize()
+        self.assertEqual("hello", self._execute(shell, "echo hello").stdout)
+        self.assertEqual(1, self._sshd.handshake_count)
+
+        # the connection is dropped, like the node is rebooted.
+        self._sshd.disconnect()
+        self.assertEqual("hello", self._execute(shell, "echo hello").stdout)
+        self.assertEqual(2, self._sshd.handshake_count)
+        shell.close()
+
+    def test_parallel_reconnect(self) -> None:
+        shell = SshShell(self._connection_info)
+        shell.initialize()
+        self._sshd.disconnect()
+
+        # only one thread reconnects, others use the new connection.
+        results = run_in_parallel(
+            [partial(self._execute, shell, f"echo {x}") for x in range(5)]
+        )
+        self.assertListEqual(
+            [str(x) for x in range(5)], sorted(x.stdout for x in results)
+        )
+        self.assertEqual(2, self._sshd.handshake_count)
+        shell.close()
+
+    def test_channel_wait_timeout(self) -> None:
+        shell = SshShell(
+            self._connection_info, max_channel_count=1, channel_wait_timeout=0.2
+        )
+        shell.initialize()
+        process = self._start(shell, "sleep 1")
+        with self.assertRaises(LisaException) as context:
+            self._start(shell, "echo hello")
+        self.assertIn("timeout on waiting channels", str(context.exception))
+        process.wait_result(timeout=10)
+        shell.close()
+
+    def test_max_channel_count(self) -> None:
+        shell = SshShell(self._connection_info, max_channel_count=2)
+        shell.initialize()
+        processes = [self._start(shell, "sleep 0.2") for _ in range(5)]
+        for process in processes:
+            self.assertEqual(0, process.wait_result(timeout=10).exit_code)
+        self.assertEqual(2, self._sshd.max_running_count)
+        self.assertEqual(1, self._sshd.handshake_count)
+        shell.close()
+
+    def test_copy_bulk(self) -> None:
+        shell = SshShell(self._connection_info)
+        shell.initialize()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            local_path = Path(temp_dir) / "local"
+            files = _create_files(local_path, 5)
+            (local_path / "folder/file_0").chmod(0o700)
+            node_path = PurePosixPath(temp_dir) / "node"
+
+            # the node is the local file system in test.
+            self.assertListEqual(files, shell.copy_bulk(local_path, node_path))
+            self._assert_same_files(local_path, Path(node_path), files)
+            self.assertEqual(
+                0o700, Path(node_path / "folder/file_0").stat().st_mode & 0o777
+            )
+
+            # unchanged files are skipped.
+            (local_path / "file_1").write_text("changed")
+            self.assertListEqual(
+                [PurePath("file_1")], shell.copy_bulk(local_path, node_path)
+            )
+            (local_path / "file_3").write_text("changed")
+            self.assertListEqual(
+                [PurePath("file_3")],
+                shell.copy_bulk(
+                    local_path, node_path, [PurePath("file_3")], mode=0o755
+                ),
+            )
+            self.assertEqual(0o755, Path(node_path / "file_3").stat().st_mode & 0o777)
+            self.assertListEqual([], shell.copy_bulk(local_path, node_path))
+
+            # copy back
+            back_path = Path(temp_dir) / "back"
+            self.assertListEqual(
+                [PurePosixPath(x) for x in files],
+                shell.copy_back_bulk(node_path, back_path),
+            )
+            self._assert_same_files(local_path, back_path, files)
+            self.assertEqual(
+                0o700, (back_path / "folder/file_0").stat().st_mode & 0o777
+            )
+            self.assertListEqual([], shell.copy_back_bulk(node_path, back_path))
+            with self.assertRaises(LisaException):
+                shell.copy_back_bulk(node_path, back_path, [PurePath("missing")])
+        shell.close()
+
+    def test_copy_bulk_fallback(self) -> None:
+        shell = SshShell(self._connection_info)
+        shell.initialize()
+        # the local tools support bulk copies.
+        self.assertTrue(shell._check_bulk_copy())
+        # files are copied one by one, if the node doesn't have the tools.
+        shell._is_bulk_copy_supported = False
+        with tempfile.TemporaryDirectory() as temp_dir:
+            local_path = Path(temp_dir) / "local"
+            files = _create_files(local_path, 3)
+            node_path = PurePosixPath(temp_dir) / "node"
+            self.assertListEqual(
+                files, shell.copy_bulk(local_path, node_path, mode=0o755)
+            )
+            self._assert_same_files(local_path, Path(node_path), files)
+            self.assertEqual(
+                0o755, Path(node_path / "folder/file_0").stat().st_mode & 0o777
+            )
+
+            back_path = Path(temp_dir) / "back"
+            self.assertListEqual(
+                sorted(PurePosixPath(x) for x in files),
+                shell.copy_back_bulk(node_path, back_path),
+            )
+            self._assert_same_files(local_path, back_path, files)
+        shell.close()
+
+    def test_copy_resumable(self) -> None:
+        shell = SshShell(self._connection_info)
+        shell.initialize()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            local_file = Path(temp_dir) / "disk.vhd"
+            content = os.urandom(3 * 1024 * 1024)
+            local_file.write_bytes(content)
+            node_file = PurePosixPath(temp_dir) / "node" / "disk.vhd"
+            part_file = Path(f"{node_file}.part")
+            part_file.parent.mkdir()
+
+            # an interrupted copy is resumed.
+            part_file.write_bytes(content[: 1024 * 1024])
+            shell._put_resumable(local_file, node_file)
+            self.assertEqual(content, Path(node_file).read_bytes())
+            self.assertFalse(part_file.exists())
+
+            # the part file of other content is dropped.
+            part_file.write_bytes(b"other content")
+            shell._put_resumable(local_file, node_file)
+            self.assertEqual(content, Path(node_file).read_bytes())
+
+            back_file = Path(temp_dir) / "back" / "disk.vhd"
+            back_file.parent.mkdir()
+            Path(f"{back_file}.part").write_bytes(content[:1000])
+            shell._get_resumable(node_file, back_file)
+            self.assertEqual(content, back_file.read_bytes())
+            Path(f"{back_file}.part").write_bytes(b"other content")
+            shell._get_resumable(node_file, back_file)
+            self.assertEqual(content, back_file.read_bytes())
+        shell.close()
+
+    def test_copy_bulk_benchmark(self) -> None:
+        shell = SshShell(self._connection_info)
+        shell.initialize()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            local_path = Path(temp_dir) / "local"
+            files = _create_files(local_path, 50)
+
+            # copy and chmod one by one, like installing a script before.
+            node_path = PurePosixPath(temp_dir) / "one_by_one"
+            timer = create_timer()
+            for file in files:
+                shell.copy(local_path / file, node_path / file)
+                shell.chmod(node_path / file, 0o755)
+            one_by_one_elapsed = timer.elapsed()
+
+            node_path = PurePosixPath(temp_dir) / "bulk"
+            command_count = self._sshd.command_count
+            timer = create_timer()
+            copied = shell.copy_bulk(local_path, node_path, files, mode=0o755)
+            bulk_elapsed = timer.elapsed()
+            self._assert_same_files(local_path, Path(node_path), files)
+            # the tools are detected, and the files are hashed and extracted in
+            # three commands, not one by one.
+            self.assertEqual(3, self._sshd.command_count - command_count)
+            self.assertListEqual(files, copied)
+
+            command_count = self._sshd.command_count
+            timer = create_timer()
+            copied = shell.copy_bulk(local_path, node_path, files, mode=0o755)
+            unchanged_elapsed = timer.elapsed()
+            self.assertListEqual([], copied)
+            # the tools are detected once.
+            self.assertEqual(1, self._sshd.command_count - command_count)
+        self._log.info(
+            f"{len(files)} files, one by one: {one_by_one_elapsed:.3f}s, "
+            f"bulk: {bulk_elapsed:.3f}s, unchanged: {unchanged_elapsed:.3f}s"
+        )
+        shell.close()
+
+    def _assert_same_files(
+        self, expected_path: Path, actual_path: Path, files: List[PurePath]
+    ) -> None:
+        for file in files:
+            self.assertEqual(
+                (expected_path / file).read_bytes(), (actual_path / file).read_bytes()
+            )
+
+    def _start(self, shell: SshShell, command: str) -> Process:
+        process = Process("test", shell, parent_logger=self._log)
+        process.start(command, no_info_log=True)
+        return process
+
+    def _execute(self, shell: SshShell, command: str) -> Any:
+        return self._start(shell, command).wait_result(timeout=10)
+
+
+def _create_files(root: Path, count: int) -> List[PurePath]:
+    files: List[PurePath] = []
+    for index in range(count):
+        file = PurePath("folder" if index % 2 == 0 else "", f"file_{index}")
+        (root / file).parent.mkdir(parents=True, exist_ok=True)
+        (root / file).write_text(f"content {index}\n" * 100)
+        files.append(file)
+    return sorted(files)
@@ -0,0 +1,163 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path, PurePath, PurePosixPath
+from typing import Any, List
+from unittest import TestCase
+
+from semver import VersionInfo
+
+from lisa.executable import _TOOL_CACHE_EXPIRY, Tool
+from lisa.operating_system import KernelInformation, OsInformation
+from lisa.util import constants
+from lisa.util.logger import get_logger
+from lisa.util.process import ExecutableResult
+
+
+class _StandInOs:
+    def __init__(self, kernel_version: str) -> None:
+        self.information = OsInformation(
+            version=VersionInfo(20, 4),
+            vendor="Ubuntu",
+            release="20.04",
+            codename="focal",
+            full_version="Ubuntu 20.04",
+        )
+        self._kernel_version = kernel_version
+
+    def get_kernel_information(self) -> KernelInformation:
+        return KernelInformation(
+            version=VersionInfo(5, 4),
+            raw_version=self._kernel_version,
+            hardware_platform="x86_64",
+            operating_system="GNU/Linux",
+            version_parts=[],
+        )
+
+
+class _StandInShell:
+    def copy(self, local_path: Path, node_path: PurePath) -> None:
+        shutil.copy(local_path, node_path)
+
+    def copy_back(self, node_path: PurePath, local_path: Path) -> None:
+        shutil.copy(node_path, local_path)
+
+    def mkdir(self, path: PurePath, exist_ok: bool = False) -> None:
+        Path(path).mkdir(parents=True, exist_ok=exist_ok)
+
+
+class _StandInNode:
+    """
+    It records commands, and the tar command to pack creates the archive file.
+    """
+
+    def __init__(self, working_path: Path, kernel_version: str = "5.4.0") -> None:
+        self.log = get_logger("node", "stand-in")
+        self.is_posix = True
+        self.os = _StandInOs(kernel_version)
+        self.shell = _StandInShell()
+        self.working_path = working_path
+        self.commands: List[str] = []
+
+    def execute(self, cmd: str, **kwargs: Any) -> ExecutableResult:
+        self.commands.append(cmd)
+        if cmd.startswith("tar -czf"):
+            Path(cmd.split()[2]).write_text("packed")
+        return ExecutableResult("", "", 0, cmd, 0)
+
+    def get_pure_path(self, path: str) -> PurePath:
+        return PurePosixPath(path)
+
+
+class _BuiltTool(Tool):
+    # like the commit id of source.
+    version = "1.0"
+
+    @property
+    def command(self) -> str:
+        return "built"
+
+    @property
+    def can_install(self) -> bool:
+        return True
+
+    def _install(self) -> bool:
+        self.built = False
+        self._install_cached(
+            self._build, ["/usr/local/bin/built"], version=self.version
+        )
+        return True
+
+    def _build(self) -> None:
+        self.built = True
+
+    def _check_exists(self) -> bool:
+        return True
+
+
+class ToolCacheTestCase(TestCase):
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self._temp_path = Path(self._temp_dir.name)
+        self._original_cache_path = getattr(constants, "CACHE_PATH", None)
+        constants.CACHE_PATH = self._temp_path / "cache"
+
+    def tearDown(self) -> None:
+        if self._original_cache_path is None:
+            del constants.CACHE_PATH
+        else:
+            constants.CACHE_PATH = self._original_cache_path
+        self._temp_dir.cleanup()
+
+    def test_build_once(self) -> None:
+        first_node = _StandInNode(self._temp_path / "first")
+        first_tool = _BuiltTool(first_node)  # type: ignore
+        first_tool.install()
+        self.assertTrue(first_tool.built)
+        self.assertIn("tar -czf", first_node.commands[0])
+        self.assertIn(" usr/local/bin/built", first_node.commands[0])
+        cache_files = list((constants.CACHE_PATH / constants.PATH_TOOL).iterdir())
+        self.assertEqual(1, len(cache_files))
+
+        # the other node extracts the tool instead of building it.
+        second_node = _StandInNode(self._temp_path / "second")
+        second_tool = _BuiltTool(second_node)  # type: ignore
+        second_tool.install()
+        self.assertFalse(second_tool.built)
+        self.assertEqual(1, len(second_node.commands))
+        self.assertIn("tar -xzf", second_node.commands[0])
+
+    def test_different_kernel(self) -> None:
+        _BuiltTool(_StandInNode(self._temp_path / "first")).install()  # type: ignore
+        other_tool = _BuiltTool(
+            _StandInNode(self._temp_path / "other", "5.15.0")  # type: ignore
+        )
+        other_tool.install()
+        self.assertTrue(other_tool.built)
+        cache_files = list((constants.CACHE_PATH / constants.PATH_TOOL).iterdir())
+        self.assertEqual(2, len(cache_files))
+
+    def test_expired(self) -> None:
+        _BuiltTool(_StandInNode(self._temp_path / "first")).install()  # type: ignore
+        cache_file = next((constants.CACHE_PATH / constants.PATH_TOOL).iterdir())
+        expired_time = time.time() - _TOOL_CACHE_EXPIRY - 1
+        os.utime(cache_file, (expired_time, expired_time))
+
+        tool = _BuiltTool(_StandInNode(self._temp_path / "second"))  # type: ignore
+        tool.install()
+        self.assertTrue(tool.built)
+        self.assertGreater(cache_file.stat().st_mtime, expired_time)
+
+    def test_unknown_version(self) -> None:
+        # if the version of source is unknown, the cache is skipped.
+        node = _StandInNode(self._temp_path / "first")
+        tool = _BuiltTool(node)  # type: ignore
+        tool.version = ""
+        tool.install()
+        self.assertTrue(tool.built)
+        self.assertListEqual([], node.commands)
+        self.assertFalse((constants.CACHE_PATH / constants.PATH_TOOL).exists())